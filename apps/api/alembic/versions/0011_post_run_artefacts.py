@@ -0,0 +1,17 @@
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "0011_post_run_artefacts"
+down_revision = "0010_m18_multi_setup"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("posts_runs", sa.Column("artefacts_json", postgresql.JSONB, nullable=True))
+
+
+def downgrade():
+    op.drop_column("posts_runs", "artefacts_json")
@@ -2,6 +2,9 @@ from __future__ import annotations
 
 from typing import Any, Dict
 
+from ..settings import app_settings as appset
+from .sequencing import sequence_holes
+
 
 def derive_cam_params(plan: Dict[str, Any], strategy: str = "balanced") -> Dict[str, Any]:
     """Plan (M13) + varsayılanlara göre operasyon listesi ve takım çaplarını önerir.
@@ -32,14 +35,21 @@ def derive_cam_params(plan: Dict[str, Any], strategy: str = "balanced") -> Dict[
             "params": {"side": "outside", "depth_per_pass": stepdown, "finish_pass": True, "allowance": 0.2},
         }
     )
-    # 3) Holes (varsa)
-    for h in cad.get("holes", []):
-        d = float(h.get("d", 5.0))
+    # 3) Holes (varsa): takım başına tek delme op'u, delikler hızlı
+    # hareket mesafesini kısaltacak sırada
+    seq = sequence_holes(cad.get("holes", []), budget_ms=appset.cam_sequence_budget_ms)
+    for g in seq.groups:
         ops.append(
             {
                 "type": "drill",
-                "tool": {"type": "drill", "dia": d},
-                "params": {"peck": 2.0 if th > 6 else 0.0, "dwell_ms": 50 if th > 8 else 0},
+                "tool": {"type": "drill", "dia": g["tool"]},
+                "params": {
+                    "peck": 2.0 if th > 6 else 0.0,
+                    "dwell_ms": 50 if th > 8 else 0,
+                    "locations": [
+                        [float(h.get("x", 0.0)), float(h.get("y", 0.0))] for h in g["holes"]
+                    ],
+                },
             }
         )
 
@@ -53,6 +63,7 @@ def derive_cam_params(plan: Dict[str, Any], strategy: str = "balanced") -> Dict[
             }
         )
 
-    return {"material": material, "ops": ops, "wcs": plan.get("wcs") or "G54"}
-
-
+    out = {"material": material, "ops": ops, "wcs": plan.get("wcs") or "G54"}
+    if seq.groups:
+        out["drill_sequence"] = seq.stats
+    return out
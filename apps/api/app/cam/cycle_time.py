@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..gcode.tokenizer import RAPID, TOOL_CHANGE, motion_rows
+from ..settings import app_settings as appset
+from ..sim.carve import move_path
+
+# Yay uzunluğu kirişlerle hesaplanır; bu sapmada bağıl hata ~1e-5 mertebesindedir
+ARC_TOL_MM = 0.005
+AXES = ("x", "y", "z")
+
+# FreeCAD postlarının operasyon başlangıç yorumu: "(Begin operation: Profile)"
+_OP_COMMENT = re.compile(r"\(\s*begin operation:\s*([^)]*?)\s*\)", re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class MachineLimits:
+    """Süre modelinin makine parametreleri.
+    rapid_mm_min: G0 hızı (ilerleme komutları da bununla sınırlanır).
+    accel_mm_s2: eksen başına ivme sınırı {"x","y","z"}; boşsa ivme modellenmez (sabit hız).
+    """
+
+    rapid_mm_min: float = 5000.0
+    tool_change_s: float = 8.0
+    accel_mm_s2: Dict[str, float] = field(default_factory=dict)
+
+    @classmethod
+    def from_settings(cls, overrides: Optional[Dict] = None) -> "MachineLimits":
+        o = overrides or {}
+        return cls(
+            rapid_mm_min=float(o.get("rapid_mm_min", appset.cycle_rapid_mm_min)),
+            tool_change_s=float(o.get("tool_change_s", appset.cycle_tool_change_s)),
+            accel_mm_s2={
+                k: float(v) for k, v in (o.get("accel_mm_s2") or appset.cycle_accel_mm_s2).items()
+            },
+        )
+
+
+@dataclass
+class CycleTime:
+    total_s: float
+    feed_s: float
+    rapid_s: float
+    tool_change_s: float
+    cut_mm: float
+    rapid_mm: float
+    tool_changes: int
+    unknown_feed_moves: int
+    ops: List[Dict]
+
+    def as_metrics(self) -> Dict:
+        return {
+            "cycle_time_s": round(self.total_s, 1),
+            "cycle_feed_s": round(self.feed_s, 1),
+            "cycle_rapid_s": round(self.rapid_s, 1),
+            "cycle_tool_change_s": round(self.tool_change_s, 1),
+            "cut_length_mm": round(self.cut_mm, 1),
+            "rapid_length_mm": round(self.rapid_mm, 1),
+            "tool_changes": self.tool_changes,
+            "unknown_feed_moves": self.unknown_feed_moves,
+            "cycle_ops": self.ops,
+        }
+
+
+class OpMarkers(list):
+    """Operasyon başlangıç yorumlarını (satır no (1 tabanlı), ad) satır satır toplar; lint
+    taramasına 'on_line' olarak verilir, böylece program ikinci kez okunmaz.
+    """
+
+    def __call__(self, line_no: int, line: str) -> None:
+        m = _OP_COMMENT.search(line)
+        if m:
+            self.append((line_no, m.group(1)))
+
+
+def op_markers(text: str) -> List[Tuple[int, str]]:
+    """Operasyon başlangıç yorumlarının (satır no (1 tabanlı), ad) listesi."""
+    out = OpMarkers()
+    for n, line in enumerate(text.splitlines(), start=1):
+        out(n, line)
+    return out
+
+
+def move_lengths(
+    moves: np.ndarray, arc_tol_mm: float = ARC_TOL_MM
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Hareket satırı başına yol uzunluğu (yaylar kiriş toplamı, helis dahil) ve eksen başına
+    mutlak yer değiştirme toplamı (N, 3). İlk hareketin başlangıcı
+    bilinmediğinden uzunluğu sıfırdır.
+    """
+    n = len(motion_rows(moves))
+    pts, row = move_path(moves, home=(0.0, 0.0, 0.0), arc_tol_mm=arc_tol_mm)
+    if len(pts) < 2:
+        return np.zeros(n), np.zeros((n, 3))
+    d = np.abs(np.diff(pts, axis=0))
+    owner = row[1:]
+    length = np.bincount(owner, weights=np.sqrt((d * d).sum(axis=1)), minlength=n)
+    travel = np.column_stack([np.bincount(owner, weights=d[:, a], minlength=n) for a in range(3)])
+    return length, travel
+
+
+def move_times(
+    length: np.ndarray, travel: np.ndarray, speed_mm_s: np.ndarray, accel_mm_s2: Dict[str, float]
+) -> np.ndarray:
+    """Hareket başına süre. İvme sınırı verilmişse her hareket durdan başlayıp durda biten yamuk
+    hız profiliyle modellenir (tam duruş; kısa parçalı yollarda üst sınır verir). Hareket ivmesi,
+    yola katılan her eksenin sınırının o eksendeki yön bileşenine oranının en küçüğüdür.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = np.where(speed_mm_s > 0, length / speed_mm_s, 0.0)
+        if not accel_mm_s2:
+            return t
+        limits = np.array([accel_mm_s2.get(a, np.inf) for a in AXES], dtype=np.float64)
+        u = travel / np.where(length > 0, length, 1.0)[:, None]
+        acc = np.where(u > 1e-12, limits / u, np.inf).min(axis=1)
+        v = speed_mm_s
+        ramp = np.isfinite(acc) & (speed_mm_s > 0) & (length > 0)
+        reach = length >= v * v / acc
+        t_ramp = np.where(reach, length / v + v / acc, 2.0 * np.sqrt(length / acc))
+        return np.where(ramp, t_ramp, t)
+
+
+def estimate_cycle_time(
+    moves: np.ndarray,
+    machine: Optional[MachineLimits] = None,
+    text: Optional[str] = None,
+    arc_tol_mm: float = ARC_TOL_MM,
+    markers: Optional[List[Tuple[int, str]]] = None,
+) -> CycleTime:
+    """Ayrıştırılmış G-code'dan (parse_moves) çevrim süresi: ilerleme hareketleri F ile (hızlı hızla
+    sınırlı), G0'lar makine hızlı hızıyla, takım değişimleri sabit süreyle. 'text' ya da önceden
+    toplanmış 'markers' (OpMarkers) verilirse operasyonlar "(Begin operation: ...)" yorumlarından,
+    yoksa takım değişimlerinden bölünür.
+    """
+    machine = machine or MachineLimits()
+    if markers is None:
+        markers = op_markers(text) if text else []
+    mv = motion_rows(moves)
+    length, travel = move_lengths(moves, arc_tol_mm)
+    rapid = mv["type"] == RAPID
+    rapid_mm_s = machine.rapid_mm_min / 60.0
+    feed = np.nan_to_num(mv["f"], nan=0.0) / 60.0
+    speed = np.where(rapid, rapid_mm_s, np.minimum(feed, rapid_mm_s))
+    unknown = ~rapid & (speed <= 0) & (length > 0)
+    t = move_times(length, travel, speed, machine.accel_mm_s2)
+
+    tc = moves[moves["type"] == TOOL_CHANGE]
+    if not markers:
+        markers = [(int(r["line_no"]), f"T{int(r['tool'])}") for r in tc]
+    lines = np.array([m[0] for m in markers], dtype=np.int64)
+    # Her satır, satır numarası kendisinden küçük/eşit son işaretin
+    # operasyonuna aittir (-1: işaretten önce)
+    op_of_move = np.searchsorted(lines, mv["line_no"], side="right") - 1
+    op_of_tc = np.searchsorted(lines, tc["line_no"], side="right") - 1
+    n_ops = len(markers) + 1
+    k = op_of_move + 1
+    per_t = np.bincount(k, weights=t, minlength=n_ops)
+    per_rapid = np.bincount(k, weights=np.where(rapid, t, 0.0), minlength=n_ops)
+    per_cut = np.bincount(k, weights=np.where(rapid, 0.0, length), minlength=n_ops)
+    per_tc = np.bincount(op_of_tc + 1, minlength=n_ops) * machine.tool_change_s
+    per_n = np.bincount(k, minlength=n_ops)
+
+    ops: List[Dict] = []
+    names = ["(başlangıç)"] + [m[1] for m in markers]
+    for i in range(n_ops):
+        if i == 0 and per_n[0] == 0 and per_tc[0] == 0:
+            continue
+        tools = mv["tool"][k == i]
+        ops.append(
+            {
+                "name": names[i],
+                "tool": int(tools[0]) if len(tools) else None,
+                "seconds": round(float(per_t[i] + per_tc[i]), 2),
+                "rapid_s": round(float(per_rapid[i]), 2),
+                "cut_mm": round(float(per_cut[i]), 1),
+                "moves": int(per_n[i]),
+            }
+        )
+
+    rapid_s = float(t[rapid].sum())
+    feed_s = float(t[~rapid].sum())
+    tool_s = float(len(tc) * machine.tool_change_s)
+    return CycleTime(
+        total_s=rapid_s + feed_s + tool_s,
+        feed_s=feed_s,
+        rapid_s=rapid_s,
+        tool_change_s=tool_s,
+        cut_mm=float(length[~rapid].sum()),
+        rapid_mm=float(length[rapid].sum()),
+        tool_changes=int(len(tc)),
+        unknown_feed_moves=int(unknown.sum()),
+        ops=ops,
+    )
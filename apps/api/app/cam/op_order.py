@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Hashable, List, Sequence, Tuple
+
+# (önce, sonra) op türü öncelikleri: alın önce üst yüzeyi düzler; pah, kenarları oluşturan
+# kontur ve delikten sonra gelir.
+PRECEDENCE: Tuple[Tuple[str, str], ...] = (
+    ("face", "contour"),
+    ("face", "drill"),
+    ("face", "chamfer"),
+    ("contour", "chamfer"),
+    ("drill", "chamfer"),
+)
+# Aynı türdeki op'lar (ör. kaba/ince kontur) plan sırasında kalır; farklı
+# çaptaki delme op'ları bağımsızdır
+FREE_SAME_TYPE = frozenset({"drill"})
+
+
+def controller_key(op: Dict, feeds: Dict) -> Tuple:
+    """Takım denetleyicisi kimliği: aynı anahtarlı op'lar tek ToolController'ı paylaşır."""
+    tool = op.get("tool") or {}
+    return (
+        tool.get("type"),
+        round(float(tool.get("dia", 6.0)), 3),
+        int(round(float(feeds.get("rpm", 0)))),
+        round(float(feeds.get("feed", 0.0)), 3),
+        round(float(feeds.get("plunge", 0.0)), 3),
+    )
+
+
+def count_changes(keys: Sequence[Hashable]) -> int:
+    """Sıradaki takım değişimi (M6) sayısı; ilk takım yüklemesi dahil."""
+    return sum(1 for i, k in enumerate(keys) if i == 0 or k != keys[i - 1])
+
+
+@dataclass
+class OpOrder:
+    order: List[int]
+    tool_changes_before: int
+    tool_changes_after: int
+
+    @property
+    def saved(self) -> int:
+        return self.tool_changes_before - self.tool_changes_after
+
+    def as_dict(self) -> Dict:
+        return {
+            "order": self.order,
+            "tool_changes_before": self.tool_changes_before,
+            "tool_changes_after": self.tool_changes_after,
+            "tool_changes_saved": self.saved,
+        }
+
+
+def order_ops(types: Sequence[str], keys: Sequence[Hashable], precedence=PRECEDENCE) -> OpOrder:
+    """Öncelikleri bozmadan takım değişimini azaltan topolojik sıra (açgözlü).
+    Her adımda önkoşulu tamamlanmış op'lardan mevcut takımla devam edebilen seçilir; takım değişmek
+    zorunluysa şu an en çok op'u hazır olan takıma geçilir. Eşitlikte plan sırası korunur.
+    'before' her op'un kendi denetleyicisi olduğu eski akıştır (op başına bir M6).
+    """
+    n = len(types)
+    after = {(a, b) for a, b in precedence}
+    preds: List[set] = [set() for _ in range(n)]
+    for j in range(n):
+        for i in range(n):
+            if (types[i], types[j]) in after or (
+                i < j and types[i] == types[j] and types[j] not in FREE_SAME_TYPE
+            ):
+                preds[j].add(i)
+    done: List[int] = []
+    placed = set()
+    cur = None
+    while len(done) < n:
+        ready = [i for i in range(n) if i not in placed and preds[i] <= placed]
+        same = [i for i in ready if keys[i] == cur]
+        if same:
+            pick = same[0]
+        else:
+            votes = Counter(keys[i] for i in ready)
+            pick = min(ready, key=lambda i: (-votes[keys[i]], i))
+        done.append(pick)
+        placed.add(pick)
+        cur = keys[pick]
+    return OpOrder(
+        order=done, tool_changes_before=n, tool_changes_after=count_changes([keys[i] for i in done])
+    )
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+# Bu nokta sayısının üstünde tam uzaklık matrisi kurulmaz (bellek n²);
+# yalnızca en yakın komşu uygulanır
+MAX_MATRIX_POINTS = 4000
+# Delme çevrimi komutları; her biri bir delik konumudur
+DRILL_CYCLES = frozenset({"G73", "G81", "G82", "G83", "G85", "G86", "G89"})
+# Üretilen yoldaki konumun planlanan konumla aynı sayılacağı mesafe
+LOCATION_TOL_MM = 1e-3
+
+
+def path_length(pts: np.ndarray, start: Tuple[float, float] = (0.0, 0.0)) -> float:
+    """start → pts[0] → ... → pts[-1] açık yolunun uzunluğu."""
+    if len(pts) == 0:
+        return 0.0
+    p = np.vstack([np.asarray(start, dtype=np.float64)[None, :], pts])
+    return float(np.hypot(*np.diff(p, axis=0).T).sum())
+
+
+def nearest_neighbour(pts: np.ndarray, start: Tuple[float, float] = (0.0, 0.0)) -> np.ndarray:
+    """start noktasından başlayan açgözlü sıra. Matris kurmadan her adımda
+    kalan noktalara uzaklık hesaplanır.
+    """
+    n = len(pts)
+    order = np.empty(n, dtype=np.int64)
+    left = np.ones(n, dtype=bool)
+    cur = np.asarray(start, dtype=np.float64)
+    for k in range(n):
+        d = np.hypot(pts[:, 0] - cur[0], pts[:, 1] - cur[1])
+        d[~left] = np.inf
+        i = int(np.argmin(d))
+        order[k] = i
+        left[i] = False
+        cur = pts[i]
+    return order
+
+
+def two_opt(
+    pts: np.ndarray, order: np.ndarray, start: Tuple[float, float], deadline: float
+) -> np.ndarray:
+    """Başlangıcı sabit açık yol için 2-opt: her i için tüm j adayları vektörel değerlendirilir ve
+    en iyi ters çevirme uygulanır. İyileşme kalmayınca ya da 'deadline' (monotonic) gelince durur.
+    """
+    p = np.concatenate([[0], order + 1])
+    nodes = np.vstack([np.asarray(start, dtype=np.float64)[None, :], pts])
+    dist = np.hypot(nodes[:, None, 0] - nodes[None, :, 0], nodes[:, None, 1] - nodes[None, :, 1])
+    n = len(p)
+    improved = True
+    while improved:
+        improved = False
+        for i in range(n - 2):
+            if time.monotonic() >= deadline:
+                return p[1:] - 1
+            a, b = p[i], p[i + 1]
+            c = p[i + 2 :]
+            nxt = np.append(p[i + 3 :], -1)
+            has_next = nxt >= 0
+            nx = np.where(has_next, nxt, 0)
+            # (a,b)+(c,next) kenarları (a,c)+(b,next) ile değişir; yol sonunda 'next' yoktur
+            delta = dist[a, c] - dist[a, b] + np.where(has_next, dist[b, nx] - dist[c, nx], 0.0)
+            k = int(np.argmin(delta))
+            if delta[k] < -1e-9:
+                j = i + 2 + k
+                p[i + 1 : j + 1] = p[i + 1 : j + 1][::-1].copy()
+                improved = True
+    return p[1:] - 1
+
+
+def order_points(pts: np.ndarray, start: Tuple[float, float], deadline: float) -> np.ndarray:
+    order = nearest_neighbour(pts, start)
+    if 3 <= len(pts) <= MAX_MATRIX_POINTS:
+        order = two_opt(pts, order, start, deadline)
+    return order
+
+
+@dataclass
+class DrillSequence:
+    groups: List[Dict]
+    stats: Dict
+
+
+def sequence_holes(
+    holes: Sequence[Dict],
+    start: Tuple[float, float] = (0.0, 0.0),
+    budget_ms: int = 500,
+    tool_key=lambda h: float(h.get("d", 5.0)),
+) -> DrillSequence:
+    """Delikleri takıma göre gruplar (ilk görünme sırasıyla) ve her grubu en yakın komşu + 2-opt ile
+    sıralar; her grup bir öncekinin son deliğinden başlar. Toplam süre 'budget_ms' ile sınırlıdır.
+    İstatistikler, plan sırasına (grupsuz) göre hızlı hareket mesafesindeki kazancı verir.
+    """
+    t0 = time.monotonic()
+    deadline = t0 + budget_ms / 1000.0
+    keys: List = []
+    members: Dict = {}
+    for i, h in enumerate(holes):
+        k = tool_key(h)
+        if k not in members:
+            keys.append(k)
+            members[k] = []
+        members[k].append(i)
+    xy = np.array(
+        [[float(h.get("x", 0.0)), float(h.get("y", 0.0))] for h in holes], dtype=np.float64
+    ).reshape(-1, 2)
+
+    groups: List[Dict] = []
+    cur = start
+    after = 0.0
+    for k in keys:
+        idx = np.asarray(members[k], dtype=np.int64)
+        order = idx[order_points(xy[idx], cur, deadline)]
+        after += path_length(xy[order], cur)
+        cur = tuple(xy[order[-1]])
+        groups.append({"tool": k, "holes": [holes[int(i)] for i in order]})
+
+    before = path_length(xy, start)
+    plan_keys = [tool_key(h) for h in holes]
+    stats = {
+        "holes": len(holes),
+        "groups": len(groups),
+        "rapid_mm_before": round(before, 1),
+        "rapid_mm_after": round(after, 1),
+        "reduction_pct": round(100.0 * (before - after) / before, 1) if before > 0 else 0.0,
+        "tool_changes_before": sum(1 for a, b in zip(plan_keys, plan_keys[1:]) if a != b)
+        + (1 if holes else 0),
+        "tool_changes_after": len(groups),
+        "elapsed_ms": int((time.monotonic() - t0) * 1000),
+    }
+    return DrillSequence(groups=groups, stats=stats)
+
+
+def cycle_locations(commands: Iterable[Tuple[str, Mapping[str, float]]]) -> np.ndarray:
+    """Path komutlarından (ad, parametreler) delme çevrimlerinin XY konumları, yoldaki sırasıyla.
+    X/Y modaldır: çevrim satırında eksik eksen bir önceki komuttan alınır.
+    """
+    x = y = 0.0
+    out: List[Tuple[float, float]] = []
+    for name, params in commands:
+        x = float(params.get("X", x))
+        y = float(params.get("Y", y))
+        if name.upper() in DRILL_CYCLES:
+            out.append((x, y))
+    return np.array(out, dtype=np.float64).reshape(-1, 2)
+
+
+def same_order(
+    actual: np.ndarray, planned: Sequence[Sequence[float]], tol: float = LOCATION_TOL_MM
+) -> bool:
+    """Üretilen çevrim konumları planlanan sırayla birebir aynı mı."""
+    planned_xy = np.asarray(planned, dtype=np.float64).reshape(-1, 2)
+    return actual.shape == planned_xy.shape and bool((np.abs(actual - planned_xy) <= tol).all())
+
+
+def apply_actual_path(
+    stats: Dict, actual_xy: np.ndarray, start: Tuple[float, float] = (0.0, 0.0)
+) -> Dict:
+    """Planlanan sıra istatistiklerini, CAM işinin gerçek yolundan (tüm delme op'ları, çalışma
+    sırasıyla) ölçülen hızlı hareket mesafesiyle günceller; planlanan değer ayrıca saklanır.
+    """
+    out = dict(stats)
+    after = path_length(actual_xy, start)
+    before = float(stats.get("rapid_mm_before") or 0.0)
+    out["planned_rapid_mm_after"] = stats.get("rapid_mm_after")
+    out["rapid_mm_after"] = round(after, 1)
+    out["reduction_pct"] = round(100.0 * (before - after) / before, 1) if before > 0 else 0.0
+    return out
@@ -1,18 +1,108 @@
 from __future__ import annotations
 
-from fastapi import APIRouter
+import json
+from typing import AsyncIterator, Optional
+
+from fastapi import APIRouter, Header, Query, Request
 from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from .config import settings
+from .db import db_session
+from .models import Job
+from .services.job_events import TERMINAL_STATUSES, format_sse, is_terminal, stream_key
+
+router = APIRouter(tags=["İş Olayları"])
+
+# XREAD bloklama süresi; bu süre olay gelmezse canlı tutma yorumu gönderilir ve
+# iş durumu bir kez kontrol edilir
+BLOCK_MS = 15000
+READ_COUNT = 100
+
+
+def _job_status(job_id: int) -> Optional[dict]:
+    with db_session() as s:
+        job = s.get(Job, job_id)
+        if not job:
+            return None
+        return {
+            "job_id": job.id,
+            "type": job.type,
+            "status": job.status,
+            "stage": job.status,
+            "progress": 100.0 if job.status == "succeeded" else None,
+            "error_code": job.error_code,
+            "message": job.error_message,
+        }
+
+
+async def relay(request: Request, job_id: int, last_id: str) -> AsyncIterator[bytes]:
+    """İşin Redis akışını SSE olarak aktarır. last_id'den sonraki olaylar (yoksa baştan) yeniden
+    oynatılır; uç durum olayı gönderildiğinde akış kapanır. Olay kaçmışsa (ör. işçi öldü, akış
+    süresi doldu) boşta geçen her BLOCK_MS sonunda veritabanındaki durum tek sorguyla doğrulanır.
+    """
+    import redis.asyncio as aioredis  # type: ignore
+
+    r = aioredis.Redis.from_url(settings.redis_url, decode_responses=True)
+    key = stream_key(job_id)
+    try:
+        while not await request.is_disconnected():
+            resp = await r.xread({key: last_id}, count=READ_COUNT, block=BLOCK_MS)
+            if not resp:
+                st = await run_in_threadpool(_job_status, job_id)
+                if st is None or st["status"] in TERMINAL_STATUSES:
+                    doc = (
+                        {k: v for k, v in st.items() if v is not None}
+                        if st
+                        else {"job_id": job_id, "status": "unknown"}
+                    )
+                    yield format_sse(last_id, json.dumps(doc, ensure_ascii=False))
+                    return
+                yield b": keepalive\n\n"
+                continue
+            entries = resp[0][1]
+            for entry_id, fields in entries:
+                last_id = entry_id
+                yield format_sse(entry_id, fields.get("data", "{}"))
+            # Yeniden denenen iş 'failed' sonrası tekrar 'running' yayınlar; yalnızca
+            # akışın son olayı uç durumsa kapat
+            if len(entries) < READ_COUNT and is_terminal(entries[-1][1].get("data", "{}")):
+                return
+    finally:
+        await r.aclose()
 
 
-router = APIRouter(prefix="/api/v1/sim", tags=["Simülasyon Olayları"]) 
+def _stream(
+    request: Request, job_id: int, last_event_id: Optional[str], since: Optional[str]
+) -> StreamingResponse:
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(
+        relay(request, job_id, last_event_id or since or "0"),
+        media_type="text/event-stream",
+        headers=headers,
+    )
 
 
-@router.get("/{job_id}/events")
-def sse_events(job_id: int):
-    # Basit SSE jeneratörü; gerçek implementasyonda Redis pub/sub veya queue ile push edilir
-    async def eventgen():
-        yield "event: message\n".encode()
-        yield f"data: {{\"progress\": 0, \"message\": \"Başlatıldı\"}}\n\n".encode()
-    return StreamingResponse(eventgen(), media_type="text/event-stream")
+@router.get("/api/v1/jobs/{job_id}/events")
+async def job_events(
+    request: Request,
+    job_id: int,
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+    since: Optional[str] = Query(
+        None, description="Last-Event-ID başlığı gönderemeyen istemciler için"
+    ),
+):
+    """Her iş türü için aşama/ilerleme olayları (SSE). Yeniden bağlanan EventSource Last-Event-ID
+    başlığıyla kaldığı olaydan devam eder.
+    """
+    return _stream(request, job_id, last_event_id, since)
 
 
+@router.get("/api/v1/sim/{job_id}/events", tags=["Simülasyon Olayları"])
+async def sse_events(
+    request: Request,
+    job_id: int,
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+    since: Optional[str] = Query(None),
+):
+    return _stream(request, job_id, last_event_id, since)
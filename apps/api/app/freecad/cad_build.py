@@ -1,10 +1,11 @@
 from __future__ import annotations
 
-import os
 import hashlib
+import math
+import os
 import tempfile
 from dataclasses import dataclass
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, List, Sequence, Tuple
 
 
 @dataclass
@@ -41,7 +42,88 @@ def _sha256(path: str) -> str:
     return h.hexdigest()
 
 
+# Geometrik kenar seçiminde konum toleransı (mm)
+EDGE_TOL_MM = 1e-3
+
+
+def overlapping_holes(holes: Sequence[Tuple[float, float, float]]) -> bool:
+    """Herhangi iki delik kesişiyor mu. En büyük çap kadar hücreli ızgara ile komşu hücreler
+    karşılaştırılır (yüzlerce delikte O(n))."""
+    if len(holes) < 2:
+        return False
+    cell = max(d for _, _, d in holes) or 1.0
+    grid: Dict[Tuple[int, int], List[int]] = {}
+    for i, (x, y, _) in enumerate(holes):
+        grid.setdefault((math.floor(x / cell), math.floor(y / cell)), []).append(i)
+    for (cx, cy), idx in grid.items():
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for j in grid.get((cx + dx, cy + dy), ()):
+                    for i in idx:
+                        if i < j:
+                            (x1, y1, d1), (x2, y2, d2) = holes[i], holes[j]
+                            if math.hypot(x1 - x2, y1 - y2) < (d1 + d2) / 2.0:
+                                return True
+    return False
+
+
+def edge_descriptor(edge: Any) -> Dict[str, Any]:
+    """FreeCAD kenarının seçim için gereken geometrisi: tür, uç noktaları, (çemberse) yarıçap ve
+    kapalı olup olmadığı (tam çember: delik ağzı; açık yay: ör. yuvarlatılmış dış köşe)."""
+    pts = [(v.Point.x, v.Point.y, v.Point.z) for v in edge.Vertexes]
+    curve = type(edge.Curve).__name__
+    return {
+        "kind": (
+            "circle"
+            if curve == "Circle"
+            else ("line" if curve in ("Line", "LineSegment") else curve.lower())
+        ),
+        "points": pts,
+        "radius": float(getattr(edge.Curve, "Radius", 0.0)) if curve == "Circle" else 0.0,
+        "closed": bool(edge.isClosed()),
+        "zmin": edge.BoundBox.ZMin,
+        "zmax": edge.BoundBox.ZMax,
+    }
+
+
+def top_edges(edges: Sequence[Dict[str, Any]], top_z: float, min_radius: float = 0.0) -> List[int]:
+    """Üst yüzeydeki kenarlar (pah için): tamamen z=top_z düzleminde kalan dış kontur ve delik
+    ağızları. Yarıçapı pah boyunu aşmayan delik ağızları (kapalı çemberler) atlanır, geometri
+    kurulamaz. Dış konturdaki köşe yayları (açık) yarıçaplarından bağımsız
+    seçilir; pah onları da izlemelidir."""
+    out: List[int] = []
+    for i, e in enumerate(edges):
+        if abs(e["zmin"] - top_z) > EDGE_TOL_MM or abs(e["zmax"] - top_z) > EDGE_TOL_MM:
+            continue
+        if e["kind"] == "circle" and e.get("closed", True) and e["radius"] <= min_radius:
+            continue
+        out.append(i + 1)
+    return out
+
+
+def corner_edges(edges: Sequence[Dict[str, Any]], width: float, height: float) -> List[int]:
+    """Plakanın dört dikey köşe kenarı (yuvarlatma için): x∈{0,width}, y∈{0,height}
+    üzerindeki Z doğrultulu doğrular.
+    """
+    out: List[int] = []
+    for i, e in enumerate(edges):
+        if e["kind"] != "line" or len(e["points"]) != 2:
+            continue
+        (x0, y0, z0), (x1, y1, z1) = e["points"]
+        if abs(x0 - x1) > EDGE_TOL_MM or abs(y0 - y1) > EDGE_TOL_MM or abs(z0 - z1) <= EDGE_TOL_MM:
+            continue
+        on_x = min(abs(x0), abs(x0 - width)) <= EDGE_TOL_MM
+        on_y = min(abs(y0), abs(y0 - height)) <= EDGE_TOL_MM
+        if on_x and on_y:
+            out.append(i + 1)
+    return out
+
+
 def build_fcstd(params: BuildParams, out_dir: str) -> Dict[str, str]:
+    """Plaka + delikler + kenar işlemleri. Tüm delik takımları tek bir şekilde birleştirilip tek
+    Part::Cut ile kesilir ve bir kez recompute edilir (delik başına iç içe Cut zinciri kurulmaz).
+    Yuvarlatma yalnızca dikey köşe kenarlarına, pah yalnızca üst yüzey kenarlarına uygulanır.
+    """
     # FreeCAD importları fonksiyon içine alındı (ortam yoksa import hatası almamak için)
     import FreeCAD as App  # type: ignore
     import Part  # type: ignore
@@ -54,35 +136,44 @@ def build_fcstd(params: BuildParams, out_dir: str) -> Dict[str, str]:
         box.Height = params.thickness
         box.Placement = App.Placement(App.Vector(0, 0, 0), App.Rotation(0, 0, 0, 1))
         base = box
-        doc.recompute()
 
-        for (x, y, d) in params.holes:
-            cyl = doc.addObject("Part::Cylinder", f"Hole_{x}_{y}")
-            cyl.Radius = d / 2.0
-            cyl.Height = params.thickness + 1.0
-            cyl.Placement = App.Placement(App.Vector(x, y, -0.5), App.Rotation(0, 0, 0, 1))
-            doc.recompute()
-            cut = doc.addObject("Part::Cut", f"Cut_{x}_{y}")
+        if params.holes:
+            tools = [
+                Part.makeCylinder(d / 2.0, params.thickness + 1.0, App.Vector(x, y, -0.5))
+                for (x, y, d) in params.holes
+            ]
+            # Kesişen delikler varsa takımlar tek birleşime (fuse), yoksa doğrudan bileşiğe alınır
+            if overlapping_holes(params.holes) and len(tools) > 1:
+                tool_shape = tools[0].multiFuse(tools[1:])
+            else:
+                tool_shape = Part.makeCompound(tools)
+            holes = doc.addObject("Part::Feature", "HoleTools")
+            holes.Shape = tool_shape
+            cut = doc.addObject("Part::Cut", "Holes")
             cut.Base = base
-            cut.Tool = cyl
-            doc.recompute()
+            cut.Tool = holes
             base = cut
-
-        if params.chamfer_mm:
-            ch = doc.addObject("Part::Chamfer", "Chamfer")
-            ch.Base = base
-            edges = [(f"Edge{i+1}", float(params.chamfer_mm)) for i in range(len(base.Shape.Edges))]
-            ch.Edges = edges
-            doc.recompute()
-            base = ch
+        doc.recompute()
 
         if params.fillet_mm:
-            fl = doc.addObject("Part::Fillet", "Fillet")
-            fl.Base = base
-            edges = [(f"Edge{i+1}", float(params.fillet_mm)) for i in range(len(base.Shape.Edges))]
-            fl.Edges = edges
-            doc.recompute()
-            base = fl
+            edges = [edge_descriptor(e) for e in base.Shape.Edges]
+            sel = corner_edges(edges, params.width, params.height)
+            if sel:
+                fl = doc.addObject("Part::Fillet", "Fillet")
+                fl.Base = base
+                fl.Edges = [(i, float(params.fillet_mm), float(params.fillet_mm)) for i in sel]
+                doc.recompute()
+                base = fl
+
+        if params.chamfer_mm:
+            edges = [edge_descriptor(e) for e in base.Shape.Edges]
+            sel = top_edges(edges, params.thickness, min_radius=float(params.chamfer_mm))
+            if sel:
+                ch = doc.addObject("Part::Chamfer", "Chamfer")
+                ch.Base = base
+                ch.Edges = [(i, float(params.chamfer_mm), float(params.chamfer_mm)) for i in sel]
+                doc.recompute()
+                base = ch
 
         fcstd_path = os.path.join(out_dir, "model.fcstd")
         step_path = os.path.join(out_dir, "model.step")
@@ -127,10 +218,25 @@ def validate_fcstd(fcstd_path: str) -> Dict[str, Any]:
         App.closeDocument(doc.Name)  # type: ignore
 
 
-def build_from_plan(plan: Dict[str, Any], out_dir: str) -> Tuple[Dict[str, str], Dict[str, Any]]:
-    params = parse_plan_to_params(plan)
+def freecad_version() -> str:
+    """Geometriyi gerçekten üreten süreç içi FreeCAD modülünün sürümü ("0.21.2" biçiminde).
+
+    FreeCADCmd yoklamasının bildirdiği sürüm, işçinin içe aktardığı modülden farklı olabilir;
+    önbellek anahtarı build_fcstd'yi çalıştıran modüle bağlanır. Modül yoksa "unknown".
+    """
+    try:
+        import FreeCAD as App  # type: ignore
+
+        return ".".join(str(p) for p in App.Version()[:3]) or "unknown"
+    except Exception:
+        return "unknown"
+
+
+def build_from_params(params: BuildParams, out_dir: str) -> Tuple[Dict[str, str], Dict[str, Any]]:
     paths = build_fcstd(params, out_dir)
     stats = validate_fcstd(paths["fcstd"])
     return paths, stats
 
 
+def build_from_plan(plan: Dict[str, Any], out_dir: str) -> Tuple[Dict[str, str], Dict[str, Any]]:
+    return build_from_params(parse_plan_to_params(plan), out_dir)
@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import json
+import socket
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+from ..config import settings
+from ..logging_setup import get_logger
+from ..schemas import FreeCADDetectResponse
+from ..services.redis_client import redis_client
+from ..settings import app_settings as appset
+
+logger = get_logger(__name__)
+
+CAPS_KEY_PREFIX = "freecad:caps:"
+NODES_KEY = "freecad:nodes"
+PROBE_TIMEOUT_S = 60
+WORKBENCHES = ("Part", "Sketcher", "Path", "Asm4")
+
+# Tek FreeCADCmd çalıştırmasında sürüm, tezgâhlar, Path post API'si ve post-processor listesi
+PROBE_SCRIPT = r"""
+import json, os, sys
+import FreeCAD as App
+caps = {
+    "version": "FreeCAD " + ".".join(str(v) for v in App.Version()[:3]),
+    "workbenches": {},
+    "path_api": None,
+    "posts": [],
+}
+for name in WORKBENCHES:
+    try:
+        __import__(name)
+        caps["workbenches"][name] = True
+    except Exception:
+        caps["workbenches"][name] = False
+try:
+    import Path
+    import Path.Post
+    if hasattr(Path.Post, "export"):
+        caps["path_api"] = "Path.Post"
+except Exception:
+    pass
+LEGACY_POST_APIS = (
+    ("PostUtils", "PathScripts.PostUtils"),
+    ("PathPostProcessor", "PathScripts.PathPostProcessor"),
+)
+for api, mod in LEGACY_POST_APIS:
+    if caps["path_api"]:
+        break
+    try:
+        __import__(mod)
+        caps["path_api"] = api
+    except Exception:
+        pass
+posts = set()
+for mod in ("Path.Post.scripts", "PathScripts.post"):
+    try:
+        m = __import__(mod, fromlist=["_"])
+        for fn in os.listdir(os.path.dirname(m.__file__)):
+            if fn.endswith("_post.py"):
+                posts.add(fn[: -len("_post.py")])
+    except Exception:
+        pass
+caps["posts"] = sorted(posts)
+print("CAPS=" + json.dumps(caps))
+sys.exit(0)
+""".replace(
+    "WORKBENCHES", repr(WORKBENCHES)
+)
+
+
+class FreeCADUnavailable(RuntimeError):
+    """Bu düğümde FreeCADCmd ya da gereken tezgâh yok. Aynı düğümde yeniden denemek sonucu
+    değiştirmediğinden görevler bunu otomatik yeniden denemez (dont_autoretry_for)."""
+
+
+@dataclass
+class Capabilities:
+    found: bool
+    node: str
+    path: Optional[str] = None
+    version: Optional[str] = None
+    asm4_available: Optional[bool] = None
+    path_api: Optional[str] = None
+    posts: List[str] = field(default_factory=list)
+    # tezgâh → kullanılabilir mi; boş: bilinmiyor (eski yoldan tespit)
+    workbenches: Dict[str, bool] = field(default_factory=dict)
+    probed_at: float = 0.0
+    message: Optional[str] = None
+
+    def as_dict(self) -> Dict:
+        return asdict(self)
+
+    def to_detect_response(self) -> FreeCADDetectResponse:
+        return FreeCADDetectResponse(
+            found=self.found,
+            path=self.path,
+            version=self.version,
+            asm4_available=self.asm4_available,
+            message=self.message,
+        )
+
+    def missing(self, *workbenches: str) -> List[str]:
+        """Bu düğümde bulunmadığı kesin olan tezgâhlar (bilinmeyenler eksik sayılmaz)."""
+        return [w for w in workbenches if self.workbenches.get(w) is False]
+
+
+def node_name() -> str:
+    return socket.gethostname()
+
+
+def probe(path: Optional[str]) -> Capabilities:
+    """FreeCADCmd'yi tek kez çalıştırıp yetenekleri çıkarır. Yoklama betiği başarısız olursa
+    eski yola (--version + Asm4 import denemesi) düşülür; tezgâh bilgisi o durumda bilinmez.
+    """
+    from .pool import run_oneshot
+    from .service import check_asm4_available, get_freecad_version
+
+    now = time.time()
+    if not path:
+        return Capabilities(
+            found=False, node=node_name(), probed_at=now, message="FreeCADCmd bulunamadı"
+        )
+    res = run_oneshot(path, PROBE_SCRIPT, timeout=PROBE_TIMEOUT_S)
+    line = next((ln for ln in res.stdout.splitlines() if ln.startswith("CAPS=")), None)
+    if res.returncode == 0 and line:
+        data = json.loads(line[len("CAPS=") :])
+        wb = data.get("workbenches") or {}
+        return Capabilities(
+            found=True,
+            node=node_name(),
+            path=path,
+            version=data.get("version"),
+            asm4_available=wb.get("Asm4"),
+            path_api=data.get("path_api"),
+            posts=list(data.get("posts") or []),
+            workbenches=wb,
+            probed_at=now,
+        )
+    logger.warning(
+        "FreeCAD yetenek yoklaması başarısız, eski tespite düşülüyor",
+        extra={"stderr": res.stderr[-500:]},
+    )
+    asm4 = check_asm4_available(path) if settings.freecad_asm4_required else None
+    return Capabilities(
+        found=True,
+        node=node_name(),
+        path=path,
+        version=get_freecad_version(path),
+        asm4_available=asm4,
+        probed_at=now,
+    )
+
+
+def publish(caps: Capabilities) -> None:
+    """Sağlık ucu ve zamanlayıcı için düğümün yeteneklerini Redis'e
+    yazar (TTL'nin iki katı ömürle).
+    """
+    try:
+        r = redis_client()
+        r.set(
+            CAPS_KEY_PREFIX + caps.node,
+            json.dumps(caps.as_dict()),
+            ex=max(60, 2 * appset.freecad_detect_ttl_s),
+        )
+        r.sadd(NODES_KEY, caps.node)
+    except Exception as e:
+        logger.warning("FreeCAD yetenekleri yayınlanamadı", extra={"error": str(e)})
+
+
+def _published(node: str) -> Optional[Capabilities]:
+    try:
+        raw = redis_client().get(CAPS_KEY_PREFIX + node)
+    except Exception:
+        return None
+    if not raw:
+        return None
+    try:
+        return Capabilities(**json.loads(raw))
+    except (TypeError, ValueError):
+        return None
+
+
+def node_capabilities() -> List[Dict]:
+    """Yetenek kaydı süresi dolmamış tüm düğümler; süresi dolanlar kümeden temizlenir."""
+    try:
+        r = redis_client()
+        nodes = sorted(n.decode() if isinstance(n, bytes) else n for n in r.smembers(NODES_KEY))
+    except Exception:
+        return []
+    out: List[Dict] = []
+    for n in nodes:
+        caps = _published(n)
+        if caps is None:
+            try:
+                r.srem(NODES_KEY, n)
+            except Exception:
+                pass
+            continue
+        out.append(caps.as_dict())
+    return out
+
+
+_cached: Optional[Capabilities] = None
+
+
+def get_capabilities(refresh: bool = False) -> Capabilities:
+    """Bu düğümün FreeCAD yetenekleri. Sırasıyla süreç içi önbellek, aynı düğümün Redis'teki kaydı
+    (ör. işçi açılışında ana süreçte yoklanmış) ve son çare olarak yeni yoklama kullanılır.
+    refresh=True her zaman yeniden yoklar ve yayınlar.
+    """
+    global _cached
+    from .service import find_freecadcmd_path
+
+    ttl = appset.freecad_detect_ttl_s
+    now = time.time()
+    path = find_freecadcmd_path()
+    if not refresh:
+        if _cached and _cached.path == path and now - _cached.probed_at < ttl:
+            return _cached
+        shared = _published(node_name())
+        if shared and shared.found and shared.path == path and now - shared.probed_at < ttl:
+            _cached = shared
+            return shared
+    caps = probe(path)
+    if caps.found:
+        _cached = caps
+        publish(caps)
+    logger.info(
+        "FreeCAD yetenekleri yoklandı",
+        extra={"freecad_version": caps.version, "path_api": caps.path_api},
+    )
+    return caps
+
+
+def require(*workbenches: str) -> Capabilities:
+    """Görev başında çağrılır: FreeCADCmd yoksa ya da gereken tezgâh bu
+    düğümde yoksa FreeCADUnavailable.
+    """
+    caps = get_capabilities()
+    if not caps.found or not caps.path:
+        raise FreeCADUnavailable("FreeCADCmd bulunamadı")
+    missing = caps.missing(*workbenches)
+    if missing:
+        raise FreeCADUnavailable(
+            f"Bu düğümde FreeCAD tezgâhı yok: {', '.join(missing)} ({caps.node})"
+        )
+    return caps
+
+
+def on_worker_ready(**_kwargs) -> None:
+    """Celery işçisi açılırken bir kez yoklayıp yayınlar; çocuk süreçler kaydı Redis'ten okur."""
+    try:
+        get_capabilities(refresh=True)
+    except Exception as e:
+        logger.warning("FreeCAD yetenek yoklaması başarısız", extra={"error": str(e)})
@@ -1,21 +1,20 @@
 from __future__ import annotations
 
-import os
+import json
 import re
 import tempfile
 from pathlib import Path
-from typing import Tuple, Optional
+from typing import Dict, Optional, Tuple
 
 from tenacity import retry, stop_after_attempt, wait_exponential
 
 from ..config import settings
+from ..llm import generate_freecad_script_for_planetary
 from ..logging_setup import get_logger
 from ..schemas.cad import AssemblyRequestV1
-from ..llm import generate_freecad_script_for_planetary
+from .pool import run_oneshot
 from .script_host import build_exec_env
 from .service import detect_freecad
-from .subprocess_runner import run_subprocess_with_timeout
-
 
 logger = get_logger(__name__)
 
@@ -29,12 +28,47 @@ def validate_script_security(script: str) -> None:
             raise ValueError(f"Üretilen script yasak modül içeriyor: {pattern}")
 
 
-def build_freecad_python(script_body: str) -> str:
-    # Tek recompute ve FCStd kaydı
+# Doğrulama eşiği: üretilen montajda en az bu kadar nesne olmalı
+MIN_OBJECTS = 5
+
+# Bellekteki belgeyi kaydetmeden önce doğrular; metrikler tek satır JSON olarak yazılır
+_INLINE_VALIDATION = """
+_objs = App.ActiveDocument.Objects
+_solids = 0
+_volume = 0.0
+_invalid = 0
+for _o in _objs:
+    _shape = getattr(_o, 'Shape', None)
+    if _shape is None or _shape.isNull():
+        continue
+    if not _shape.isValid():
+        _invalid += 1
+    _solids += len(_shape.Solids)
+    _volume += sum(_s.Volume for _s in _shape.Solids)
+_validation = {
+    'obj_count': len(_objs),
+    'solids': _solids,
+    'volume_mm3': round(_volume, 3),
+    'invalid_shapes': _invalid,
+}
+print('VALIDATION=' + json.dumps(_validation))
+if _validation['obj_count'] < MIN_OBJECTS:
+    raise RuntimeError('Nesne sayısı eşik altında')
+if _solids == 0 or _volume <= 0:
+    raise RuntimeError('Geçerli katı/hacim bulunamadı')
+"""
+
+
+def build_freecad_python(script_body: str, validate: bool = True) -> str:
+    """Tek recompute ve FCStd kaydı. validate=True ise belge aynı yorumlayıcıda, kaydetmeden önce
+    doğrulanır (nesne sayısı, katılar, hacim); ayrı bir açma + recompute süreci gerekmez.
+    """
+    validation = _INLINE_VALIDATION.replace("MIN_OBJECTS", str(MIN_OBJECTS)) if validate else ""
     return f"""
 import sys
 import time
 import os
+import json
 import Part
 import App
 doc = App.newDocument('Assembly')
@@ -43,6 +77,7 @@ start=time.time()
 {script_body}
 
 App.ActiveDocument.recompute()
+{validation}
 out_fcstd = os.environ.get('OUT_FCSTD')
 if not out_fcstd:
     raise RuntimeError('OUT_FCSTD tanımlı değil')
@@ -53,8 +88,25 @@ sys.exit(0)
 """
 
 
+def parse_run_metrics(stdout: str) -> Dict:
+    """Betik çıktısındaki ELAPSED_MS ve VALIDATION satırlarını metriklere çevirir."""
+    out: Dict = {}
+    for line in stdout.splitlines():
+        if line.startswith("ELAPSED_MS="):
+            out["script_ms"] = int(line.split("=", 1)[1])
+        elif line.startswith("VALIDATION="):
+            try:
+                out.update(json.loads(line.split("=", 1)[1]))
+            except ValueError:
+                pass
+    return out
+
+
 def build_freecad_validation() -> str:
-    return """
+    """Kaydedilmiş bir FCStd'yi yeniden açıp doğrular (eski iki
+    aşamalı akış / harici dosyalar için).
+    """
+    return f"""
 import sys, os, App
 path=os.environ.get('OUT_FCSTD')
 if not path: raise RuntimeError('OUT_FCSTD yok')
@@ -62,7 +114,7 @@ doc=App.openDocument(path)
 App.ActiveDocument.recompute()
 obj_count=len(App.ActiveDocument.Objects)
 print('OBJ_COUNT='+str(obj_count))
-if obj_count < 5:
+if obj_count < {MIN_OBJECTS}:
     raise RuntimeError('Nesne sayısı eşik altında')
 sys.exit(0)
 """
@@ -81,24 +133,17 @@ def generate_and_validate(req: AssemblyRequestV1, pid_file: Optional[str] = None
     full_script = build_freecad_python(script_body)
     out_dir = Path(tempfile.mkdtemp())
     out_fcstd = out_dir / "assembly.fcstd"
+    # Üretim ve doğrulama tek oturumda: belge kaydedilmeden önce bellekte doğrulanır
     run_res = run_freecad_cmd(fc.path, full_script, out_fcstd, settings.freecad_timeout_seconds, pid_file=pid_file)
     if run_res["returncode"] != 0:
-        raise RuntimeError(f"FreeCADCmd üretim hatası: {run_res['stderr']}")
-    # Doğrulama
-    val_script = build_freecad_validation()
-    val_res = run_freecad_cmd(fc.path, val_script, out_fcstd, 120, pid_file=pid_file)
-    if val_res["returncode"] != 0:
-        raise RuntimeError(f"FreeCADCmd doğrulama hatası: {val_res['stderr']}")
-    return out_fcstd, {"elapsed_ms": run_res["elapsed_ms"], "validation_ms": val_res["elapsed_ms"]}
+        raise RuntimeError(f"FreeCADCmd üretim/doğrulama hatası: {run_res['stderr']}")
+    return out_fcstd, {"elapsed_ms": run_res["elapsed_ms"], **parse_run_metrics(run_res["stdout"])}
 
 
 def run_freecad_cmd(freecad_path: str, script: str, out_fcstd: Path, timeout: int, pid_file: Optional[str] = None) -> dict:
-    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".py")
-    tmp.write(script.encode("utf-8"))
-    tmp.close()
-    env = os.environ.copy()
-    env["OUT_FCSTD"] = str(out_fcstd)
-    res = run_subprocess_with_timeout([freecad_path, tmp.name], timeout_seconds=timeout, env=env, pid_file=pid_file)
+    # LLM üretimi betik güvenilmez: paylaşılan sıcak havuza (sonraki işlere sızabilecek
+    # yorumlayıcı durumu) girmez, her çalıştırma yeni bir FreeCADCmd sürecindedir
+    res = run_oneshot(
+        freecad_path, script, {"OUT_FCSTD": str(out_fcstd)}, timeout, pid_file=pid_file
+    )
     return {"returncode": res.returncode, "stdout": res.stdout, "stderr": res.stderr, "elapsed_ms": res.elapsed_ms}
-
-
@@ -2,7 +2,13 @@ from __future__ import annotations
 
 import json
 import os
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from ..logging_setup import get_logger
+
+logger = get_logger(__name__)
 
 
 def _ensure_mm():
@@ -65,19 +71,47 @@ def _add_contour(doc, job, base, tc, params):
     return op
 
 
-def _add_drill(doc, job, base, tc, params):
+def _drill_op(doc, job, base, tc, params, name, locations):
     from PathScripts import PathDrilling  # type: ignore
 
-    op = PathDrilling.Create("Drill", job)
+    op = PathDrilling.Create(name, job)
     op.setEditorProperty("Base", [(base, ("Face1",))])
     op.setEditorProperty("ToolController", tc)
     peck = float(params.get("peck", 0.0))
     if peck > 0:
         op.setEditorProperty("PeckDepth", peck)
+    if locations:
+        import FreeCAD as App  # type: ignore
+
+        op.Locations = [App.Vector(float(x), float(y), 0.0) for x, y in locations]
     doc.recompute()
     return op
 
 
+def _drill_xy(op):
+    from ..cam.sequencing import cycle_locations
+
+    return cycle_locations((c.Name, c.Parameters) for c in op.Path.Commands)
+
+
+def _add_drill(doc, job, base, tc, params):
+    """Sıralı delik konumlarıyla (cam_plan sequencing) delme op'u. FreeCAD konumları kendi
+    sırasına dizebildiğinden (PathUtils.sort_locations) üretilen yol okunur; sıra bozulmuşsa op
+    silinir ve her konum için ayrı bir op yazılır (aynı ToolController, takım değişimi yok).
+    """
+    from ..cam.sequencing import same_order
+
+    locations = params.get("locations") or []
+    op = _drill_op(doc, job, base, tc, params, "Drill", locations)
+    if len(locations) < 2 or same_order(_drill_xy(op), locations):
+        return op
+    doc.removeObject(op.Name)
+    return [
+        _drill_op(doc, job, base, tc, params, f"Drill_{k + 1:03d}", [loc])
+        for k, loc in enumerate(locations)
+    ]
+
+
 def _add_chamfer(doc, job, base, tc, params):
     from PathScripts import PathChamfer  # type: ignore
 
@@ -89,12 +123,80 @@ def _add_chamfer(doc, job, base, tc, params):
     return op
 
 
+_OP_BUILDERS = {
+    "face": _add_face,
+    "contour": _add_contour,
+    "drill": _add_drill,
+    "chamfer": _add_chamfer,
+}
+
+DEFAULT_FEEDS = {"rpm": 10000, "feed": 600, "plunge": 150}
+
+
+def _op_feeds(db, cam: Dict[str, Any], op: Dict[str, Any]) -> Dict[str, Any]:
+    if db is None:
+        return dict(DEFAULT_FEEDS)
+    tool = op["tool"]
+    try:
+        from ..services.cutting import pick_cut  # type: ignore
+
+        dia = float(tool.get("dia", 6.0))
+        cut = pick_cut(
+            db,
+            cam.get("material", "Al6061"),
+            tool.get("type", "endmill_flat"),
+            dia,
+            op.get("type", ""),
+        )
+        return {"rpm": cut["rpm"], "feed": cut["feed"], "plunge": cut["plunge"]}
+    except Exception:
+        return dict(DEFAULT_FEEDS)
+
+
+def _op_seconds(op, machine) -> float:
+    """Operasyonun Path komutlarından tahmini hareket süresi (takım değişimi hariç)."""
+    from ..cam.cycle_time import estimate_cycle_time
+    from ..gcode.tokenizer import parse_moves
+
+    moves = parse_moves("\n".join(c.toGCode() for c in op.Path.Commands))
+    # FreeCAD Path ilerlemeleri mm/s tutar; postlar mm/dk'ya çevirir
+    moves["f"] *= 60.0
+    return round(estimate_cycle_time(moves, machine).total_s, 1)
+
+
+def _ops_seconds(created_ops: Sequence[Any], machine) -> Optional[float]:
+    """Bir plan op'unun ürettiği Path op'larının toplam tahmini süresi; herhangi biri tahmin
+    edilemezse None (0 s eksik tahmini gerçek bir süre gibi raporlanmasın).
+    """
+    est = 0.0
+    for c in created_ops:
+        try:
+            est += _op_seconds(c, machine)
+        except Exception as e:
+            logger.warning(
+                "Op süresi tahmin edilemedi",
+                extra={"op": getattr(c, "Label", "?"), "error": str(e)},
+            )
+            return None
+    return round(est, 1)
+
+
+def _total_seconds(ops_summary: List[Dict[str, Any]], tool_change_s: float) -> Optional[float]:
+    """Op sürelerinin ve takım değişimlerinin toplamı; bilinmeyen op varsa toplam da None."""
+    if any(o["est_seconds"] is None for o in ops_summary):
+        return None
+    return round(sum(o["est_seconds"] for o in ops_summary) + tool_change_s, 1)
+
+
 def build_cam_job(fcstd_path: str, cam: Dict[str, Any], stock: Dict[str, Any], wcs: str, post_name: str | None, tmpdir: str, db=None):
     _ensure_mm()
     import FreeCAD as App  # type: ignore
     import Path  # type: ignore
     from PathScripts import PathJob  # type: ignore
 
+    from ..cam.cycle_time import MachineLimits
+    from ..cam.op_order import controller_key, order_ops
+
     doc = App.openDocument(fcstd_path)
     try:
         doc.recompute()
@@ -110,43 +212,66 @@ def build_cam_job(fcstd_path: str, cam: Dict[str, Any], stock: Dict[str, Any], w
         job.SetupSheet.setEditorProperty("Output", "GCode")
         job.SetupSheet.setEditorProperty("WCS", wcs)
 
+        machine = MachineLimits.from_settings(cam.get("machine"))
+        ops = [op for op in cam.get("ops", []) if op.get("type") in _OP_BUILDERS]
+        op_feeds = [_op_feeds(db, cam, op) for op in ops]
+        keys = [controller_key(op, f) for op, f in zip(ops, op_feeds)]
+        plan = order_ops([op["type"] for op in ops], keys)
+        # Aynı (takım, çap, ilerlemeler) anahtarlı op'lar tek ToolController'ı paylaşır
+        controllers: Dict[Any, Any] = {}
         ops_summary = []
-        for op in cam.get("ops", []):
-            tool = op["tool"]
-            tb = _mk_toolbit(tmpdir, tool)
-            if db is not None:
-                try:
-                    from ..services.cutting import pick_cut  # type: ignore
-
-                    dia = float(tool.get("dia", 6.0))
-                    cut = pick_cut(db, cam.get("material", "Al6061"), tool.get("type", "endmill_flat"), dia, op.get("type", ""))
-                    feeds = {"rpm": cut["rpm"], "feed": cut["feed"], "plunge": cut["plunge"]}
-                except Exception:
-                    feeds = {"rpm": 10000, "feed": 600, "plunge": 150}
-            else:
-                feeds = {"rpm": 10000, "feed": 600, "plunge": 150}
-            tc = _mk_tc(doc, tb, feeds["rpm"], feeds["feed"], feeds["plunge"])
-            t = op["type"]
-            if t == "face":
-                created = _add_face(doc, job, base, tc, op["params"])
-            elif t == "contour":
-                created = _add_contour(doc, job, base, tc, op["params"])
-            elif t == "drill":
-                created = _add_drill(doc, job, base, tc, op["params"])
-            elif t == "chamfer":
-                created = _add_chamfer(doc, job, base, tc, op["params"])
-            else:
-                continue
-            ops_summary.append({"name": created.Label, "type": t, "est_seconds": 0.0})
+        # Gerçek delme yolu (op çalışma sırasıyla); sıralama kazancı buradan ölçülür
+        drill_xy = []
+        for i in plan.order:
+            op, feeds, key = ops[i], op_feeds[i], keys[i]
+            tc = controllers.get(key)
+            if tc is None:
+                tb = _mk_toolbit(tmpdir, op["tool"])
+                tc = controllers[key] = _mk_tc(
+                    doc, tb, feeds["rpm"], feeds["feed"], feeds["plunge"]
+                )
+            created = _OP_BUILDERS[op["type"]](doc, job, base, tc, op["params"])
+            # Delme op'u sırayı korumak için birden çok op'a bölünmüş olabilir
+            created_ops = created if isinstance(created, list) else [created]
+            if op["type"] == "drill":
+                drill_xy.extend(_drill_xy(c) for c in created_ops)
+            summary = {
+                "name": created_ops[0].Label,
+                "type": op["type"],
+                "est_seconds": _ops_seconds(created_ops, machine),
+            }
+            if len(created_ops) > 1:
+                summary["split_ops"] = len(created_ops)
+            ops_summary.append(summary)
 
         doc.recompute()
         doc.save()
+        est_total = _total_seconds(ops_summary, plan.tool_changes_after * machine.tool_change_s)
+        op_order = plan.as_dict()
         # basit özet json
         jpath = os.path.join(tmpdir, "job_summary.json")
         with open(jpath, "w", encoding="utf-8") as f:
-            json.dump({"ops": ops_summary, "wcs": wcs, "stock": stock}, f, ensure_ascii=False, indent=2)
-        return {"ops": ops_summary, "job_json": jpath, "svg": ""}
+            json.dump(
+                {
+                    "ops": ops_summary,
+                    "est_total_s": est_total,
+                    "op_order": op_order,
+                    "wcs": wcs,
+                    "stock": stock,
+                },
+                f,
+                ensure_ascii=False,
+                indent=2,
+            )
+        out = {
+            "ops": ops_summary,
+            "est_total_s": est_total,
+            "op_order": op_order,
+            "job_json": jpath,
+            "svg": "",
+        }
+        if drill_xy:
+            out["drill_xy"] = np.concatenate(drill_xy)
+        return out
     finally:
         App.closeDocument(doc.Name)
-
-
@@ -0,0 +1,375 @@
+from __future__ import annotations
+
+import json
+import os
+import platform
+import queue
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+
+from ..logging_setup import get_logger
+from ..metrics import freecad_pool_events_total
+from ..settings import app_settings as appset
+from .subprocess_runner import RunResult, _kill_tree, run_subprocess_with_timeout
+
+logger = get_logger(__name__)
+
+# Sunucunun her yanıt satırının öneki; FreeCAD'in kendi konsol çıktısından ayırmak için
+REPLY_PREFIX = "@@FCPOOL@@"
+# FreeCADCmd açılışını (modül/çalışma tezgâhı yükleme) bekleme süresi
+START_TIMEOUT_S = 120
+
+# FreeCADCmd içinde çalışan sunucu: stdin'den JSON istek satırları okur, her betiği boş bir belge
+# kümesiyle ve istekteki ortam değişkenleriyle çalıştırır, sonucu tek JSON satırı olarak yazar.
+HOST_SCRIPT = r"""
+import io, json, os, sys, traceback
+try:
+    import resource
+except ImportError:
+    resource = None
+import FreeCAD as App
+
+PREFIX = "@@FCPOOL@@"
+out = sys.__stdout__
+
+
+def _close_all():
+    for name in list(App.listDocuments().keys()):
+        try:
+            App.closeDocument(name)
+        except Exception:
+            pass
+
+
+def _reply(msg):
+    out.write(PREFIX + json.dumps(msg) + "\n")
+    out.flush()
+
+
+_reply({"ready": True, "pid": os.getpid()})
+for raw in sys.stdin:
+    if not raw.strip():
+        continue
+    req = json.loads(raw)
+    saved_env = dict(os.environ)
+    os.environ.update(req.get("env") or {})
+    buf_out, buf_err = io.StringIO(), io.StringIO()
+    sys.stdout, sys.stderr = buf_out, buf_err
+    code = 0
+    _close_all()
+    try:
+        exec(compile(req["script"], "<freecad-pool>", "exec"), {"__name__": "__main__"})
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        if not isinstance(e.code, (int, type(None))):
+            buf_err.write(str(e.code))
+    except BaseException:
+        code = 1
+        traceback.print_exc(file=buf_err)
+    finally:
+        sys.stdout, sys.stderr = sys.__stdout__, sys.__stderr__
+        _close_all()
+        os.environ.clear()
+        os.environ.update(saved_env)
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else 0
+    _reply({
+        "id": req["id"],
+        "returncode": code,
+        "stdout": buf_out.getvalue(),
+        "stderr": buf_err.getvalue(),
+        "rss_kb": rss_kb,
+    })
+"""
+
+
+class WorkerDied(RuntimeError):
+    pass
+
+
+class FreeCADWorker:
+    """Uzun ömürlü tek bir FreeCADCmd yorumlayıcısı. Yanıtlar ayrı bir okuyucu iş parçacığıyla
+    kuyruğa alınır; böylece zaman aşımı select/platform farkı olmadan uygulanır.
+    """
+
+    def __init__(self, freecad_path: str) -> None:
+        fd, self.host_path = tempfile.mkstemp(suffix="_fcpool.py")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(HOST_SCRIPT)
+        self.stderr_file = tempfile.TemporaryFile(mode="w+")
+        windows = platform.system().lower() == "windows"
+        self.proc = subprocess.Popen(
+            [freecad_path, self.host_path],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=self.stderr_file,
+            text=True,
+            bufsize=1,
+            start_new_session=not windows,
+            creationflags=subprocess.CREATE_NEW_PROCESS_GROUP if windows else 0,
+        )
+        self.jobs = 0
+        self.rss_kb = 0
+        self.replies: "queue.Queue[Optional[Dict]]" = queue.Queue()
+        threading.Thread(target=self._read, daemon=True).start()
+        try:
+            ready = self._next(START_TIMEOUT_S)
+        except TimeoutError:
+            ready = None
+        if not ready or not ready.get("ready"):
+            self.close()
+            raise WorkerDied("FreeCAD çalışanı başlatılamadı")
+
+    def _read(self) -> None:
+        assert self.proc.stdout is not None
+        for line in self.proc.stdout:
+            if line.startswith(REPLY_PREFIX):
+                try:
+                    self.replies.put(json.loads(line[len(REPLY_PREFIX) :]))
+                except ValueError:
+                    pass
+        self.replies.put(None)  # EOF: süreç kapandı
+
+    def _next(self, timeout: float) -> Optional[Dict]:
+        try:
+            return self.replies.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError
+
+    @property
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def run(self, script: str, env: Dict[str, str], timeout: float) -> Dict:
+        rid = uuid.uuid4().hex
+        try:
+            assert self.proc.stdin is not None
+            self.proc.stdin.write(json.dumps({"id": rid, "script": script, "env": env}) + "\n")
+            self.proc.stdin.flush()
+        except (BrokenPipeError, OSError):
+            raise WorkerDied("FreeCAD çalışanı kapalı")
+        deadline = time.monotonic() + timeout
+        while True:
+            msg = self._next(max(0.0, deadline - time.monotonic()))
+            if msg is None:
+                raise WorkerDied("FreeCAD çalışanı beklenmedik şekilde kapandı")
+            if msg.get("id") == rid:
+                self.jobs += 1
+                self.rss_kb = int(msg.get("rss_kb") or 0)
+                return msg
+
+    def close(self) -> None:
+        try:
+            if self.alive:
+                _kill_tree(self.proc.pid)
+                self.proc.kill()
+            self.proc.wait(timeout=5)
+        except Exception:
+            pass
+        try:
+            self.stderr_file.close()
+        except Exception:
+            pass
+        try:
+            os.remove(self.host_path)
+        except OSError:
+            pass
+
+
+class FreeCADPool:
+    """Süreç başına sıcak FreeCADCmd havuzu. Çalışanlar tembel başlatılır; 'max_jobs' betikten ya da
+    'max_rss_mb' bellek tepe değerinden sonra, zaman aşımında veya çöktüğünde yenilenir.
+    """
+
+    def __init__(
+        self, freecad_path: str, size: int = 1, max_jobs: int = 50, max_rss_mb: int = 2048
+    ) -> None:
+        self.freecad_path = freecad_path
+        self.size = max(1, size)
+        self.max_jobs = max_jobs
+        self.max_rss_mb = max_rss_mb
+        self.idle: List[FreeCADWorker] = []
+        self.started = 0
+        self.cond = threading.Condition()
+
+    def _acquire(self) -> FreeCADWorker:
+        with self.cond:
+            while True:
+                while self.idle:
+                    w = self.idle.pop()
+                    if w.alive:
+                        return w
+                    self._discard(w, "crash")
+                if self.started < self.size:
+                    self.started += 1
+                    break
+                self.cond.wait()
+        try:
+            w = FreeCADWorker(self.freecad_path)
+        except Exception:
+            with self.cond:
+                self.started -= 1
+                self.cond.notify()
+            raise
+        freecad_pool_events_total.labels(event="start").inc()
+        return w
+
+    def _discard(self, w: FreeCADWorker, reason: str) -> None:
+        # self.cond tutulurken çağrılır
+        w.close()
+        self.started -= 1
+        freecad_pool_events_total.labels(event=reason).inc()
+        self.cond.notify()
+
+    def _release(self, w: FreeCADWorker, reason: Optional[str] = None) -> None:
+        if reason is None and w.jobs >= self.max_jobs:
+            reason = "max_jobs"
+        if reason is None and self.max_rss_mb and w.rss_kb > self.max_rss_mb * 1024:
+            reason = "max_rss"
+        with self.cond:
+            if reason:
+                self._discard(w, reason)
+            else:
+                self.idle.append(w)
+                self.cond.notify()
+
+    def run(
+        self,
+        script: str,
+        env: Optional[Dict[str, str]] = None,
+        timeout: float = 600,
+        pid_file: Optional[str] = None,
+    ) -> RunResult:
+        """Betiği boş belge kümesiyle bir çalışanda yürütür. pid_file, iş iptali için çalışanın
+        pid'ini taşır (iptal süreç grubunu öldürür; çalışan çöktü sayılıp yenilenir).
+        """
+        start = time.time()
+        w = self._acquire()
+        if pid_file:
+            try:
+                with open(pid_file, "w", encoding="utf-8") as f:
+                    f.write(str(w.proc.pid))
+            except Exception:
+                pass
+        reason: Optional[str] = None
+        try:
+            msg = w.run(script, env or {}, timeout)
+            return RunResult(
+                returncode=int(msg.get("returncode", 1)),
+                stdout=msg.get("stdout", ""),
+                stderr=msg.get("stderr", ""),
+                elapsed_ms=int((time.time() - start) * 1000),
+                timed_out=False,
+            )
+        except TimeoutError:
+            reason = "timeout"
+            return RunResult(
+                returncode=-9,
+                stdout="",
+                stderr="Zaman aşımı",
+                elapsed_ms=int((time.time() - start) * 1000),
+                timed_out=True,
+            )
+        except WorkerDied as e:
+            reason = "crash"
+            return RunResult(
+                returncode=-9,
+                stdout="",
+                stderr=str(e),
+                elapsed_ms=int((time.time() - start) * 1000),
+                timed_out=False,
+            )
+        finally:
+            if pid_file:
+                try:
+                    os.remove(pid_file)
+                except Exception:
+                    pass
+            self._release(w, reason)
+
+    def close(self) -> None:
+        with self.cond:
+            for w in self.idle:
+                w.close()
+            self.idle.clear()
+            self.started = 0
+
+
+_pools: Dict[str, FreeCADPool] = {}
+_pools_lock = threading.Lock()
+
+
+def _reset_after_fork() -> None:
+    # Prefork çocuğu ebeveynin çalışanlarını (boruları) devralmamalı
+    global _pools_lock
+    _pools.clear()
+    _pools_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_pool(freecad_path: str) -> FreeCADPool:
+    with _pools_lock:
+        pool = _pools.get(freecad_path)
+        if pool is None:
+            pool = FreeCADPool(
+                freecad_path,
+                appset.freecad_pool_size,
+                appset.freecad_pool_max_jobs,
+                appset.freecad_pool_max_rss_mb,
+            )
+            _pools[freecad_path] = pool
+        return pool
+
+
+def run_freecad_script(
+    freecad_path: str,
+    script: str,
+    env: Optional[Dict[str, str]] = None,
+    timeout: float = 600,
+    pid_file: Optional[str] = None,
+) -> RunResult:
+    """FreeCAD betiğini havuzdaki sıcak bir yorumlayıcıda çalıştırır. Havuz kapalıysa ya da çalışan
+    başlatılamıyorsa eski yola (betik başına yeni FreeCADCmd süreci) düşer. Yorumlayıcı işler
+    arasında paylaşıldığından yalnızca uygulamanın kendi şablonları için kullanılır; şu an tek
+    çağıran CAM yol şablonudur (path_job). Yoklama ve dışarıdan gelen
+    betikler run_oneshot ile çalıştırılır.
+    """
+    if appset.freecad_pool:
+        try:
+            return get_pool(freecad_path).run(script, env, timeout, pid_file)
+        except WorkerDied as e:
+            logger.warning(
+                "FreeCAD havuzu kullanılamadı, tek seferlik sürece düşülüyor",
+                extra={"error": str(e)},
+            )
+    return run_oneshot(freecad_path, script, env, timeout, pid_file)
+
+
+def run_oneshot(
+    freecad_path: str,
+    script: str,
+    env: Optional[Dict[str, str]] = None,
+    timeout: float = 600,
+    pid_file: Optional[str] = None,
+) -> RunResult:
+    """Betiği yeni bir FreeCADCmd sürecinde çalıştırır (havuz dışı)."""
+    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".py")
+    tmp.write(script.encode("utf-8"))
+    tmp.close()
+    full_env = os.environ.copy()
+    full_env.update(env or {})
+    try:
+        return run_subprocess_with_timeout(
+            [freecad_path, tmp.name], timeout_seconds=int(timeout), env=full_env, pid_file=pid_file
+        )
+    finally:
+        try:
+            os.remove(tmp.name)
+        except OSError:
+            pass
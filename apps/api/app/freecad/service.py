@@ -6,7 +6,6 @@ from typing import Optional
 
 from ..config import settings
 from ..schemas import FreeCADDetectResponse
-from ..logging_setup import get_logger
 from .subprocess_runner import run_subprocess_with_timeout
 
 
@@ -51,14 +50,10 @@ def check_asm4_available(path: str) -> Optional[bool]:
     return None
 
 
-def detect_freecad() -> FreeCADDetectResponse:
-    path = find_freecadcmd_path()
-    if not path:
-        return FreeCADDetectResponse(found=False, message="FreeCADCmd bulunamadı")
-    version = get_freecad_version(path)
-    asm4 = check_asm4_available(path) if settings.freecad_asm4_required else None
-    logger = get_logger(__name__)
-    logger.info("FreeCADCmd tespit edildi", extra={"freecad_version": version})
-    return FreeCADDetectResponse(found=True, path=path, version=version, asm4_available=asm4)
-
+def detect_freecad(refresh: bool = False) -> FreeCADDetectResponse:
+    """FreeCADCmd yolu, sürümü ve Asm4 durumu. Sonuç düğüm başına yetenek kaydından gelir
+    (bkz. capabilities.get_capabilities); her çağrıda süreç başlatılmaz.
+    """
+    from .capabilities import get_capabilities
 
+    return get_capabilities(refresh=refresh).to_detect_response()
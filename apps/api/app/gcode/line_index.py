@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple, Union
+
+INDEX_VERSION = 1
+# Her STRIDE satırda bir bayt ofseti tutulur: 1,2 M satırlık program için ~2400 sayı,
+# bir aralık isteği en fazla STRIDE fazladan satır indirir
+STRIDE = 512
+# Tek istekte dönülebilecek en fazla satır
+MAX_RANGE_LINES = 5000
+
+_OP_COMMENT = re.compile(rb"\(\s*begin operation:\s*([^)]*?)\s*\)", re.IGNORECASE)
+
+
+def build_line_index(path: Union[str, Path], stride: int = STRIDE) -> Dict:
+    """G-code dosyasını bir kez akışla okuyup satır → bayt ofseti dizinini çıkarır.
+    offsets[k], (k·stride + 1). satırın başlangıç baytıdır; ops, '(Begin operation: X)' yorumlarının
+    satır/ofset listesidir. Satır numaraları 1 tabanlıdır; sha256 dizinin ait olduğu dosyayı bağlar.
+    """
+    offsets: List[int] = []
+    ops: List[Dict] = []
+    h = hashlib.sha256()
+    pos = 0
+    n = 0
+    with open(path, "rb") as f:
+        for line in f:
+            if n % stride == 0:
+                offsets.append(pos)
+            n += 1
+            if b"(" in line:
+                m = _OP_COMMENT.search(line)
+                if m:
+                    ops.append(
+                        {"name": m.group(1).decode("utf-8", "ignore"), "line": n, "offset": pos}
+                    )
+            h.update(line)
+            pos += len(line)
+    return {
+        "version": INDEX_VERSION,
+        "stride": stride,
+        "lines": n,
+        "size": pos,
+        "sha256": h.hexdigest(),
+        "offsets": offsets,
+        "ops": ops,
+    }
+
+
+def write_line_index(gcode_path: Path, stride: int = STRIDE) -> Path:
+    """Dizini G-code dosyasının yanına '<ad>.idx.json' olarak yazar."""
+    idx = build_line_index(gcode_path, stride)
+    out = gcode_path.with_name(gcode_path.name + ".idx.json")
+    out.write_text(json.dumps(idx, separators=(",", ":")), encoding="utf-8")
+    return out
+
+
+def byte_range(index: Dict, start: int, count: int) -> Tuple[int, int, int]:
+    """[start, start+count) satırlarını kapsayan bayt aralığı (bas, son hariç) ve aralığın başında
+    atlanacak satır sayısı. Aralık istenen satırların önündeki en yakın dizin noktasından başlar,
+    arkasındaki ilk dizin noktasında (ya da dosya sonunda) biter.
+    """
+    stride = int(index["stride"])
+    offsets = index["offsets"]
+    first = start - 1
+    last = min(first + count, int(index["lines"]))
+    k0 = first // stride
+    k1 = -(-last // stride)
+    lo = offsets[k0]
+    hi = offsets[k1] if k1 < len(offsets) else int(index["size"])
+    return lo, hi, first - k0 * stride
+
+
+def read_lines(
+    fetch: Callable[[int, int], bytes], index: Dict, start: int, count: int
+) -> Tuple[List[str], int]:
+    """'fetch(bas, son)' ile yalnızca gereken baytları alıp [start, start+count) satırlarını
+    döndürür. İkinci değer aktarılan bayt sayısıdır.
+    """
+    if start < 1 or count < 1 or start > int(index["lines"]):
+        return [], 0
+    lo, hi, skip = byte_range(index, start, count)
+    data = fetch(lo, hi) if hi > lo else b""
+    lines = data.split(b"\n")[skip : skip + min(count, int(index["lines"]) - start + 1)]
+    return [ln.rstrip(b"\r").decode("utf-8", "ignore") for ln in lines], len(data)
@@ -0,0 +1,398 @@
+from __future__ import annotations
+
+import math
+import re
+import warnings
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+# Hareket tablosu satır tipleri
+RAPID = 0
+LINEAR = 1
+ARC_CW = 2
+ARC_CCW = 3
+TOOL_CHANGE = 6
+
+MOTION_TYPES = (RAPID, LINEAR, ARC_CW, ARC_CCW)
+
+# Yay düzlemi (G17/G18/G19) modal kodları
+PLANE_XY = 17
+PLANE_ZX = 18
+PLANE_YZ = 19
+PLANES = (PLANE_XY, PLANE_ZX, PLANE_YZ)
+
+MOVE_DTYPE = np.dtype(
+    [
+        ("type", np.int8),
+        ("x", np.float64),
+        ("y", np.float64),
+        ("z", np.float64),
+        ("i", np.float64),
+        ("j", np.float64),
+        ("k", np.float64),
+        ("r", np.float64),
+        ("plane", np.int8),
+        ("f", np.float64),
+        ("tool", np.int16),
+        ("line_no", np.int32),
+    ]
+)
+
+INCH_MM = 25.4
+# Akış modunda tek seferde ayrıştırılan metin bloğu (karakter)
+CHUNK_CHARS = 1 << 22
+
+_WORD = re.compile(r"([A-Z])\s*([-+]?(?:\d+\.?\d*|\.\d+))")
+_COMMENT = re.compile(r"\([^)]*\)|;.*")
+_COMMENT_ML = re.compile(r"\([^)\n]*\)|;[^\n]*")
+
+# Hızlı yol için bayt sınıfları
+_NUMCHAR = np.zeros(256, dtype=bool)
+_NUMCHAR[[ord(c) for c in "0123456789.+-"]] = True
+_BLANK = np.zeros(256, dtype=bool)
+_BLANK[[ord(" "), ord("\t"), ord("\r")]] = True
+_KEEPNUM = bytes(b if _NUMCHAR[b] else ord(" ") for b in range(256))
+
+_G, _F, _I, _J, _K, _M, _R, _T, _X, _Y, _Z = (ord(c) - 64 for c in "GFIJKMRTXYZ")
+
+
+@dataclass
+class ModalState:
+    """Satırlar/bloklar arasında taşınan modal durum. Konumlar mm
+    ve mutlak; bilinmeyen eksen NaN.
+    """
+
+    motion: Optional[int] = None
+    plane: int = PLANE_XY
+    absolute: bool = True
+    inch: bool = False
+    units_seen: bool = False
+    pos: List[float] = field(default_factory=lambda: [math.nan, math.nan, math.nan])
+    feed: float = math.nan
+    tool: int = 0
+
+
+@dataclass
+class Block:
+    """Tek bir G-code satırının ayrıştırılmış hali (modal durum uygulanmış)."""
+
+    line_no: int
+    text: str
+    words: List[Tuple[str, float]]
+    kind: Optional[int] = None  # hareket satırı ise tablo tipi
+    tool_change: bool = False
+    end: Tuple[float, float, float] = (math.nan, math.nan, math.nan)
+    ij: Tuple[float, float] = (math.nan, math.nan)
+    k: float = math.nan
+    r: float = math.nan  # R biçimli yay yarıçapı (negatif: 180°'den büyük yay)
+    plane: int = PLANE_XY
+
+
+def _iter_lines(source: Union[str, bytes, Iterable]) -> Iterator[str]:
+    if isinstance(source, bytes):
+        source = source.decode("utf-8", "ignore")
+    if isinstance(source, str):
+        yield from source.splitlines()
+        return
+    for ln in source:
+        yield ln.decode("utf-8", "ignore") if isinstance(ln, bytes) else ln
+
+
+# Modal durum bayraklarını değiştiren G kodları: (alan, değer) çiftleri
+_G_MODAL = {
+    90: (("absolute", True),),
+    91: (("absolute", False),),
+    20: (("inch", True), ("units_seen", True)),
+    21: (("inch", False), ("units_seen", True)),
+}
+
+
+def _apply_g(st: ModalState, v: float) -> None:
+    g = int(v) if v == int(v) else -1
+    if g in MOTION_TYPES:
+        st.motion = g
+    elif g in PLANES:
+        st.plane = g
+    for attr, val in _G_MODAL.get(g, ()):
+        setattr(st, attr, val)
+
+
+def _read_words(st: ModalState, blk: Block) -> Tuple[Dict[str, float], Optional[float]]:
+    """Satırın kelimelerini modal duruma uygular; (eksen/yay kelimeleri, F) döndürür."""
+    axes: Dict[str, float] = {}
+    feed: Optional[float] = None
+    for w, v in blk.words:
+        if w == "G":
+            _apply_g(st, v)
+        elif w in ("X", "Y", "Z", "I", "J", "K", "R"):
+            axes[w] = v
+        elif w == "F":
+            feed = v
+        elif w == "T":
+            st.tool = int(v)
+        elif w == "M" and v == 6:
+            blk.tool_change = True
+    return axes, feed
+
+
+def _apply_motion(st: ModalState, blk: Block, axes: Dict[str, float], scale: float) -> None:
+    """Eksen kelimesi olan hareket satırında konumu ilerletir ve yay parametrelerini doldurur."""
+    if st.motion is None or not ("X" in axes or "Y" in axes or "Z" in axes):
+        return
+    for a, k in enumerate(("X", "Y", "Z")):
+        if k in axes:
+            v = axes[k] * scale
+            st.pos[a] = v if st.absolute else st.pos[a] + v
+    blk.kind = st.motion
+    if st.motion in (ARC_CW, ARC_CCW):
+        blk.ij = (axes.get("I", 0.0) * scale, axes.get("J", 0.0) * scale)
+        blk.k = axes.get("K", 0.0) * scale
+        blk.r = axes["R"] * scale if "R" in axes else math.nan
+
+
+def iter_blocks(
+    source: Union[str, bytes, Iterable], state: Optional[ModalState] = None, line0: int = 0
+) -> Iterator[Block]:
+    """Satır satır akışlı ayrıştırıcı (referans yol). Dosya nesnesi de verilebilir."""
+    st = state or ModalState()
+    for line_no, raw in enumerate(_iter_lines(source), start=line0 + 1):
+        ln = raw.strip().upper()
+        if not ln:
+            continue
+        code = _COMMENT.sub(" ", ln) if ("(" in ln or ";" in ln) else ln
+        blk = Block(line_no=line_no, text=ln, words=[(w, float(v)) for w, v in _WORD.findall(code)])
+        if not blk.words:
+            yield blk
+            continue
+        axes, feed = _read_words(st, blk)
+        scale = INCH_MM if st.inch else 1.0
+        if feed is not None:
+            st.feed = feed * scale
+        _apply_motion(st, blk, axes, scale)
+        blk.plane = st.plane
+        blk.end = (st.pos[0], st.pos[1], st.pos[2])
+        yield blk
+
+
+def _rows_from_blocks(text: str, st: ModalState, line0: int) -> np.ndarray:
+    rows = []
+    for blk in iter_blocks(text, st, line0):
+        if blk.tool_change:
+            rows.append(
+                (
+                    TOOL_CHANGE,
+                    *blk.end,
+                    math.nan,
+                    math.nan,
+                    math.nan,
+                    math.nan,
+                    blk.plane,
+                    st.feed,
+                    st.tool,
+                    blk.line_no,
+                )
+            )
+        if blk.kind is not None:
+            rows.append(
+                (
+                    blk.kind,
+                    *blk.end,
+                    *blk.ij,
+                    blk.k,
+                    blk.r,
+                    blk.plane,
+                    st.feed,
+                    st.tool,
+                    blk.line_no,
+                )
+            )
+    return np.array(rows, dtype=MOVE_DTYPE)
+
+
+def _last_per_line(lines: np.ndarray, vals: np.ndarray, n: int) -> np.ndarray:
+    out = np.full(n, np.nan)
+    if len(lines):
+        ul, ui = np.unique(lines[::-1], return_index=True)
+        out[ul] = vals[::-1][ui]
+    return out
+
+
+def _ffill(a: np.ndarray, init: float) -> np.ndarray:
+    idx = np.where(np.isnan(a), -1, np.arange(len(a)))
+    np.maximum.accumulate(idx, out=idx)
+    return np.where(idx >= 0, a[np.maximum(idx, 0)], init)
+
+
+def _tokens(text: str) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray, int]]:
+    """Metni (harf kodu, değer, satır) dizilerine vektörel olarak
+    ayırır; desteklenmeyen içerikte None.
+    """
+    if "#" in text or "[" in text:
+        return None  # makro/parametrik programlar referans yoldan geçer
+    if "(" in text or ";" in text:
+        text = _COMMENT_ML.sub(" ", text)
+    raw = text.upper().encode("utf-8", "ignore")
+    if not raw:
+        return np.empty(0, np.int64), np.empty(0), np.empty(0, np.int64), 0
+    data = np.frombuffer(raw, dtype=np.uint8)
+    isnum = _NUMCHAR[data]
+    head = isnum.copy()
+    head[1:] &= ~isnum[:-1]
+    starts = np.flatnonzero(head)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        try:
+            vals = np.fromstring(raw.translate(_KEEPNUM).decode("ascii"), dtype=np.float64, sep=" ")
+        except (ValueError, DeprecationWarning):
+            return None
+    if len(vals) != len(starts):
+        return None
+    last = np.where(_BLANK[data], -1, np.arange(len(data)))
+    np.maximum.accumulate(last, out=last)
+    prev = np.where(starts > 0, last[np.maximum(starts - 1, 0)], -1)
+    letter = np.where(prev >= 0, data[np.maximum(prev, 0)], 0).astype(np.int64)
+    ok = (letter >= 65) & (letter <= 90)
+    nl = np.cumsum(data == 10)
+    n_lines = int(nl[-1]) + (0 if raw.endswith(b"\n") else 1)
+    return letter[ok] - 64, vals[ok], nl[starts[ok]], n_lines
+
+
+def _rows_vectorized(text: str, st: ModalState, line0: int) -> Optional[np.ndarray]:
+    tok = _tokens(text)
+    if tok is None:
+        return None
+    code, val, line, n = tok
+    if n == 0:
+        return np.empty(0, dtype=MOVE_DTYPE)
+
+    def sel(c: int) -> Tuple[np.ndarray, np.ndarray]:
+        m = code == c
+        return line[m], val[m]
+
+    gl, gv = sel(_G)
+    mot = np.isin(gv, MOTION_TYPES)
+    motion = _ffill(
+        _last_per_line(gl[mot], gv[mot], n), np.nan if st.motion is None else float(st.motion)
+    )
+    pm = np.isin(gv, PLANES)
+    plane = _ffill(_last_per_line(gl[pm], gv[pm], n), float(st.plane)).astype(np.int8)
+    dm = (gv == 90) | (gv == 91)
+    absolute = (
+        _ffill(_last_per_line(gl[dm], (gv[dm] == 90).astype(float), n), float(st.absolute)) > 0.5
+    )
+    um = (gv == 20) | (gv == 21)
+    inch = _ffill(_last_per_line(gl[um], (gv[um] == 20).astype(float), n), float(st.inch)) > 0.5
+    scale = np.where(inch, INCH_MM, 1.0)
+
+    fl, fv = sel(_F)
+    feed = _ffill(_last_per_line(fl, fv, n) * scale, st.feed)
+    tl, tv = sel(_T)
+    tool = _ffill(_last_per_line(tl, tv, n), float(st.tool)).astype(np.int64)
+    ml, mv = sel(_M)
+    m6 = np.zeros(n, dtype=bool)
+    m6[ml[mv == 6]] = True
+
+    known = ~np.isnan(motion)
+    pos = []
+    moving = np.zeros(n, dtype=bool)
+    for a, c in enumerate((_X, _Y, _Z)):
+        al, av = sel(c)
+        v = _last_per_line(al, av, n) * scale
+        has = ~np.isnan(v) & known
+        moving |= has
+        inc = np.cumsum(np.where(has & ~absolute, v, 0.0))
+        base = _ffill(np.where(has & absolute, v - inc, np.nan), st.pos[a])
+        pos.append(np.where(has & absolute, v, base + inc))
+
+    arc = moving & ((motion == ARC_CW) | (motion == ARC_CCW))
+    ijk = []
+    for c in (_I, _J, _K):
+        cl, cv = sel(c)
+        v = _last_per_line(cl, cv, n) * scale
+        ijk.append(np.where(arc, np.nan_to_num(v, nan=0.0), np.nan))
+    rl, rv = sel(_R)
+    rad = np.where(arc, _last_per_line(rl, rv, n) * scale, np.nan)
+
+    keys = np.concatenate([np.flatnonzero(m6) * 2, np.flatnonzero(moving) * 2 + 1])
+    keys.sort(kind="stable")
+    ln = keys // 2
+    is_move = (keys % 2) == 1
+    out = np.empty(len(keys), dtype=MOVE_DTYPE)
+    out["type"] = np.where(is_move, motion[ln], TOOL_CHANGE)
+    out["x"], out["y"], out["z"] = pos[0][ln], pos[1][ln], pos[2][ln]
+    out["i"] = np.where(is_move, ijk[0][ln], np.nan)
+    out["j"] = np.where(is_move, ijk[1][ln], np.nan)
+    out["k"] = np.where(is_move, ijk[2][ln], np.nan)
+    out["r"] = np.where(is_move, rad[ln], np.nan)
+    out["plane"] = plane[ln]
+    out["f"] = feed[ln]
+    out["tool"] = tool[ln]
+    out["line_no"] = ln + line0 + 1
+
+    st.motion = None if np.isnan(motion[-1]) else int(motion[-1])
+    st.plane = int(plane[-1])
+    st.absolute = bool(absolute[-1])
+    st.inch = bool(inch[-1])
+    st.units_seen = st.units_seen or bool(um.any())
+    st.pos = [float(p[-1]) for p in pos]
+    st.feed = float(feed[-1])
+    st.tool = int(tool[-1])
+    return out
+
+
+def _iter_chunks(source: Union[str, bytes, Iterable], chunk_chars: int) -> Iterator[str]:
+    if isinstance(source, bytes):
+        source = source.decode("utf-8", "ignore")
+    if isinstance(source, str):
+        if "\r" in source:
+            source = source.replace("\r\n", "\n").replace("\r", "\n")
+        pos = 0
+        while pos < len(source):
+            cut = source.find("\n", pos + chunk_chars)
+            end = len(source) if cut < 0 else cut + 1
+            yield source[pos:end]
+            pos = end
+        return
+    buf: List[str] = []
+    size = 0
+    for ln in source:
+        if isinstance(ln, bytes):
+            ln = ln.decode("utf-8", "ignore")
+        ln = ln.rstrip("\r\n") + "\n"
+        buf.append(ln)
+        size += len(ln)
+        if size >= chunk_chars:
+            yield "".join(buf)
+            buf, size = [], 0
+    if buf:
+        yield "".join(buf)
+
+
+def parse_moves(
+    source: Union[str, bytes, Iterable],
+    state: Optional[ModalState] = None,
+    chunk_chars: int = CHUNK_CHARS,
+) -> np.ndarray:
+    """G0/G1/G2/G3 (IJK ya da R biçimi, G17/G18/G19 düzlemleri) ve M6 satırlarını tek geçişte
+    MOVE_DTYPE yapılı dizisine dönüştürür. Metin sabit boyutlu bloklar halinde vektörel
+    ayrıştırılır; modal durum bloklar arasında taşınır. G20 programlar mm'ye, G91 hareketleri mutlak
+    koordinata çevrilir; F ve T modal taşınır.
+    """
+    st = state or ModalState()
+    parts: List[np.ndarray] = []
+    line0 = 0
+    for chunk in _iter_chunks(source, chunk_chars):
+        rows = _rows_vectorized(chunk, st, line0)
+        if rows is None:
+            rows = _rows_from_blocks(chunk, st, line0)
+        parts.append(rows)
+        line0 += chunk.count("\n") + (0 if chunk.endswith("\n") else 1)
+    if not parts:
+        return np.empty(0, dtype=MOVE_DTYPE)
+    return np.concatenate(parts) if len(parts) > 1 else parts[0]
+
+
+def motion_rows(table: np.ndarray) -> np.ndarray:
+    return table[np.isin(table["type"], MOTION_TYPES)]
@@ -1,29 +1,30 @@
 from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
 
 from .config import settings
-from .instrumentation import setup_metrics, setup_tracing, setup_celery_instrumentation
-from .sentry_setup import setup_sentry
+from .instrumentation import setup_celery_instrumentation, setup_metrics, setup_tracing
 from .logging_setup import setup_logging
-from .middleware import SecurityHeadersMiddleware, CORSMiddlewareStrict
+from .middleware import CORSMiddlewareStrict, SecurityHeadersMiddleware
 from .middleware.limiter import RateLimitMiddleware
-from .routers import auth as auth_router
-from .routers import health as health_router
-from .routers import freecad as freecad_router
-from .routers import assemblies as assemblies_router
-from .routers import cam as cam_router
-from .routers.cad import cam2 as cam2_router
-from .routers import jobs as jobs_router
 from .routers import admin_dlq as admin_dlq_router
 from .routers import admin_unmask as admin_unmask_router
+from .routers import assemblies as assemblies_router
+from .routers import auth as auth_router
+from .routers import cad as cad_router
+from .routers import cam as cam_router
+from .routers import design as design_router
 from .routers import designs as designs_router
+from .routers import fixtures as fixtures_router
+from .routers import freecad as freecad_router
+from .routers import health as health_router
+from .routers import jobs as jobs_router
+from .routers import posts as posts_router
 from .routers import projects as projects_router
-from .routers import design as design_router
-from .routers import cad as cad_router
-from .routers import tooling as tooling_router
 from .routers import reports as reports_router
 from .routers import setups as setups_router
-from .routers import fixtures as fixtures_router
+from .routers import tooling as tooling_router
+from .routers.cad import cam2 as cam2_router
+from .sentry_setup import setup_sentry
+
 try:
     from .routers import sim as sim_router  # type: ignore
     _sim_available = True
@@ -33,7 +34,6 @@ except Exception:
 from .events import router as events_router
 from .settings import app_settings as appset
 
-
 setup_logging()
 setup_tracing()
 setup_sentry()
@@ -65,6 +65,7 @@ app.include_router(cad_router.router)
 app.include_router(tooling_router.router)
 app.include_router(reports_router.router)
 app.include_router(setups_router.router)
+app.include_router(posts_router.router)
 app.include_router(fixtures_router.router)
 
 
@@ -75,9 +76,11 @@ def root():
 from fastapi.responses import JSONResponse
 from starlette.requests import Request
 
+
 @app.exception_handler(Exception)
 async def unhandled_exc(request: Request, exc: Exception):
-    import logging, traceback
+    import logging
+
     logging.exception("Unhandled exception")
     origin = request.headers.get("origin")
     allowed = (not appset.cors_allowed_origins) or (origin in appset.cors_allowed_origins)
@@ -87,5 +90,3 @@ async def unhandled_exc(request: Request, exc: Exception):
     resp.headers["Vary"] = "Origin"
     resp.headers["Access-Control-Allow-Credentials"] = "false"
     return resp
-
-
@@ -64,6 +64,24 @@ retried_total = Counter(
     labelnames=("task",),
 )
 
+sim_cache_total = Counter(
+    name="sim_cache_total",
+    documentation="Sim sonuç önbelleği isabet/ıska sayısı",
+    labelnames=("result",),
+)
+
+freecad_pool_events_total = Counter(
+    name="freecad_pool_events_total",
+    documentation="Sıcak FreeCADCmd havuzu çalışan başlatma/yenileme olayları",
+    labelnames=("event",),
+)
+
+cad_cache_total = Counter(
+    name="cad_cache_total",
+    documentation="CAD artefakt önbelleği isabet/ıska sayısı",
+    labelnames=("result",),
+)
+
 # M17 metrikleri
 report_build_duration_seconds = Histogram(
     name="report_build_duration_seconds",
@@ -81,5 +99,3 @@ cutting_import_rows_total = Counter(
     name="cutting_import_rows_total",
     documentation="Cutting Data import edilen satır sayısı",
 )
-
-
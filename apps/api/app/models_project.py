@@ -1,10 +1,11 @@
 from __future__ import annotations
 
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum, Text, Float, Boolean
+import enum
+from datetime import datetime
+
+from sqlalchemy import Boolean, Column, DateTime, Enum, Float, ForeignKey, Integer, String, Text
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
-from datetime import datetime
-import enum
 
 from .models import Base
 
@@ -136,6 +137,6 @@ class PostRun(Base):
     lint_json = Column(JSONB, nullable=True)
     duration_ms = Column(Integer, nullable=False, default=0)
     ok = Column(Boolean, nullable=False, default=False)
+    # NC ve satır dizini artefaktları (Job.artefacts biçiminde); /posts/{id}/gcode/* bunları okur
+    artefacts_json = Column(JSONB, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-
-
@@ -0,0 +1,385 @@
+from __future__ import annotations
+
+import math
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+INCH_MM = 25.4
+# Tek pencerede uydurulan en fazla nokta (pencere testleri O(n) olduğundan üst sınır)
+MAX_FIT_POINTS = 512
+# Yaydan en az bu kadar G1 parçası birleşmiyorsa yay yazılmaz
+MIN_ARC_SEGMENTS = 3
+# Bu yarıçapın üstündeki "yaylar" fiilen doğrudur; kontrolcülerde sayısal sorun çıkarır
+MAX_ARC_RADIUS_MM = 5000.0
+
+_TOKEN = re.compile(r"\s*([A-Z])\s*([-+]?(?:\d+\.?\d*|\.\d+))")
+_COMMENT = re.compile(r"\([^)]*\)|;.*")
+# Yalnızca bu sözcüklerden oluşan satırlar sadeleştirilir; diğer her satır olduğu gibi geçer
+_SIMPLE = frozenset("GXYZIJKRF")
+_AXES = "XYZ"
+# Bu G kodları modal durumu bilinen biçimde değiştirir; diğerleri (G28, G53,
+# G92, çevrimler...) durumu sıfırlar
+_KNOWN_G = frozenset({0, 1, 2, 3, 17, 18, 19, 20, 21, 90, 91, 94})
+
+
+@dataclass
+class CompactStats:
+    lines_in: int = 0
+    lines_out: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    words_dropped: int = 0
+    arcs_fitted: int = 0
+    segments_merged: int = 0
+
+    def as_metrics(self) -> Dict:
+        return {
+            "compact_lines_in": self.lines_in,
+            "compact_lines_out": self.lines_out,
+            "compact_lines_saved": self.lines_in - self.lines_out,
+            "compact_bytes_saved": self.bytes_in - self.bytes_out,
+            "compact_words_dropped": self.words_dropped,
+            "compact_arcs_fitted": self.arcs_fitted,
+            "compact_segments_merged": self.segments_merged,
+        }
+
+
+class _State:
+    """Programın o ana kadarki modal durumu. Bilinmeyen değerler None."""
+
+    def __init__(self) -> None:
+        self.motion: Optional[int] = None
+        self.feed: Optional[float] = None
+        self.pos: List[Optional[float]] = [None, None, None]
+        self.absolute = True
+        self.plane = 17
+        self.inch = False
+
+    def forget(self) -> None:
+        self.motion = None
+        self.feed = None
+        self.pos = [None, None, None]
+
+    def apply_g(self, val: str) -> bool:
+        """Olduğu gibi yazılan satırdaki G sözcüğünü uygular; bilinmeyen kodda False."""
+        g = float(val)
+        if g != int(g) or int(g) not in _KNOWN_G:
+            return False
+        g = int(g)
+        if g in (0, 1, 2, 3):
+            self.motion = g
+        elif g in (17, 18, 19):
+            self.plane = g
+        elif g in (20, 21):
+            self.inch = g == 20
+        elif g in (90, 91):
+            self.absolute = g == 90
+        return True
+
+
+def _tokens(line: str) -> Optional[List[Tuple[str, str]]]:
+    """Satır yalnızca harf+sayı sözcüklerinden oluşuyorsa [(harf, metin)], değilse None."""
+    out: List[Tuple[str, str]] = []
+    pos = 0
+    s = line.rstrip()
+    while pos < len(s):
+        m = _TOKEN.match(s, pos)
+        if not m:
+            return None
+        out.append((m.group(1), m.group(2)))
+        pos = m.end()
+    return out
+
+
+def _decimals(txt: str) -> int:
+    return len(txt) - txt.index(".") - 1 if "." in txt else 0
+
+
+def _fmt(v: float, nd: int) -> str:
+    s = f"{v:.{nd}f}"
+    if "." in s:
+        s = s.rstrip("0").rstrip(".")
+    return "0" if s in ("-0", "") else s
+
+
+def _collinear(P: np.ndarray, i: int, k: int, tol: float) -> bool:
+    d = P[k] - P[i]
+    L = math.hypot(d[0], d[1])
+    if L < 1e-12:
+        return False
+    q = P[i + 1 : k] - P[i]
+    dev = np.abs(q[:, 0] * d[1] - q[:, 1] * d[0]) / L
+    t = np.concatenate([[0.0], (q @ d) / L, [L]])
+    return bool((dev <= tol).all() and (np.diff(t) > 0).all())
+
+
+def _arc(P: np.ndarray, i: int, k: int, tol: float) -> Optional[Tuple[float, float, bool]]:
+    """P[i..k] tek yön dönen, tüm noktaları ve kiriş sehimleri 'tol' içinde kalan bir yaya
+    oturuyorsa (cx, cy, ccw); yoksa None. Çember P[i], P[orta], P[k] noktalarından geçer.
+    """
+    a, b, c = P[i], P[(i + k) // 2], P[k]
+    det = 2.0 * ((b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0]))
+    if abs(det) < 1e-12:
+        return None
+    ab2 = (b[0] - a[0]) ** 2 + (b[1] - a[1]) ** 2
+    ac2 = (c[0] - a[0]) ** 2 + (c[1] - a[1]) ** 2
+    ux = ((c[1] - a[1]) * ab2 - (b[1] - a[1]) * ac2) / det
+    uy = ((b[0] - a[0]) * ac2 - (c[0] - a[0]) * ab2) / det
+    cx, cy = a[0] + ux, a[1] + uy
+    r = math.hypot(ux, uy)
+    if r > MAX_ARC_RADIUS_MM:
+        return None
+    w = P[i : k + 1] - (cx, cy)
+    if (np.abs(np.hypot(w[:, 0], w[:, 1]) - r) > tol).any():
+        return None
+    ang = np.arctan2(w[:, 1], w[:, 0])
+    dth = np.mod(np.diff(ang) + math.pi, 2.0 * math.pi) - math.pi
+    if not ((dth > 1e-9).all() or (dth < -1e-9).all()):
+        return None
+    if abs(dth.sum()) >= 2.0 * math.pi - 1e-6:
+        return None
+    seg = np.hypot(*np.diff(P[i : k + 1], axis=0).T)
+    sag = r - np.sqrt(np.maximum(r * r - (seg / 2.0) ** 2, 0.0))
+    if (sag > tol).any():
+        return None
+    return cx, cy, bool(dth[0] > 0)
+
+
+def _longest(test, i: int, n: int, lo: int) -> int:
+    """test(i, k) geçen en büyük k (>= lo); hiçbiri geçmezse -1. Üstel büyütme + ikili arama."""
+    hi_cap = min(n - 1, i + MAX_FIT_POINTS)
+    if lo > hi_cap or not test(i, lo):
+        return -1
+    good, step = lo, 1
+    while good + step <= hi_cap and test(i, good + step):
+        good += step
+        step *= 2
+    bad = min(good + step, hi_cap + 1)
+    while bad - good > 1:
+        mid = (good + bad) // 2
+        if test(i, mid):
+            good = mid
+        else:
+            bad = mid
+    return good
+
+
+class _Compactor:
+    def __init__(self, arc_tol_mm: float, fit_arcs: bool) -> None:
+        self.tol_mm = arc_tol_mm
+        self.fit_arcs = fit_arcs
+        self.st = _State()
+        # Girdi programının modal hareketi. st.motion yazılan çıktının kipidir; bir G1 dizisi
+        # biriktirilirken ya da yaya çevrildiğinde ikisi ayrışabilir
+        self.modal: Optional[int] = None
+        self.stats = CompactStats()
+        self.out: List[str] = []
+        self.run: List[Tuple[float, float, List[Tuple[str, str]]]] = []
+        self.run_start: Optional[Tuple[float, float, float]] = None
+        self.run_feed: Optional[float] = None
+
+    # -- genel satırlar ---------------------------------------------------
+    def other(self, line: str) -> None:
+        """Sadeleştirilmeyen satır: olduğu gibi yazılır, modal durum temkinli güncellenir.
+        M/T ya da _SIMPLE dışı bir sözcük (takım değişimi, makro, satır numarası...) veya
+        ayrıştırılamayan bir satır konum/hareket/ilerleme bilgisini sıfırlar.
+        """
+        self.flush()
+        self.out.append(line)
+        words = _tokens(_COMMENT.sub(" ", line.upper()))
+        if words is None or any(letter not in _SIMPLE for letter, _ in words):
+            self._forget()
+            return
+        for letter, val in words:
+            if letter == "G":
+                if not self.st.apply_g(val):
+                    self._forget()
+                elif self.st.motion is not None:
+                    self.modal = self.st.motion
+            elif letter == "F":
+                self.st.feed = float(val)
+            elif letter in _AXES:
+                self.st.pos[_AXES.index(letter)] = None
+
+    def _forget(self) -> None:
+        self.st.forget()
+        self.modal = None
+
+    def simple(self, line: str, toks: List[Tuple[str, str]]) -> None:
+        gs = [int(float(v)) for c, v in toks if c == "G"]
+        if (
+            any(g not in (0, 1, 2, 3) for g in gs)
+            or len(gs) > 1
+            or any(c == "G" and "." in v for c, v in toks)
+        ):
+            self.other(line)
+            return
+        # Örtük kip, çıktının değil girdi programının kipinden çözülür
+        motion = gs[0] if gs else self.modal
+        vals = {c: float(v) for c, v in toks if c != "G"}
+        if motion is None or len(vals) + len(gs) != len(toks):
+            self.other(line)  # kip bilinmiyor ya da aynı harf iki kez
+            return
+        self.modal = motion
+        if self._extends_run(motion, vals):
+            self.run.append(
+                (
+                    vals.get("X", self.run[-1][0] if self.run else self.st.pos[0]),
+                    vals.get("Y", self.run[-1][1] if self.run else self.st.pos[1]),
+                    toks,
+                )
+            )
+            return
+        self.flush()
+        if self._starts_run(motion, vals):
+            self.run_start = tuple(self.st.pos)  # type: ignore[assignment]
+            self.run_feed = vals.get("F", self.st.feed)
+            self.run = [(vals.get("X", self.st.pos[0]), vals.get("Y", self.st.pos[1]), toks)]
+            return
+        self.emit_dedup(motion, toks, vals)
+
+    def emit_dedup(self, motion: int, toks: List[Tuple[str, str]], vals: Dict[str, float]) -> None:
+        st = self.st
+        arc = motion in (2, 3)
+        keep = [(c, v) for c, v in toks if not self._redundant(c, v, motion, arc)]
+        self.stats.words_dropped += len(toks) - len(keep)
+        moves = any(c in _AXES or c in "IJKR" for c, _ in keep)
+        if moves or any(c == "F" for c, _ in keep) or motion != st.motion:
+            # Çıktının kipi farklıysa (ör. önceki dizi yaya çevrildi) G sözcüğü her zaman yazılır
+            if motion != st.motion and not any(c == "G" for c, _ in keep):
+                keep.insert(0, ("G", str(motion)))
+            self.out.append(" ".join(c + v for c, v in keep))
+        self._advance(motion, vals)
+
+    def _redundant(self, c: str, v: str, motion: int, arc: bool) -> bool:
+        """Sözcük modal durumu değiştirmiyorsa (aynı kip, aynı F, mutlak kipte aynı eksen) True."""
+        st = self.st
+        if c == "G":
+            return motion == st.motion
+        if c == "F":
+            return st.feed is not None and float(v) == st.feed
+        return c in _AXES and st.absolute and not arc and st.pos[_AXES.index(c)] == float(v)
+
+    def _advance(self, motion: int, vals: Dict[str, float]) -> None:
+        st = self.st
+        st.motion = motion
+        if "F" in vals:
+            st.feed = vals["F"]
+        for a, c in enumerate(_AXES):
+            if c in vals:
+                st.pos[a] = vals[c] if st.absolute else None
+        if not st.absolute:
+            st.pos = [None, None, None]
+
+    # -- G1 dizileri ------------------------------------------------------
+    def _plain_g1(self, motion: int, vals: Dict[str, float]) -> bool:
+        return motion == 1 and not (set(vals) & set("IJKR")) and ("X" in vals or "Y" in vals)
+
+    def _starts_run(self, motion: int, vals: Dict[str, float]) -> bool:
+        st = self.st
+        if not (self.fit_arcs and st.absolute and st.plane == 17 and self._plain_g1(motion, vals)):
+            return False
+        if any(p is None for p in st.pos):
+            return False
+        return "Z" not in vals or vals["Z"] == st.pos[2]
+
+    def _extends_run(self, motion: int, vals: Dict[str, float]) -> bool:
+        if not self.run or not self._plain_g1(motion, vals):
+            return False
+        if "Z" in vals and vals["Z"] != self.run_start[2]:
+            return False
+        return "F" not in vals or vals["F"] == self.run_feed
+
+    def flush(self) -> None:
+        if not self.run:
+            return
+        run, self.run = self.run, []
+        st = self.st
+        x0, y0, z0 = self.run_start
+        P = np.array([(x0, y0)] + [(x, y) for x, y, _ in run], dtype=np.float64)
+        nd = max([3] + [_decimals(v) for _, _, toks in run for c, v in toks if c in "XY"])
+        tol = self.tol_mm / INCH_MM if st.inch else self.tol_mm
+        words_in = sum(len(toks) for _, _, toks in run)
+        lines_before = len(self.out)
+        n = len(P)
+        i = 0
+        while i < n - 1:
+            k_line = _longest(lambda a, b: _collinear(P, a, b, tol), i, n, i + 2)
+            k_arc = _longest(
+                lambda a, b: _arc(P, a, b, tol) is not None, i, n, i + MIN_ARC_SEGMENTS
+            )
+            if k_arc > max(k_line, i + 1):
+                cx, cy, ccw = _arc(P, i, k_arc, tol)  # type: ignore[misc]
+                words = [
+                    ("G", "3" if ccw else "2"),
+                    ("X", _fmt(P[k_arc, 0], nd)),
+                    ("Y", _fmt(P[k_arc, 1], nd)),
+                    ("I", _fmt(cx - P[i, 0], nd)),
+                    ("J", _fmt(cy - P[i, 1], nd)),
+                ]
+                self.stats.arcs_fitted += 1
+                self.stats.segments_merged += k_arc - i
+                self._emit_run_line(3 if ccw else 2, words)
+                i = k_arc
+                continue
+            k = k_line if k_line > i + 1 else i + 1
+            if k > i + 1:
+                self.stats.segments_merged += k - i
+            words = [("G", "1")]
+            if P[k, 0] != P[i, 0]:
+                words.append(("X", _fmt(P[k, 0], nd)))
+            if P[k, 1] != P[i, 1]:
+                words.append(("Y", _fmt(P[k, 1], nd)))
+            self._emit_run_line(1, words)
+            i = k
+        st.pos = [float(P[-1, 0]), float(P[-1, 1]), z0]
+        words_out = sum(len(_tokens(ln) or []) for ln in self.out[lines_before:])
+        self.stats.words_dropped += max(0, words_in - words_out)
+
+    def _emit_run_line(self, motion: int, words: List[Tuple[str, str]]) -> None:
+        st = self.st
+        if not any(c in "XY" for c, _ in words):
+            return  # sıfır uzunluklu parça
+        if motion == st.motion:
+            words = words[1:]
+        if self.run_feed is not None and st.feed != self.run_feed:
+            words.append(("F", _fmt(self.run_feed, 3)))
+            st.feed = self.run_feed
+        st.motion = motion
+        self.out.append(" ".join(c + v for c, v in words))
+
+
+def compact_gcode(
+    text: str, arc_tol_mm: float = 0.01, fit_arcs: bool = True
+) -> Tuple[str, CompactStats]:
+    """Post edilmiş G-code'u sadeleştirir: tekrarlanan modal G/F sözcüklerini ve değişmeyen
+    koordinatları atar; mutlak G17 kipinde ardışık G1 dizilerini 'arc_tol_mm' içinde tek G1'e
+    (doğrusal) ya da G2/G3 yayına (çembersel) çevirir. Yorumlu, satır numaralı ya da tanınmayan
+    sözcük içeren satırlar hiç değiştirilmez; M/T sözcükleri, bilinmeyen G kodları ve anlaşılmayan
+    satırlar konum/hareket/ilerleme durumunu sıfırlar.
+    """
+    c = _Compactor(arc_tol_mm, fit_arcs)
+    lines = text.splitlines()
+    for line in lines:
+        toks = _tokens(line.upper()) if line.strip() else None
+        if toks and all(ch in _SIMPLE for ch, _ in toks):
+            c.simple(line, toks)
+        else:
+            c.other(line)
+    c.flush()
+    out = "\n".join(c.out) + ("\n" if text.endswith("\n") else "")
+    st = c.stats
+    st.lines_in, st.lines_out = len(lines), len(c.out)
+    st.bytes_in, st.bytes_out = len(text.encode("utf-8")), len(out.encode("utf-8"))
+    return out, st
+
+
+def compact_file(path: Path, arc_tol_mm: float = 0.01, fit_arcs: bool = True) -> CompactStats:
+    text = Path(path).read_text(encoding="utf-8", errors="ignore")
+    out, stats = compact_gcode(text, arc_tol_mm, fit_arcs)
+    Path(path).write_text(out, encoding="utf-8")
+    return stats
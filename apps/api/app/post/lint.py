@@ -1,33 +1,344 @@
 from __future__ import annotations
 
-from typing import Dict, List
+import io
+import math
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 
+import numpy as np
+
+from ..gcode.tokenizer import LINEAR, RAPID, motion_rows, parse_moves
 
 SUPPORTED_DIALECTS = {"fanuc", "grbl", "linuxcnc"}
+ERROR = "error"
+WARNING = "warning"
+# Sınır ihlallerinde mesajda ayrıntısı verilen / satır numarası tutulan en fazla hareket
+BOUNDS_DETAIL = 5
+BOUNDS_MAX_LINES = 50
+
+
+@dataclass
+class Finding:
+    rule: str
+    severity: str
+    message: str
+    lines: List[int] = field(default_factory=list)
+
+
+@dataclass
+class LintResult:
+    findings: List[Finding]
+    lines: int
+    moves: int
+
+    @property
+    def errors(self) -> List[Finding]:
+        return [f for f in self.findings if f.severity == ERROR]
+
+    @property
+    def warnings(self) -> List[Finding]:
+        return [f for f in self.findings if f.severity == WARNING]
+
+
+class Rule:
+    """Denetim kuralı. Satır kurallarında her boş olmayan satır için 'line' çağrılır (text:
+    kırpılmış, büyük harfli satır; idx: boş olmayan satır sırası, 0'dan). Hareket kuralları 'moves'
+    ile parse_moves tablosunun tamamını bir kez görür. Program bitince 'finish' bulguları döndürür.
+    """
+
+    name = "rule"
+    severity = ERROR
+
+    def line(self, text: str, idx: int, line_no: int) -> None: ...
+
+    def moves(self, table: np.ndarray) -> None: ...
+
+    def finish(self, res: LintResult) -> List[Finding]:
+        return []
+
+    def _found(self, message: str, lines: Sequence[int] = ()) -> List[Finding]:
+        return [Finding(self.name, self.severity, message, list(lines))]
+
+
+class NotEmpty(Rule):
+    name = "empty"
+
+    def finish(self, res: LintResult) -> List[Finding]:
+        return self._found("G-code boş") if res.lines == 0 else []
+
+
+class HasLinearMotion(Rule):
+    name = "motion"
+
+    def __init__(self) -> None:
+        self.seen = False
+
+    def moves(self, table: np.ndarray) -> None:
+        self.seen = bool(np.isin(table["type"], (RAPID, LINEAR)).any())
+
+    def finish(self, res: LintResult) -> List[Finding]:
+        return [] if self.seen or res.lines == 0 else self._found("G0/G1 komutları bulunamadı")
+
+
+class FeedBeforeFirstCut(Rule):
+    name = "feed"
+
+    def __init__(self) -> None:
+        self.bad: Optional[int] = None
+
+    def moves(self, table: np.ndarray) -> None:
+        cuts = table[table["type"] == LINEAR]
+        if len(cuts) and math.isnan(cuts["f"][0]):
+            self.bad = int(cuts["line_no"][0])
+
+    def finish(self, res: LintResult) -> List[Finding]:
+        return (
+            []
+            if self.bad is None
+            else self._found("İlk G1 öncesinde ilerleme (F) ayarı bulunamadı", [self.bad])
+        )
+
+
+class FiniteNumbers(Rule):
+    name = "numeric"
+
+    def __init__(self) -> None:
+        self.bad: List[int] = []
+
+    def line(self, text: str, idx: int, line_no: int) -> None:
+        if ("NAN" in text or "INF" in text) and len(self.bad) < BOUNDS_MAX_LINES:
+            self.bad.append(line_no)
+
+    def finish(self, res: LintResult) -> List[Finding]:
+        return self._found("Geçersiz sayı (NaN/Inf) içeriyor", self.bad) if self.bad else []
+
+
+class PrefixInHeader(Rule):
+    """İlk 'within' boş olmayan satırdan biri verilen öneklerden biriyle
+    (contains=True: içerir) başlamalı.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        prefixes: Sequence[str],
+        within: int,
+        message: str,
+        severity: str = ERROR,
+        contains: bool = False,
+    ) -> None:
+        self.name, self.prefixes, self.within, self.message, self.severity = (
+            name,
+            tuple(prefixes),
+            within,
+            message,
+            severity,
+        )
+        self.contains = contains
+        self.seen = False
+
+    def line(self, text: str, idx: int, line_no: int) -> None:
+        if self.seen or idx >= self.within:
+            return
+        self.seen = (
+            any(p in text for p in self.prefixes)
+            if self.contains
+            else text.startswith(self.prefixes)
+        )
 
+    def finish(self, res: LintResult) -> List[Finding]:
+        return [] if self.seen or res.lines == 0 else self._found(self.message)
 
-def lint_gcode(text: str, dialect: str, tool_plane_enabled: bool) -> Dict:
+
+class RequiresPrefix(Rule):
+    def __init__(self, name: str, prefix: str, message: str, severity: str = WARNING) -> None:
+        self.name, self.prefix, self.message, self.severity = name, prefix, message, severity
+        self.seen = False
+
+    def line(self, text: str, idx: int, line_no: int) -> None:
+        self.seen = self.seen or text.startswith(self.prefix)
+
+    def finish(self, res: LintResult) -> List[Finding]:
+        return [] if self.seen else self._found(self.message)
+
+
+class TagOrder(Rule):
+    """Etiketlerin ilk görüldüğü satırlar verilen sırada olmalı (görülmeyenler atlanır)."""
+
+    name = "order"
+    severity = WARNING
+
+    def __init__(self, tags: Sequence[str]) -> None:
+        self.tags = tuple(tags)
+        self.first: Dict[str, int] = {}
+
+    def line(self, text: str, idx: int, line_no: int) -> None:
+        if len(self.first) == len(self.tags):
+            return
+        for tag in self.tags:
+            if tag not in self.first and text.startswith(tag):
+                self.first[tag] = idx
+
+    def finish(self, res: LintResult) -> List[Finding]:
+        out: List[Finding] = []
+        last = -1
+        for tag in self.tags:
+            idx = self.first.get(tag)
+            if idx is None:
+                continue
+            if idx < last:
+                out += self._found(f"Sıra uyarısı: {tag} önceki komutlardan sonra gelmeli")
+            last = idx
+        return out
+
+
+class MachineBounds(Rule):
+    """Her hareketin bitiş noktası (mm, mutlak) makine çalışma alanı içinde olmalı.
+    bounds: {"x": [min, max], "y": [...], "z": [...]}; verilmeyen eksen denetlenmez.
+    """
+
+    name = "bounds"
+
+    def __init__(self, bounds: Dict) -> None:
+        self.limits = []
+        for a, axis in enumerate("xyz"):
+            lim = bounds.get(axis) or bounds.get(axis.upper())
+            if lim:
+                self.limits.append((a, axis.upper(), float(lim[0]), float(lim[1])))
+        self.count = 0
+        self.lines: List[int] = []
+        self.details: List[str] = []
+
+    def moves(self, table: np.ndarray) -> None:
+        mv = motion_rows(table)
+        bad = np.zeros(len(mv), dtype=bool)
+        first = np.full(len(mv), -1)  # satırda sınırı aşan ilk eksen (limits sırası)
+        for n, (_, axis, lo, hi) in enumerate(self.limits):
+            v = mv[axis.lower()]
+            out = (v < lo) | (v > hi)  # NaN (bilinmeyen eksen) karşılaştırmaları yanlış döner
+            first[out & ~bad] = n
+            bad |= out
+        hits = np.flatnonzero(bad)
+        self.count = len(hits)
+        self.lines = [int(v) for v in mv["line_no"][hits[:BOUNDS_MAX_LINES]]]
+        for i in hits[:BOUNDS_DETAIL]:
+            _, axis, lo, hi = self.limits[first[i]]
+            v = float(mv[axis.lower()][i])
+            self.details.append(f"satır {int(mv['line_no'][i])}: {axis}={v:.3f} ∉ [{lo:g}, {hi:g}]")
+
+    def finish(self, res: LintResult) -> List[Finding]:
+        if not self.count:
+            return []
+        more = f" (+{self.count - len(self.details)})" if self.count > len(self.details) else ""
+        return self._found(
+            f"Makine sınırları dışında {self.count} hareket: " + "; ".join(self.details) + more,
+            self.lines,
+        )
+
+
+class _LineScan:
+    """Satır kurallarını, satırlar parse_moves'a akarken aynı geçişte besler."""
+
+    def __init__(
+        self, rules: Sequence[Rule], on_line: Optional[Callable[[int, str], None]]
+    ) -> None:
+        # Yalnızca 'line' kancasını tanımlayan kurallar satır başına çağrılır
+        self.rules = [r for r in rules if type(r).line is not Rule.line]
+        self.on_line = on_line
+        self.lines = 0
+
+    def feed(self, source: Iterable) -> Iterator:
+        for line_no, raw in enumerate(source, start=1):
+            text = raw.decode("utf-8", "ignore") if isinstance(raw, bytes) else raw
+            if self.on_line is not None:
+                self.on_line(line_no, text)
+            ln = text.strip().upper()
+            if ln:
+                for r in self.rules:
+                    r.line(ln, self.lines, line_no)
+                self.lines += 1
+            yield raw
+
+
+def scan(
+    source: Union[str, bytes, Iterable],
+    rules: Sequence[Rule],
+    on_line: Optional[Callable[[int, str], None]] = None,
+) -> Tuple[LintResult, np.ndarray]:
+    """Kuralları programın üzerinden tek geçişte çalıştırır ve hareket tablosunu (parse_moves) da
+    döndürür; çevrim süresi gibi sonraki adımlar programı yeniden okumadan aynı tabloyu kullanır.
+    'source' metin ya da açık dosya olabilir; dosya satırları okundukça hem satır kurallarına hem
+    parse_moves'a akar. 'on_line' her satır için (satır no, ham satır) ile çağrılır.
+    Bulgular kural sırasıyla döner.
+    """
+    lines = _LineScan(rules, on_line)
+    if isinstance(source, (str, bytes)):
+        text = source.decode("utf-8", "ignore") if isinstance(source, bytes) else source
+        for _ in lines.feed(io.StringIO(text)):
+            pass
+        table = parse_moves(text)
+    else:
+        table = parse_moves(lines.feed(source))
+    for r in rules:
+        r.moves(table)
+    res = LintResult(findings=[], lines=lines.lines, moves=len(table))
+    for r in rules:
+        res.findings += r.finish(res)
+    return res, table
+
+
+def run_lint(source: Union[str, bytes, Iterable], rules: Sequence[Rule]) -> LintResult:
+    return scan(source, rules)[0]
+
+
+def lint_file(path: Union[str, Path], rules: Sequence[Rule]) -> LintResult:
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        return run_lint(f, rules)
+
+
+def cam_rules(params: Dict) -> List[Rule]:
+    """CAM çıktısı için hata kuralları (ilk hata işi düşürür)."""
+    units = params.get("units", "mm")
+    rules: List[Rule] = [NotEmpty(), HasLinearMotion(), FeedBeforeFirstCut(), FiniteNumbers()]
+    if units == "mm":
+        rules.append(
+            PrefixInHeader("units", ["G21"], 20, "Birim bildirimi (G21) bulunamadı", contains=True)
+        )
+    elif units == "inch":
+        rules.append(
+            PrefixInHeader("units", ["G20"], 20, "Birim bildirimi (G20) bulunamadı", contains=True)
+        )
+    if params.get("machine_bounds_mm"):
+        rules.append(MachineBounds(params["machine_bounds_mm"]))
+    return rules
+
+
+def post_rules(tool_plane_enabled: bool, machine_bounds: Optional[Dict] = None) -> List[Rule]:
+    rules: List[Rule] = [
+        PrefixInHeader("units", ["G21", "G20"], 10, "Units (G21/G20) başta görünmüyor", WARNING),
+        PrefixInHeader("absolute", ["G90"], 10, "Absolute (G90) başta görünmüyor", WARNING),
+    ]
+    if tool_plane_enabled:
+        rules.append(RequiresPrefix("tool_plane", "G68", "Tool plane etkin ama G68 görülmedi"))
+    # Basit sıra kontrolü: Units -> G90 -> WCS -> T/M6 -> G43 -> M8
+    rules.append(TagOrder(["G2", "G90", "( WCS", "T", "G43", "M8"]))
+    if machine_bounds:
+        rules.append(MachineBounds(machine_bounds))
+    return rules
+
+
+def lint_gcode(
+    text: Union[str, Iterable],
+    dialect: str,
+    tool_plane_enabled: bool,
+    machine_bounds: Optional[Dict] = None,
+) -> Dict:
     warnings: List[str] = []
     errors: List[str] = []
     if dialect not in SUPPORTED_DIALECTS:
         warnings.append(f"Bilinmeyen dialect: {dialect}")
-    lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
-    if not any(ln.startswith(("G21", "G20")) for ln in lines[:10]):
-        warnings.append("Units (G21/G20) başta görünmüyor")
-    if not any(ln.startswith("G90") for ln in lines[:10]):
-        warnings.append("Absolute (G90) başta görünmüyor")
-    if tool_plane_enabled and not any(ln.startswith("G68") for ln in lines):
-        warnings.append("Tool plane etkin ama G68 görülmedi")
-    # Basit sıra kontrolü: Units -> G90 -> WCS -> T/M6 -> G43 -> M8
-    order_tags = ["G2", "G90", "( WCS", "T", "G43", "M8"]
-    last_index = -1
-    for tag in order_tags:
-        idx = next((i for i, ln in enumerate(lines) if ln.startswith(tag)), None)
-        if idx is None:
-            continue
-        if idx < last_index:
-            warnings.append(f"Sıra uyarısı: {tag} önceki komutlardan sonra gelmeli")
-        last_index = idx
+    res = run_lint(text, post_rules(tool_plane_enabled, machine_bounds))
+    warnings += [f.message for f in res.warnings]
+    errors += [f.message for f in res.errors]
     return {"warnings": warnings, "errors": errors}
-
-
@@ -1,26 +1,25 @@
 from __future__ import annotations
 
 import hashlib
-import os
+import io
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict
 
+import qrcode
+from cairosvg import svg2png
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import mm
-from reportlab.pdfgen import canvas
 from reportlab.lib.utils import ImageReader
-import io
-import qrcode
-from cairosvg import svg2png
+from reportlab.pdfgen import canvas
 
-from ..storage import upload_and_sign, presigned_url, get_s3_client
-from ..metrics import report_build_duration_seconds
 from ..config import settings
 from ..db import db_session
-from ..models_project import Project, ProjectFile, FileKind
-from ..storage_download import download_presigned
 from ..freecad.export_views import project_views
+from ..metrics import report_build_duration_seconds
+from ..models_project import FileKind, Project, ProjectFile
+from ..storage import get_s3_client, presigned_url
+from ..storage_download import download_presigned
 
 
 @dataclass
@@ -38,6 +37,19 @@ def _sha256(path: Path) -> str:
     return h.hexdigest()
 
 
+def _fmt_duration(seconds: float) -> str:
+    m, s = divmod(int(round(float(seconds))), 60)
+    h, m = divmod(m, 60)
+    return f"{h}sa {m:02d}dk" if h else f"{m}dk {s:02d}sn"
+
+
+def _draw_cycle_total(c, y: float, est_total) -> None:
+    # Op'lardan biri tahmin edilemediyse toplam da bilinmez (None) ve yazılmaz
+    if est_total:
+        text = f"Tahmini çevrim süresi (takım değişimleri dahil): ~{_fmt_duration(est_total)}"
+        c.drawString(25 * mm, y, text)
+
+
 def build_shop_package_pdf(project_id: int, out_pdf_path: str) -> Dict:
     # Basit PDF iskeleti; görsel/tablolar için sonraki iterasyon
     from time import perf_counter
@@ -75,7 +87,11 @@ def build_shop_package_pdf(project_id: int, out_pdf_path: str) -> Dict:
 
     # FCStd indir → SVG→PNG görünüşler
     front_png = right_png = iso_png = None
-    summary = {}; stock = {}; wcs = "G54"; ops = []
+    summary = {}
+    stock = {}
+    wcs = "G54"
+    ops = []
+    est_total = None
     with db_session() as s:
         p = s.get(Project, project_id)
         if p and p.summary_json:
@@ -85,6 +101,7 @@ def build_shop_package_pdf(project_id: int, out_pdf_path: str) -> Dict:
                 stock = cam_job.get("stock") or {}
                 wcs = cam_job.get("wcs") or wcs
                 ops = cam_job.get("ops") or []
+                est_total = cam_job.get("est_total_s")
         pf = (
             s.query(ProjectFile)
             .filter(ProjectFile.project_id == project_id, ProjectFile.kind == FileKind.cad)
@@ -147,10 +164,13 @@ def build_shop_package_pdf(project_id: int, out_pdf_path: str) -> Dict:
             t = op.get('type', '?')
             tool = op.get('tool') or {}
             tt = tool.get('type', '?'); dia = tool.get('dia', '?')
-            c.drawString(25 * mm, y_op, f"- {t} | Takım: {tt} ⌀{dia} mm")
+            est = op.get("est_seconds")
+            est_txt = f" | Süre: ~{_fmt_duration(est)}" if est else ""
+            c.drawString(25 * mm, y_op, f"- {t} | Takım: {tt} ⌀{dia} mm{est_txt}")
             y_op -= 6 * mm
             if y_op < 30 * mm:
                 c.showPage(); c.setFont("Helvetica", 10); y_op = h - 30 * mm
+        _draw_cycle_total(c, y_op - 2 * mm, est_total)
     else:
         c.drawString(25 * mm, y_op, "Operasyon verisi yok")
         c.showPage()
@@ -174,5 +194,3 @@ def build_shop_package_pdf(project_id: int, out_pdf_path: str) -> Dict:
     sha = _sha256(p)
     report_build_duration_seconds.labels(status="ok").observe(perf_counter() - t0)
     return {"pages": 1, "sha256": sha, "bytes": size, "path": str(p)}
-
-
@@ -1,22 +1,20 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, Header
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Header, HTTPException
 
 from ..db import db_session
-from ..schemas.cad_build import CadBuildRequest, CadBuildResult, CadArtifactsOut
-from ..tasks.cad import cad_build_task
 from ..models_project import Project
-from ..schemas.cam_build import CamBuildRequest, CamBuildOut, CamArtifactsOut as CamArtifactsOut2, CamBuildArtifacts, CamOpSummary
+from ..schemas.cad_build import CadArtifactsOut, CadBuildRequest, CadBuildResult
+from ..schemas.cam_build import CamArtifactsOut as CamArtifactsOut2
+from ..schemas.cam_build import CamBuildArtifacts, CamBuildOut, CamBuildRequest, CamOpSummary
+from ..services.redis_client import redis_client
+from ..tasks.cad import cad_build_task
 from ..tasks.cam_build import cam_build_task  # noqa: F401
-from ..config import settings
+
 
 def _broker_ok() -> bool:
     try:
-        import redis  # type: ignore
-
-        r = redis.Redis.from_url(settings.redis_url)
-        return bool(r.ping())
+        return bool(redis_client().ping())
     except Exception:
         return False
 
@@ -75,7 +73,13 @@ def cam_artifacts2(project_id: int):
         summ = p.summary_json or {}
         arts = summ.get("cam_artifacts") or {}
         ops = [CamOpSummary(**o) for o in (summ.get("cam_job", {}).get("ops") or [])]
-        stats = {"wcs": (summ.get("cam_job", {}).get("wcs")), "stock": summ.get("cam_job", {}).get("stock")}
+        stats = {
+            "wcs": (summ.get("cam_job", {}).get("wcs")),
+            "stock": summ.get("cam_job", {}).get("stock"),
+            "est_total_s": summ.get("cam_job", {}).get("est_total_s"),
+            "drill_sequence": summ.get("cam_job", {}).get("drill_sequence"),
+            "op_order": summ.get("cam_job", {}).get("op_order"),
+        }
         return CamArtifactsOut2(
             artifacts=CamBuildArtifacts(
                 fcstd_url=arts.get("fcstd_url"), job_json_url=arts.get("job_json_url"), svg_url=arts.get("svg_url")
@@ -83,5 +87,3 @@ def cam_artifacts2(project_id: int):
             ops=ops,
             job_stats=stats,
         )
-
-
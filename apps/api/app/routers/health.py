@@ -1,12 +1,12 @@
-from fastapi import APIRouter, Response, status
-import redis
 import boto3
+import redis
+from fastapi import APIRouter, Response, status
 
 from ..config import settings
 from ..db import check_db
+from ..freecad.capabilities import node_capabilities
 from ..schemas import HealthStatus
 
-
 router = APIRouter(prefix="/api/v1", tags=["Sağlık"]) 
 
 
@@ -44,8 +44,16 @@ def healthz(response: Response) -> HealthStatus:
     return HealthStatus(status=overall, dependencies=deps)
 
 
+@router.get("/healthz/freecad")
+def freecad_nodes() -> dict:
+    """İşçi düğümlerinin yayınladığı FreeCAD yetenekleri (sürüm, tezgâhlar, post'lar)."""
+    nodes = node_capabilities()
+    return {
+        "nodes": nodes,
+        "path_capable": [n["node"] for n in nodes if (n.get("workbenches") or {}).get("Path")],
+    }
+
+
 @router.get("/readyz", response_model=HealthStatus)
 def readyz() -> HealthStatus:
     return healthz()
-
-
@@ -1,16 +1,18 @@
 from __future__ import annotations
 
+import json
 from datetime import datetime
-from typing import Optional
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 
-from fastapi import APIRouter, HTTPException, Query, status, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 
+from ..db import db_session
+from ..gcode.line_index import MAX_RANGE_LINES, read_lines
 from ..models import Job
-from ..storage import presigned_url
-from ..services.job_control import cancel_job, queue_pause, queue_resume
 from ..security.oidc import require_role
-from ..db import db_session
-
+from ..services.job_control import cancel_job, queue_pause, queue_resume
+from ..storage import get_bytes, get_range, presigned_url
 
 router = APIRouter(prefix="/api/v1/jobs", tags=["İşler"]) 
 
@@ -56,6 +58,82 @@ def get_job(job_id: int):
         }
 
 
+GCODE_TYPES = ("gcode", "nc")
+
+
+@lru_cache(maxsize=32)
+def _load_index(s3_key: str, sha256: str) -> Dict:
+    # Dizin artefaktı değişmez (sha256 anahtarın parçası); yalnızca küçük JSON indirilir
+    return json.loads(get_bytes(s3_key))
+
+
+def resolve_gcode(arts: List[Dict]) -> Tuple[Dict, Dict]:
+    """Artefakt listesinden G-code/NC artefaktını ve satır dizinini bulur (iş
+    ve post çıktıları için ortak).
+    """
+    gcode = next((a for a in arts if a.get("type") in GCODE_TYPES), None)
+    idx = next((a for a in arts if a.get("type") in tuple(t + "-index" for t in GCODE_TYPES)), None)
+    if not gcode or not idx:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="G-code satır dizini bulunamadı"
+        )
+    index = _load_index(idx["s3_key"], idx.get("sha256", ""))
+    if gcode.get("sha256") and index.get("sha256") != gcode["sha256"]:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Satır dizini G-code artefaktıyla uyuşmuyor",
+        )
+    return gcode, index
+
+
+def index_summary(index: Dict) -> Dict:
+    return {"lines": index["lines"], "size": index["size"], "ops": index["ops"]}
+
+
+def lines_page(gcode: Dict, index: Dict, start: int, count: int) -> Dict:
+    """[start, start+count) satırlarını yalnızca ilgili bayt aralığını (S3
+    ranged GET) indirerek döndürür.
+    """
+    lines, nbytes = read_lines(
+        lambda lo, hi: get_range(gcode["s3_key"], lo, hi), index, start, count
+    )
+    return {
+        "start": start,
+        "count": len(lines),
+        "total_lines": index["lines"],
+        "bytes_fetched": nbytes,
+        "lines": lines,
+    }
+
+
+def _gcode_and_index(job_id: int) -> Tuple[Dict, Dict]:
+    with db_session() as s:
+        job: Optional[Job] = s.get(Job, job_id)
+        if not job:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="İş bulunamadı")
+        arts = list(job.artefacts or [])
+    return resolve_gcode(arts)
+
+
+@router.get("/{job_id}/gcode/index")
+def gcode_index(job_id: int):
+    """Toplam satır/bayt ve operasyon başlangıçları; görüntüleyici
+    sayfalama ve atlama için kullanır.
+    """
+    _, index = _gcode_and_index(job_id)
+    return index_summary(index)
+
+
+@router.get("/{job_id}/gcode/lines")
+def gcode_lines(
+    job_id: int, start: int = Query(1, ge=1), count: int = Query(200, ge=1, le=MAX_RANGE_LINES)
+):
+    """[start, start+count) satırlarını yalnızca ilgili bayt aralığını (S3
+    ranged GET) indirerek döndürür.
+    """
+    return lines_page(*_gcode_and_index(job_id), start, count)
+
+
 @router.post("/{job_id}/cancel", dependencies=[Depends(require_role("admin"))])
 def cancel(job_id: int):
     ok = cancel_job(job_id)
@@ -74,5 +152,3 @@ def pause_queue(name: str):
 def resume_queue(name: str):
     queue_resume(name)
     return {"queue": name, "status": "resumed"}
-
-
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from typing import Dict, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from ..db import db_session
+from ..gcode.line_index import MAX_RANGE_LINES
+from ..models_project import PostRun
+from ..security.oidc import require_role
+from ..settings import app_settings as appset
+from .jobs import index_summary, lines_page, resolve_gcode
+
+router = APIRouter(prefix="/api/v1/posts", tags=["m18-posts"])
+
+
+ROLE_OPERATOR_OR_VIEWER = "operator" if appset.oidc_enabled else "viewer"
+
+
+def _nc_and_index(post_id: int) -> Tuple[Dict, Dict]:
+    with db_session() as s:
+        pr: Optional[PostRun] = s.get(PostRun, post_id)
+        if not pr:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Post çalıştırması bulunamadı"
+            )
+        arts = list(pr.artefacts_json or [])
+    return resolve_gcode(arts)
+
+
+@router.get("/{post_id}/gcode/index", dependencies=[Depends(require_role(ROLE_OPERATOR_OR_VIEWER))])
+def nc_index(post_id: int):
+    """Setup post çıktısının (NC) satır dizini özeti."""
+    _, index = _nc_and_index(post_id)
+    return index_summary(index)
+
+
+@router.get("/{post_id}/gcode/lines", dependencies=[Depends(require_role(ROLE_OPERATOR_OR_VIEWER))])
+def nc_lines(
+    post_id: int, start: int = Query(1, ge=1), count: int = Query(200, ge=1, le=MAX_RANGE_LINES)
+):
+    """NC satırlarını iş G-code'u gibi ranged GET ile sayfalar."""
+    return lines_page(*_nc_and_index(post_id), start, count)
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from typing import Any, Dict, List, Literal, Optional
+
 from pydantic import BaseModel, Field
 
 WcsName = Literal["G54", "G55", "G56", "G57", "G58", "G59"]
@@ -25,7 +26,8 @@ class CamBuildRequest(BaseModel):
 class CamOpSummary(BaseModel):
     name: str
     type: str
-    est_seconds: float
+    # Op Path'inden süre tahmin edilemediyse None
+    est_seconds: Optional[float] = None
 
 
 class CamBuildArtifacts(BaseModel):
@@ -43,5 +45,3 @@ class CamArtifactsOut(BaseModel):
     artifacts: CamBuildArtifacts
     ops: List[CamOpSummary] = []
     job_stats: Dict[str, Any] = {}
-
-
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import List, Literal, Optional
+from typing import Dict, List, Literal, Optional, Union
 
 from pydantic import BaseModel, Field
 
@@ -9,10 +9,21 @@ from .cad import ArtefactRef
 
 class SimJobCreate(BaseModel):
     assembly_job_id: int
+    project_id: Optional[int] = None  # otomatik sınırlarda cam_job.stock bu projeden okunur
     gcode_job_id: Optional[int] = None
+    tool_id: Optional[int] = (
+        None  # takım kütüphanesinden (Tool.id) varsayılan takım; None: 6 mm düz uç
+    )
+    tools: Optional[Dict[int, int]] = None  # T numarası → Tool.id (çok takımlı programlar)
     resolution_mm: float = Field(0.8, gt=0)
-    method: Literal["voxel", "occ-high"] = "voxel"
-    bounds: Optional[dict] = None  # {"x":[0,300],"y":[0,300],"z":[-50,150]}
+    method: Literal["voxel", "occ-high", "heightfield"] = "voxel"
+    storage: Optional[Literal["dense", "packed", "sparse"]] = (
+        None  # voksel ızgara deposu; None: boyuta göre
+    )
+    partitions: Optional[int] = Field(None, ge=1, le=64)  # >1: X dilimlerine bölünmüş dağıtık sim
+    use_cache: bool = True  # aynı girdi + parametrelerle önceki ağı yeniden kullan
+    # {"x":[0,300],"y":[0,300],"z":[-50,150]}; None/"auto": G-code kapsamı ± takım yarıçapı ∪ stok
+    bounds: Union[Literal["auto"], dict, None] = None
 
 
 class SimJobResult(BaseModel):
@@ -20,5 +31,3 @@ class SimJobResult(BaseModel):
     artefacts: List[ArtefactRef] = []
     metrics: dict = {}
     error_message: Optional[str] = None
-
-
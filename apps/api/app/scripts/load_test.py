@@ -68,8 +68,11 @@ def do_chain(base_url: str, prefix: str, timeout: int) -> Dict:
     r.raise_for_status()
     sim_id = r.json()["job_id"]
 
-    # Bekle: sim tamamlanana kadar polling
-    for _ in range(timeout // 5):
+    # Bekle: sim tamamlanana kadar SSE olay akışı; akış koparsa polling'e düş
+    status = wait_events(base_url, sim_id, timeout)
+    if status in ("succeeded", "failed"):
+        return {"ok": status == "succeeded", "elapsed": time.time() - t0, "sim_id": sim_id}
+    for _ in range(max(0, int(timeout - (time.time() - t0))) // 5):
         sj = requests.get(f"{base_url}/api/v1/jobs/{sim_id}", timeout=30)
         if sj.status_code == 200:
             data = sj.json()
@@ -80,6 +83,39 @@ def do_chain(base_url: str, prefix: str, timeout: int) -> Dict:
     return {"ok": False, "elapsed": time.time() - t0, "sim_id": sim_id}
 
 
+def wait_events(base_url: str, job_id: int, timeout: int) -> str | None:
+    """/jobs/{id}/events akışını uç durum olayına kadar okur; son durumu ya da None döndürür.
+    Bağlantı koparsa Last-Event-ID ile yeniden bağlanır.
+    """
+    deadline = time.time() + timeout
+    last_id = None
+    while time.time() < deadline:
+        headers = {"Accept": "text/event-stream"}
+        if last_id:
+            headers["Last-Event-ID"] = last_id
+        try:
+            with requests.get(
+                f"{base_url}/api/v1/jobs/{job_id}/events",
+                headers=headers,
+                stream=True,
+                timeout=(10, 60),
+            ) as r:
+                if r.status_code != 200:
+                    return None
+                for line in r.iter_lines(decode_unicode=True):
+                    if line.startswith("id: "):
+                        last_id = line[4:]
+                    elif line.startswith("data: "):
+                        status = json.loads(line[6:]).get("status")
+                        if status in ("succeeded", "failed"):
+                            return status
+                        if status == "unknown":
+                            return None
+        except requests.RequestException:
+            time.sleep(1)
+    return None
+
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--n", type=int, default=10)
@@ -121,5 +157,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-
-
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Dict, Optional
+
+from ..config import settings
+from ..freecad.cad_build import BuildParams
+from ..logging_setup import get_logger
+from ..metrics import cad_cache_total
+from ..settings import app_settings as appset
+from ..storage import get_s3_client
+from .redis_client import redis_client
+
+logger = get_logger(__name__)
+
+# cad_build geometrisini değiştiren bir değişiklikte artırılır; eski
+# girdiler kendiliğinden geçersizleşir
+CACHE_VERSION = 1
+KEY_PREFIX = "cad:cache:"
+
+
+def _num(v: float) -> float:
+    # 5, 5.0 ve 5.0000000001 aynı anahtarı üretsin
+    return round(float(v), 6)
+
+
+def cad_cache_key(params: BuildParams, freecad_version: Optional[str]) -> str:
+    """Geometriyi belirleyen BuildParams alanları + FreeCAD sürümünden içerik adresli anahtar.
+    Malzeme çıktı dosyalarını değiştirmediği için anahtara girmez; delik sırası korunur.
+    """
+    doc = {
+        "v": CACHE_VERSION,
+        "freecad": freecad_version or "",
+        "size": [_num(params.width), _num(params.height), _num(params.thickness)],
+        "holes": [[_num(x), _num(y), _num(d)] for x, y, d in params.holes],
+        "chamfer": _num(params.chamfer_mm) if params.chamfer_mm else None,
+        "fillet": _num(params.fillet_mm) if params.fillet_mm else None,
+    }
+    return hashlib.sha256(
+        json.dumps(doc, sort_keys=True, separators=(",", ":")).encode()
+    ).hexdigest()
+
+
+def enabled() -> bool:
+    return appset.cad_cache_ttl_s > 0
+
+
+def lookup(key: str) -> Optional[Dict]:
+    """İsabet: {"artifacts": {tür: {s3_key, size, sha256}}, "stats": {...}}. Artefaktlardan biri
+    S3'te yoksa girdi silinip ıska sayılır."""
+    try:
+        raw = redis_client().get(KEY_PREFIX + key)
+    except Exception as e:
+        logger.warning("CAD önbelleği okunamadı", extra={"error": str(e)})
+        raw = None
+    entry = json.loads(raw) if raw else None
+    if entry:
+        try:
+            s3 = get_s3_client()
+            for art in entry["artifacts"].values():
+                s3.head_object(Bucket=settings.s3_bucket_name, Key=art["s3_key"])
+        except Exception:
+            forget(key)
+            entry = None
+    cad_cache_total.labels(result="hit" if entry else "miss").inc()
+    return entry
+
+
+def store(key: str, artifacts: Dict[str, Dict], stats: Dict) -> None:
+    entry = {"artifacts": artifacts, "stats": stats}
+    try:
+        redis_client().set(KEY_PREFIX + key, json.dumps(entry), ex=appset.cad_cache_ttl_s)
+    except Exception as e:
+        logger.warning("CAD önbelleğine yazılamadı", extra={"error": str(e)})
+
+
+def forget(key: str) -> None:
+    try:
+        redis_client().delete(KEY_PREFIX + key)
+    except Exception:
+        pass
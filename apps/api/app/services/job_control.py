@@ -5,10 +5,11 @@ import platform
 import subprocess
 from typing import Optional
 
+from ..audit import audit
 from ..db import db_session
 from ..models import Job
 from ..tasks.worker import celery_app
-from ..audit import audit
+from .redis_client import redis_client
 
 
 def _kill_tree_by_pid(pid: int) -> None:
@@ -22,14 +23,40 @@ def _kill_tree_by_pid(pid: int) -> None:
             pass
 
 
+# Bu türlerin görevleri iptal bayrağını kendileri yoklar; süreç
+# öldürülmez, işçi temizce serbest kalır
+COOPERATIVE_TYPES = {"sim"}
+CANCEL_KEY_PREFIX = "job:cancel:"
+CANCEL_FLAG_TTL_S = 24 * 3600
+
+
+def request_cancel(job_id: int) -> None:
+    try:
+        redis_client().set(f"{CANCEL_KEY_PREFIX}{job_id}", "1", ex=CANCEL_FLAG_TTL_S)
+    except Exception:
+        pass
+
+
+def cancel_requested(job_id: int) -> bool:
+    try:
+        return bool(redis_client().exists(f"{CANCEL_KEY_PREFIX}{job_id}"))
+    except Exception:
+        return False
+
+
 def cancel_job(job_id: int) -> bool:
     with db_session() as s:
         job = s.get(Job, job_id)
         if not job:
             return False
+        cooperative = job.type in COOPERATIVE_TYPES
+        if cooperative:
+            request_cancel(job_id)
         if job.task_id:
             try:
-                celery_app.control.revoke(job.task_id, terminate=True)
+                # Kuyrukta bekleyen görev her durumda düşürülür; çalışan işbirlikçi
+                # görev bayrağı görüp kendisi durur
+                celery_app.control.revoke(job.task_id, terminate=not cooperative)
             except Exception:
                 pass
         # pid_file konvansiyonu: /tmp/<task_id>.pid
@@ -64,5 +91,3 @@ def queue_resume(name: str) -> None:
 
 def is_queue_paused(name: str) -> bool:
     return name in _paused_queues
-
-
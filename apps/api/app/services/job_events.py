@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import json
+import time
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from ..logging_setup import get_logger
+from ..models import Job
+from ..settings import app_settings as appset
+from .redis_client import redis_client
+
+logger = get_logger(__name__)
+
+# İş başına Redis Stream; yeniden bağlanan istemci Last-Event-ID ile kaldığı yerden okur
+STREAM_PREFIX = "job:events:"
+# Akış başına tutulan en fazla olay (yaklaşık kırpma)
+STREAM_MAXLEN = 1000
+STREAM_TTL_S = 24 * 3600
+TERMINAL_STATUSES = ("succeeded", "failed")
+# Aynı aşama içindeki ilerleme olayları en sık bu aralıkla yayınlanır
+PROGRESS_INTERVAL_S = 0.5
+
+_PENDING_KEY = "job_events.pending"
+
+
+def stream_key(job_id: int) -> str:
+    return f"{STREAM_PREFIX}{job_id}"
+
+
+def publish(
+    job_id: int,
+    stage: Optional[str] = None,
+    progress: Optional[float] = None,
+    message: Optional[str] = None,
+    status: Optional[str] = None,
+    **extra,
+) -> None:
+    """İş akışına bir olay ekler. Yayın hatası işi asla bozmaz (yalnızca uyarı loglanır)."""
+    if not appset.job_events:
+        return
+    doc: Dict = {"job_id": job_id, "ts": round(time.time(), 3)}
+    if stage is not None:
+        doc["stage"] = stage
+    if progress is not None:
+        doc["progress"] = round(float(progress), 1)
+    if message:
+        doc["message"] = message
+    if status is not None:
+        doc["status"] = status
+    doc.update({k: v for k, v in extra.items() if v is not None})
+    try:
+        r = redis_client()
+        key = stream_key(job_id)
+        r.xadd(
+            key,
+            {"data": json.dumps(doc, ensure_ascii=False)},
+            maxlen=STREAM_MAXLEN,
+            approximate=True,
+        )
+        r.expire(key, STREAM_TTL_S)
+    except Exception as e:
+        logger.warning("iş olayı yayınlanamadı", extra={"job_id": job_id, "error": str(e)})
+
+
+class StageProgress:
+    """Bir aşamanın iç ilerlemesini (done/total) işin genel yüzdesindeki [lo, hi] aralığına
+    eşleyip seyrekleştirerek yayınlar. Kesim gibi sık geri çağrılar için tasarlanmıştır.
+    """
+
+    def __init__(
+        self, job_id: int, stage: str, lo: float, hi: float, interval_s: float = PROGRESS_INTERVAL_S
+    ) -> None:
+        self.job_id = job_id
+        self.stage = stage
+        self.lo = lo
+        self.hi = hi
+        self.interval_s = interval_s
+        self._last = float("-inf")
+
+    def start(self, message: Optional[str] = None) -> None:
+        publish(self.job_id, stage=self.stage, progress=self.lo, message=message)
+        self._last = time.monotonic()
+
+    def __call__(self, done: int, total: int) -> None:
+        now = time.monotonic()
+        if now - self._last < self.interval_s and done < total:
+            return
+        self._last = now
+        frac = done / total if total else 1.0
+        publish(self.job_id, stage=self.stage, progress=self.lo + (self.hi - self.lo) * frac)
+
+
+def start_stage(
+    job_id: int, stages: Dict[str, Tuple[float, float]], stage: str, message: Optional[str] = None
+) -> StageProgress:
+    """Aşama başlangıç olayını yayınlar; 'stages' aşama → genel yüzde aralığı eşlemesidir.
+    Dönen nesne aşama içi ilerleme geri çağrısıdır."""
+    lo, hi = stages[stage]
+    reporter = StageProgress(job_id, stage, lo, hi)
+    reporter.start(message)
+    return reporter
+
+
+def format_sse(entry_id: str, data: str) -> bytes:
+    return f"id: {entry_id}\ndata: {data}\n\n".encode()
+
+
+def is_terminal(data: str) -> bool:
+    try:
+        return json.loads(data).get("status") in TERMINAL_STATUSES
+    except Exception:
+        return False
+
+
+# Durum olayları: Job.status değiştiren her commit (hangi iş türü ya da süreç olursa olsun)
+# akışa bir durum olayı bırakır; görevlerin her biri ayrıca yayın çağırmak zorunda kalmaz.
+@event.listens_for(Session, "after_flush")
+def _collect_status_changes(session: Session, flush_context) -> None:
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, Job) or obj.id is None:
+            continue
+        if inspect(obj).attrs.status.history.added:
+            session.info.setdefault(_PENDING_KEY, {})[obj.id] = {
+                "status": obj.status,
+                "type": obj.type,
+                "error_code": obj.error_code,
+                "message": obj.error_message,
+            }
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_status_changes(session: Session) -> None:
+    for job_id, doc in session.info.pop(_PENDING_KEY, {}).items():
+        progress = 100.0 if doc["status"] == "succeeded" else None
+        publish(
+            job_id,
+            stage=doc["status"],
+            progress=progress,
+            message=doc["message"],
+            status=doc["status"],
+            type=doc["type"],
+            error_code=doc["error_code"],
+        )
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_status_changes(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import threading
+
+from ..config import settings
+
+# Redis önbellek/iptal/olay yardımcıları iş yolundadır: erişilemeyen
+# Redis uzun beklemelere yol açmamalı
+CONNECT_TIMEOUT_S = 1.0
+READ_TIMEOUT_S = 1.0
+
+_client = None
+_lock = threading.Lock()
+
+
+def redis_client():
+    """Süreç başına tek, bağlantı havuzlu Redis istemcisi (bağlanma ve okuma zaman aşımlı).
+
+    İstemci iş parçacığı güvenlidir; her çağrıda yeni istemci (ve bağlantı havuzu) kurulmaz.
+    """
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                import redis  # type: ignore
+
+                _client = redis.Redis.from_url(
+                    settings.redis_url,
+                    socket_connect_timeout=CONNECT_TIMEOUT_S,
+                    socket_timeout=READ_TIMEOUT_S,
+                )
+    return _client
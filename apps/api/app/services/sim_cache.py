@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Dict, Optional
+
+from ..config import settings
+from ..db import db_session
+from ..logging_setup import get_logger
+from ..metrics import sim_cache_total
+from ..models import Job
+from ..settings import app_settings as appset
+from ..storage import get_s3_client
+from .redis_client import redis_client
+
+logger = get_logger(__name__)
+
+# Ağ çıktısını etkileyen bir değişiklikte artırılır; eski girdiler kendiliğinden geçersizleşir
+CACHE_VERSION = 4
+KEY_PREFIX = "sim:cache:"
+CHECKPOINT_PREFIX = "sim-checkpoints/"
+
+
+def artefact_sha(job_id: Optional[int]) -> Optional[str]:
+    """İşin ilk artefaktının sha256 değeri; iş ya da sha yoksa None."""
+    if not job_id:
+        return None
+    with db_session() as s:
+        job = s.get(Job, job_id)
+        if not job or not job.artefacts:
+            return None
+        return job.artefacts[0].get("sha256")
+
+
+def sim_cache_key(fcstd_sha: str, gcode_sha: Optional[str], sim: Dict) -> str:
+    """Girdi artefakt özetleri + ağı etkileyen sim parametrelerinden içerik adresli anahtar.
+    'sim' yalnızca çıktıyı değiştiren alanları içermeli (depolama türü, dilim sayısı gibi yürütme
+    ayrıntıları anahtara girmez).
+    """
+    doc = {"v": CACHE_VERSION, "fcstd": fcstd_sha, "gcode": gcode_sha or "", "sim": sim}
+    return hashlib.sha256(
+        json.dumps(doc, sort_keys=True, separators=(",", ":")).encode()
+    ).hexdigest()
+
+
+def key_for_job(params: Dict, sim: Dict) -> Optional[str]:
+    """Önbellek kapalıysa ya da girdi özetleri bilinmiyorsa None."""
+    if appset.sim_cache_ttl_s <= 0 or params.get("use_cache") is False:
+        return None
+    fcstd_sha = artefact_sha(params.get("assembly_job_id"))
+    gcode_sha = artefact_sha(params.get("gcode_job_id"))
+    if not fcstd_sha or (params.get("gcode_job_id") and not gcode_sha):
+        return None
+    return sim_cache_key(fcstd_sha, gcode_sha, sim)
+
+
+def lookup(key: str) -> Optional[Dict]:
+    """İsabet: {"artefact": {...}, "metrics": {...}}. Artefakt S3'te
+    yoksa girdi silinip ıska sayılır.
+    """
+    try:
+        raw = redis_client().get(KEY_PREFIX + key)
+    except Exception as e:
+        logger.warning("sim önbelleği okunamadı", extra={"error": str(e)})
+        raw = None
+    entry = json.loads(raw) if raw else None
+    if entry:
+        try:
+            get_s3_client().head_object(
+                Bucket=settings.s3_bucket_name, Key=entry["artefact"]["s3_key"]
+            )
+        except Exception:
+            forget(key)
+            entry = None
+    sim_cache_total.labels(result="hit" if entry else "miss").inc()
+    return entry
+
+
+def store(key: str, artefact: Dict, metrics: Dict) -> None:
+    entry = {"artefact": artefact, "metrics": metrics}
+    try:
+        redis_client().set(KEY_PREFIX + key, json.dumps(entry), ex=appset.sim_cache_ttl_s)
+    except Exception as e:
+        logger.warning("sim önbelleğine yazılamadı", extra={"error": str(e)})
+
+
+def forget(key: str) -> None:
+    try:
+        redis_client().delete(KEY_PREFIX + key)
+    except Exception:
+        pass
+
+
+class S3CheckpointStore:
+    """Takım değişimi kontrol noktaları (sıkıştırılmış kolon tabanı) için S3 deposu.
+    Anahtar zaten içerik adresli olduğundan nesneler değişmez; yaşam döngüsü kuralıyla temizlenir.
+    """
+
+    def __init__(self) -> None:
+        self.s3 = get_s3_client()
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            obj = self.s3.get_object(
+                Bucket=settings.s3_bucket_name, Key=CHECKPOINT_PREFIX + key + ".npz"
+            )
+            return obj["Body"].read()
+        except Exception:
+            return None
+
+    def put(self, key: str, data: bytes) -> None:
+        try:
+            self.s3.put_object(
+                Bucket=settings.s3_bucket_name, Key=CHECKPOINT_PREFIX + key + ".npz", Body=data
+            )
+        except Exception as e:
+            logger.warning("sim kontrol noktası yazılamadı", extra={"error": str(e)})
+
+
+def checkpoint_store() -> Optional[S3CheckpointStore]:
+    if not appset.sim_checkpoints:
+        return None
+    return S3CheckpointStore()
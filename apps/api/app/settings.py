@@ -46,9 +46,50 @@ class AppSettings:
     def __init__(self) -> None:
         self.freecad_queue_concurrency: int = _get_int("FREECAD_QUEUE_CONCURRENCY", 1)
         self.freecad_timeout_seconds: int = _get_int("TIMEOUT_S", 900)
+        # Sıcak FreeCADCmd havuzu (worker süreci başına): boyut, yenilemeden önce en fazla betik ve
+        # bellek tepe sınırı. Havuz yalnızca CAM yol şablonlarını (path_job) çalıştırır; CAD üretimi
+        # süreç içi, yoklama ve dışarıdan gelen betikler tek seferlik süreçtedir. CAM işlemeyen
+        # worker'larda havuz hiç açılmaz.
+        self.freecad_pool: bool = _get_bool("FREECAD_POOL", True)
+        self.freecad_pool_size: int = _get_int("FREECAD_POOL_SIZE", 1)
+        self.freecad_pool_max_jobs: int = _get_int("FREECAD_POOL_MAX_JOBS", 50)
+        self.freecad_pool_max_rss_mb: int = _get_int("FREECAD_POOL_MAX_RSS_MB", 2048)
+        # FreeCAD yetenek kaydının (sürüm, tezgâhlar, post'lar) geçerlilik süresi;
+        # Redis'te bunun iki katı tutulur
+        self.freecad_detect_ttl_s: int = _get_int("FREECAD_DETECT_TTL_S", 300)
         self.sim_resolution_mm_default: float = _get_float("SIM_RESOLUTION_MM_DEFAULT", 0.8)
         self.sim_timeout_s: int = _get_int("SIM_TIMEOUT_S", 1200)
         self.sim_queue_concurrency: int = _get_int("SIM_QUEUE_CONCURRENCY", 1)
+        # Bu hücre sayısının üstündeki voksel ızgaraları varsayılan olarak
+        # seyrek tuğla haritasında tutulur
+        self.sim_dense_max_cells: int = _get_int("SIM_DENSE_MAX_CELLS", 1 << 26)
+        # Tek bir sim işinin kesim aşamasında kullanacağı süreç sayısı (0: tüm çekirdekler)
+        self.sim_carve_workers: int = _get_int("SIM_CARVE_WORKERS", 0)
+        # Otomatik sim sınırlarının dışa yuvarlandığı kafes adımı (mm, 0: yuvarlama yok)
+        self.sim_bounds_snap_mm: float = _get_float("SIM_BOUNDS_SNAP_MM", 10.0)
+        # İçerik adresli sim sonuç önbelleğinin ömrü (0: kapalı)
+        self.sim_cache_ttl_s: int = _get_int("SIM_CACHE_TTL_S", 7 * 24 * 3600)
+        # BuildParams + FreeCAD sürümü anahtarlı CAD artefakt önbelleğinin ömrü (0: kapalı)
+        self.cad_cache_ttl_s: int = _get_int("CAD_CACHE_TTL_S", 30 * 24 * 3600)
+        # Takım değişimlerinde stok durumunu kaydet; değişmeyen önekli
+        # yeniden sim'ler oradan devam eder
+        self.sim_checkpoints: bool = _get_bool("SIM_CHECKPOINTS", True)
+        # Yumuşak süre sınırından bu kadar önce kesim bırakılır; kalan sürede
+        # kısmi sonuç ağa çevrilip yüklenir
+        self.sim_partial_reserve_s: int = _get_int("SIM_PARTIAL_RESERVE_S", 120)
+        # İş aşama/ilerleme olaylarını Redis Streams'e yayınla (SSE /events uçları bunları aktarır)
+        self.job_events: bool = _get_bool("JOB_EVENTS", True)
+        # Çevrim süresi tahmini: G0 hızı, takım değişim süresi ve eksen ivme sınırları
+        # ({"x":..,"y":..,"z":..} mm/s², boş: ivmesiz)
+        self.cycle_rapid_mm_min: float = _get_float("CYCLE_RAPID_MM_MIN", 5000.0)
+        self.cycle_tool_change_s: float = _get_float("CYCLE_TOOL_CHANGE_S", 8.0)
+        self.cycle_accel_mm_s2: Dict[str, float] = _get_json_dict("CYCLE_ACCEL_MM_S2", {})
+        # Delik sıralama (en yakın komşu + 2-opt) için toplam süre bütçesi
+        self.cam_sequence_budget_ms: int = _get_int("CAM_SEQUENCE_BUDGET_MS", 500)
+        # Post sonrası G-code sadeleştirme (modal tekrarlar + G1 dizilerinden yay
+        # uydurma) ve izin verilen sapma
+        self.gcode_compact: bool = _get_bool("GCODE_COMPACT", False)
+        self.gcode_arc_tol_mm: float = _get_float("GCODE_ARC_TOL_MM", 0.01)
         self.require_idempotency: bool = _get_bool("REQUIRE_IDEMPOTENCY", True)
         self.rate_limits: Dict[str, str] = _get_json_dict(
             "RATE_LIMITS", {"assembly": "6/m", "cam": "12/m", "sim": "4/m"}
@@ -86,5 +127,3 @@ class AppSettings:
 
 
 app_settings = AppSettings()
-
-
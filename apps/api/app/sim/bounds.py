@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import math
+from typing import Dict, Optional
+
+import numpy as np
+
+from ..gcode.tokenizer import RAPID, motion_rows
+from .carve import ARC_TOL_FACTOR, Bounds, move_path
+
+AXES = ("x", "y", "z")
+# Izgara tepesi en yüksek hızlı hareketin bu kadar altında kalır: tepe vokseli z ≥ kolon tabanı
+# koşuluyla silindiğinden hızlı hareket düzlemiyle çakışan bir tepe, G0 yollarını oyardı
+RAPID_CLEARANCE_MM = 1e-3
+
+
+def stock_bounds(stock: Optional[Dict]) -> Optional[Bounds]:
+    """cam_job.stock ({"x_mm","y_mm","z_mm"}) → sınır kutusu.
+    İş sıfırı stokun üst-sol-ön köşesinde kabul edilir: X [0, x], Y [0, y], Z [-z, 0].
+    Silindir stokta ölçüler çevreleyen kutu olarak kullanılır.
+    """
+    if not stock:
+        return None
+    try:
+        x, y, z = (float(stock[k]) for k in ("x_mm", "y_mm", "z_mm"))
+    except (KeyError, TypeError, ValueError):
+        return None
+    if min(x, y, z) <= 0:
+        return None
+    return {"x": [0.0, x], "y": [0.0, y], "z": [-z, 0.0]}
+
+
+def move_extents(
+    moves: np.ndarray, tool_radius_mm: float, arc_tol_mm: Optional[float] = None
+) -> Dict[str, Optional[list]]:
+    """Takımın erişebildiği kutu: yaylar kirişlere açılmış yol noktaları XY'de takım yarıçapı kadar
+    genişletilir. Üst Z en yüksek kesme (hızlı olmayan) hareketinin bir takım yarıçapı üstüdür; stok
+    üstü bilinmediğinden en üst kesimin üstündeki malzeme de ızgarada kalır. Üst Z her zaman en
+    yüksek hızlı hareketin (RAPID_CLEARANCE_MM) altındadır; hızlı hareketler malzeme kaldırmaz.
+    Hiç görülmeyen eksen için None döner.
+    """
+    nan = float("nan")
+    pts, row = move_path(moves, home=(nan, nan, nan), arc_tol_mm=arc_tol_mm)
+    out: Dict[str, Optional[list]] = {a: None for a in AXES}
+    if len(pts) == 0:
+        return out
+    with np.errstate(invalid="ignore"):
+        for a, name in enumerate(AXES[:2]):
+            if not np.isnan(pts[:, a]).all():
+                out[name] = [
+                    float(np.nanmin(pts[:, a])) - tool_radius_mm,
+                    float(np.nanmax(pts[:, a])) + tool_radius_mm,
+                ]
+        z = pts[:, 2]
+        if not np.isnan(z).all():
+            rapid = motion_rows(moves)["type"][row] == RAPID
+            out["z"] = [float(np.nanmin(z)), _z_top(z, rapid, tool_radius_mm)]
+    return out
+
+
+def _z_top(z: np.ndarray, rapid: np.ndarray, tool_radius_mm: float) -> float:
+    cut, fast = z[~rapid], z[rapid]
+    top = float(np.nanmax(cut)) + tool_radius_mm if not np.isnan(cut).all() else float(np.nanmax(z))
+    if not np.isnan(fast).all():
+        top = min(top, float(np.nanmax(fast)) - RAPID_CLEARANCE_MM)
+    return max(top, float(np.nanmin(z)))
+
+
+def _snap(v: float, step: float, up: bool) -> float:
+    if step <= 0:
+        return v
+    k = v / step
+    # Kayan nokta gürültüsü (ör. 59.99999) bir ızgara adımı taşırmasın
+    k = math.ceil(k - 1e-9) if up else math.floor(k + 1e-9)
+    return k * step
+
+
+def fit_bounds(
+    moves: np.ndarray,
+    tool_radius_mm: float,
+    res_mm: float,
+    stock: Optional[Dict] = None,
+    fallback: Optional[Bounds] = None,
+    snap_mm: float = 0.0,
+) -> Bounds:
+    """Otomatik sim sınırları: hareket kutusu (+ bir voksel pay) ile stok kutusunun birleşimi.
+    Stok verilmişse üst Z stok üstüdür (stokun üstünde malzeme yoktur). Ne hareketin ne stokun
+    belirlediği eksenler 'fallback' değerinden alınır.
+    snap_mm > 0 ise hareketten gelen X/Y kenarları ve alt Z 'snap_mm' kafesine dışa doğru
+    yuvarlanır; kenar stok içinde kalıyorsa stok kenarı kullanılır. Böylece programın küçük bir
+    düzenlemesi ızgarayı (ve kontrol noktası anahtarını) değiştirmez. Üst Z ne paylanır ne
+    yuvarlanır: hızlı hareket düzleminin altında kalmalıdır (move_extents).
+    """
+    ext = move_extents(moves, tool_radius_mm, arc_tol_mm=ARC_TOL_FACTOR * res_mm)
+    sb = stock_bounds(stock)
+    out: Bounds = {}
+    for a in AXES:
+        lo_hi = ext[a]
+        if lo_hi is not None:
+            hi = lo_hi[1] if a == "z" else _snap(lo_hi[1] + res_mm, snap_mm, up=True)
+            lo_hi = [_snap(lo_hi[0] - res_mm, snap_mm, up=False), hi]
+        if sb is not None:
+            s0, s1 = sb[a]
+            if lo_hi is None:
+                lo_hi = [s0, s1]
+            elif a == "z":
+                lo_hi = [s0 if ext[a][0] - res_mm >= s0 else min(lo_hi[0], s0), s1]
+            else:
+                lo_hi = [
+                    s0 if ext[a][0] - res_mm >= s0 else min(lo_hi[0], s0),
+                    s1 if ext[a][1] + res_mm <= s1 else max(lo_hi[1], s1),
+                ]
+        if lo_hi is None or lo_hi[1] <= lo_hi[0]:
+            if fallback is None:
+                raise RuntimeError(f"Sim sınırları belirlenemedi: {a} ekseni")
+            lo_hi = [float(fallback[a][0]), float(fallback[a][1])]
+        out[a] = [round(float(lo_hi[0]), 6), round(float(lo_hi[1]), 6)]
+    return out
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import time
+from typing import Callable, Optional
+
+# Kesimde yoklamalar arası parça (segment) sayısı; paralel süpürmede her parti ayrı havuz açar
+CHECK_EVERY_SEGMENTS = 1 << 15
+# Ağ üretiminde yoklamalar arası blok sayısı
+CHECK_EVERY_BLOCKS = 64
+# İptal bayrağı (Redis) en sık bu aralıkla sorgulanır
+POLL_INTERVAL_S = 0.5
+
+CANCELLED = "cancelled"
+DEADLINE = "deadline"
+
+
+class SimInterrupted(RuntimeError):
+    """Kesim/ağ döngüsü iptal ya da süre sınırı nedeniyle durdu.
+    reason: 'cancelled' | 'deadline'.
+    """
+
+    def __init__(self, reason: str) -> None:
+        super().__init__(
+            "Sim iptal edildi" if reason == CANCELLED else "Sim süre sınırına yaklaştı"
+        )
+        self.reason = reason
+
+
+class CancelToken:
+    """Uzun döngülerin her N adımda yokladığı işbirlikçi iptal belirteci.
+    cancelled: iptal istendiyse True dönen çağrı (ör. Redis bayrağı);
+    POLL_INTERVAL_S'den sık sorulmaz.
+    deadline: time.monotonic() cinsinden kesimin bırakılacağı an
+    (yumuşak sınırdan ağ payı düşülmüş).
+    """
+
+    def __init__(
+        self,
+        cancelled: Optional[Callable[[], bool]] = None,
+        deadline: Optional[float] = None,
+        poll_interval_s: float = POLL_INTERVAL_S,
+    ) -> None:
+        self.cancelled = cancelled
+        self.deadline = deadline
+        self.poll_interval_s = poll_interval_s
+        self._last_poll = float("-inf")
+
+    def check(self, deadline: bool = True) -> None:
+        """İptal istendiyse ya da (deadline=True iken) süre dolduysa SimInterrupted fırlatır.
+        Ağ aşaması deadline=False ile yoklar: kısmi sonuç o aşamada zaten üretilmektedir.
+        """
+        now = time.monotonic()
+        if deadline and self.deadline is not None and now >= self.deadline:
+            raise SimInterrupted(DEADLINE)
+        if self.cancelled is not None and now - self._last_poll >= self.poll_interval_s:
+            self._last_poll = now
+            if self.cancelled():
+                raise SimInterrupted(CANCELLED)
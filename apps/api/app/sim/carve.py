@@ -0,0 +1,443 @@
+from __future__ import annotations
+
+import hashlib
+import math
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..gcode.tokenizer import ARC_CCW, ARC_CW, PLANE_XY, motion_rows
+from .voxgrid import VoxelGrid
+
+Bounds = Dict[str, Sequence[float]]
+
+# Tek partide işlenecek en fazla damga (örnek nokta × kernel hücresi); tepe belleği sınırlar
+STAMP_BATCH = 1 << 21
+# Yay kirişlerinin gerçek yaydan en fazla sapması (voksel boyu cinsinden)
+ARC_TOL_FACTOR = 0.25
+# Tek yayın açılabileceği en fazla kiriş (bozuk yarıçaplı yaylara karşı üst sınır)
+MAX_ARC_SEGMENTS = 1 << 12
+# G17/G18/G19 için (u, v, eksen) sırası; u→v dönüşü yay düzleminin pozitif (CCW) yönüdür
+_PLANE_AXES = np.array([[0, 1, 2], [2, 0, 1], [1, 2, 0]])
+
+
+@dataclass(frozen=True)
+class GridSpec:
+    origin: Tuple[float, float, float]
+    res_mm: float
+    shape: Tuple[int, int, int]
+
+    @classmethod
+    def from_bounds(cls, bounds: Bounds, res_mm: float) -> "GridSpec":
+        nx = int((bounds["x"][1] - bounds["x"][0]) / res_mm) + 1
+        ny = int((bounds["y"][1] - bounds["y"][0]) / res_mm) + 1
+        nz = int((bounds["z"][1] - bounds["z"][0]) / res_mm) + 1
+        origin = (float(bounds["x"][0]), float(bounds["y"][0]), float(bounds["z"][0]))
+        return cls(origin, float(res_mm), (nx, ny, nz))
+
+    @property
+    def top_mm(self) -> float:
+        return self.origin[2] + (self.shape[2] - 1) * self.res_mm
+
+    def sub(self, x0: int, x1: int, y0: int, y1: int) -> "GridSpec":
+        """[x0,x1)×[y0,y1) kolon aralığını kapsayan, tam Z boylu alt ızgara."""
+        return GridSpec(
+            (self.origin[0] + x0 * self.res_mm, self.origin[1] + y0 * self.res_mm, self.origin[2]),
+            self.res_mm,
+            (x1 - x0, y1 - y0, self.shape[2]),
+        )
+
+
+@dataclass(frozen=True)
+class ToolKernel:
+    """Takım izdüşümünün önceden hesaplanmış kolon ofsetleri.
+    lift: takım ucundan itibaren o kolondaki kesici yüzeyin yüksekliği (düz uçta 0).
+    """
+
+    dx: np.ndarray
+    dy: np.ndarray
+    lift: np.ndarray
+    radius_mm: float
+
+
+@dataclass(frozen=True)
+class ToolShape:
+    """Takım profili. kind: "flat" | "ball" | "bull" | "cone".
+    corner_mm: bull-nose köşe yarıçapı; tip_angle_deg: konik uç (matkap, pah) tepe açısı.
+    """
+
+    kind: str
+    diam_mm: float
+    corner_mm: float = 0.0
+    tip_angle_deg: float = 118.0
+
+    # Takım kütüphanesindeki tür adları → profil
+    LIBRARY_KINDS = {
+        "endmill_flat": "flat",
+        "endmill_ball": "ball",
+        "ballend": "ball",
+        "ballnose": "ball",
+        "endmill_bull": "bull",
+        "bullnose": "bull",
+        "drill": "cone",
+        "chamfer": "cone",
+        "vbit": "cone",
+    }
+
+    @classmethod
+    def from_library(
+        cls, tool_type: Optional[str], diam_mm: float, geometry: Optional[Dict] = None
+    ) -> "ToolShape":
+        """Tool.type + ToolBit geometry ({"corner_radius", "tip_angle"}) →
+        profil; bilinmeyen tür düz uçtur.
+        """
+        geom = geometry or {}
+        kind = cls.LIBRARY_KINDS.get((tool_type or "").lower(), "flat")
+        corner = float(geom.get("corner_radius") or 0.0)
+        if kind == "ball":
+            corner = diam_mm / 2.0
+        default_angle = 90.0 if (tool_type or "").lower() in ("chamfer", "vbit") else 118.0
+        return cls(kind, float(diam_mm), corner, float(geom.get("tip_angle") or default_angle))
+
+    def lift(self, d: np.ndarray) -> np.ndarray:
+        """Eksenden 'd' uzaklıkta kesici yüzeyin takım ucuna göre yüksekliği (d ≤ yarıçap)."""
+        r = self.diam_mm / 2.0
+        if self.kind == "cone":
+            return d / math.tan(math.radians(self.tip_angle_deg) / 2.0)
+        rc = r if self.kind == "ball" else min(max(self.corner_mm, 0.0), r)
+        if rc <= 0:
+            return np.zeros_like(d)
+        e = np.maximum(d - (r - rc), 0.0)
+        return rc - np.sqrt(np.maximum(rc * rc - e * e, 0.0))
+
+
+def _disc_offsets(radius: float, res_mm: float) -> Tuple[np.ndarray, np.ndarray]:
+    n = int(math.ceil(radius / res_mm))
+    g = np.arange(-n, n + 1, dtype=np.int32)
+    dx, dy = np.meshgrid(g, g, indexing="ij")
+    mask = (dx * dx + dy * dy) * (res_mm * res_mm) <= radius * radius + 1e-9
+    mask[n, n] = True  # çözünürlükten küçük takım en az merkez kolonu keser
+    return dx[mask], dy[mask]
+
+
+@lru_cache(maxsize=64)
+def flat_kernel(tool_diam_mm: float, res_mm: float) -> ToolKernel:
+    radius = tool_diam_mm / 2.0
+    dx, dy = _disc_offsets(radius, res_mm)
+    return ToolKernel(dx, dy, np.zeros(len(dx), dtype=np.float32), radius)
+
+
+@lru_cache(maxsize=64)
+def tool_kernel(shape: ToolShape, res_mm: float) -> ToolKernel:
+    """Profilin damga maskesi; (profil, çözünürlük) başına bir kez hesaplanır ve paylaşılır."""
+    radius = shape.diam_mm / 2.0
+    if shape.kind == "flat" or (shape.kind == "bull" and shape.corner_mm <= 0):
+        return flat_kernel(shape.diam_mm, res_mm)
+    dx, dy = _disc_offsets(radius, res_mm)
+    d = np.minimum(np.hypot(dx, dy) * res_mm, radius)
+    return ToolKernel(dx, dy, shape.lift(d).astype(np.float32), radius)
+
+
+@dataclass(frozen=True)
+class KernelSet:
+    """Takım numarası → kernel; eşlenmemiş takımlar 'default' ile kesilir."""
+
+    default: ToolKernel
+    by_tool: Dict[int, ToolKernel] = field(default_factory=dict)
+
+    def get(self, tool: int) -> ToolKernel:
+        return self.by_tool.get(int(tool), self.default)
+
+    @property
+    def radius_mm(self) -> float:
+        return max([self.default.radius_mm] + [k.radius_mm for k in self.by_tool.values()])
+
+    def digest(self) -> str:
+        """Kesim geometrisini belirleyen özet (kontrol noktası tuzlaması için)."""
+        h = hashlib.sha256()
+        for tool, k in [(None, self.default)] + sorted(self.by_tool.items()):
+            h.update(f"{tool}:{k.radius_mm}:".encode())
+            h.update(np.ascontiguousarray(k.lift).tobytes())
+        return h.hexdigest()
+
+
+def as_kernel_set(kernels) -> KernelSet:
+    return kernels if isinstance(kernels, KernelSet) else KernelSet(kernels)
+
+
+def move_endpoints(moves: np.ndarray, home: Tuple[float, float, float]) -> np.ndarray:
+    """Hareket tablosundan (N,3) mutlak uç nokta dizisi üretir.
+    Bilinmeyen (NaN) eksenler son bilinen değerle doldurulur; ilk görülmeden önceki değerler
+    ilk bilinen değere, hiç görülmeyen eksenler 'home' değerine eşitlenir.
+    """
+    mv = motion_rows(moves)
+    pts = np.column_stack([mv["x"], mv["y"], mv["z"]]).astype(np.float64)
+    return _fill_axes(pts, home)
+
+
+def move_path(
+    moves: np.ndarray, home: Tuple[float, float, float], arc_tol_mm: Optional[float] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """move_endpoints + G2/G3 yaylarının 'arc_tol_mm' sapmalı kirişlere açılması.
+    Dönüş: (noktalar (N,3), satır (N,)); satır[i], i. noktayı üreten hareket satırının indeksidir
+    (artan sırada; takım ve kontrol noktası eşlemesi için). arc_tol_mm
+    verilmezse yaylar uç noktadır.
+    """
+    ends = move_endpoints(moves, home)
+    row = np.arange(len(ends))
+    if arc_tol_mm is None or len(ends) < 2:
+        return ends, row
+    mv = motion_rows(moves)
+    arc = np.isin(mv["type"], (ARC_CW, ARC_CCW))
+    arc[0] = False  # ilk hareketin başlangıç noktası bilinmiyor
+    idx = np.flatnonzero(arc)
+    if len(idx) == 0:
+        return ends, row
+    arc_pts, n = _arc_chords(ends[idx - 1], ends[idx], mv[idx], arc_tol_mm)
+    counts = np.ones(len(ends), dtype=np.int64)
+    counts[idx] = n
+    starts = np.cumsum(counts) - counts
+    pts = np.empty((int(counts.sum()), 3), dtype=np.float64)
+    line = ~arc
+    pts[starts[line]] = ends[line]
+    k = np.arange(int(n.sum())) - np.repeat(np.cumsum(n) - n, n)
+    pts[np.repeat(starts[idx], n) + k] = arc_pts
+    return pts, np.repeat(row, counts)
+
+
+def _arc_chords(
+    s: np.ndarray, e: np.ndarray, mv: np.ndarray, tol: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Yayları (IJK merkez ofseti ya da R yarıçapı; G17/G18/G19) kiriş uç noktalarına çevirir.
+    Düzleme dik eksen doğrusal ilerler (helis). Dönüş: (tüm yayların noktaları, yay başına nokta
+    sayısı); her yayın son noktası tam olarak programlanan uç noktadır.
+    """
+    m = len(s)
+    ar = np.arange(m)
+    plane = np.clip(
+        np.where(mv["plane"] == 0, PLANE_XY, mv["plane"]).astype(np.int64) - PLANE_XY, 0, 2
+    )
+    ax = _PLANE_AXES[plane]
+    offs = np.nan_to_num(np.column_stack([mv["i"], mv["j"], mv["k"]]))
+    su, sv, sw = (s[ar, ax[:, q]] for q in range(3))
+    eu, ev, ew = (e[ar, ax[:, q]] for q in range(3))
+    ou, ov = offs[ar, ax[:, 0]], offs[ar, ax[:, 1]]
+    ccw = mv["type"] == ARC_CCW
+    cu, cv = su + ou, sv + ov
+
+    # R biçimi: merkez kirişin orta dikmesinde; G3/R>0 → sol, G2/R>0 → sağ, R<0 taraf değiştirir
+    rad = mv["r"]
+    r_form = ~np.isnan(rad) & (ou == 0) & (ov == 0)
+    if r_form.any():
+        du, dv = eu - su, ev - sv
+        d = np.hypot(du, dv)
+        ds = np.where(d > 0, d, 1.0)
+        h = np.sqrt(np.maximum(rad * rad - (d / 2.0) ** 2, 0.0))
+        side = np.where(ccw, 1.0, -1.0) * np.sign(np.nan_to_num(rad))
+        cu = np.where(r_form, (su + eu) / 2.0 - side * h * dv / ds, cu)
+        cv = np.where(r_form, (sv + ev) / 2.0 + side * h * du / ds, cv)
+
+    t0 = np.arctan2(sv - cv, su - cu)
+    t1 = np.arctan2(ev - cv, eu - cu)
+    rs, re = np.hypot(su - cu, sv - cv), np.hypot(eu - cu, ev - cv)
+    two_pi = 2.0 * math.pi
+    sweep = np.where(ccw, np.mod(t1 - t0, two_pi), -np.mod(t0 - t1, two_pi))
+    # IJK biçiminde başlangıç = bitiş tam çemberdir
+    full = ~r_form & (np.abs(sweep) < 1e-9) & (np.hypot(eu - su, ev - sv) < 1e-9) & (rs > 0)
+    sweep = np.where(full, np.where(ccw, two_pi, -two_pi), sweep)
+
+    r = np.maximum(rs, re)
+    step = 2.0 * np.arccos(np.clip(1.0 - tol / np.maximum(r, 1e-12), -1.0, 1.0))
+    n = np.ceil(np.abs(sweep) / np.maximum(step, 1e-9))
+    n = np.clip(np.nan_to_num(n, nan=1.0), 1, MAX_ARC_SEGMENTS).astype(np.int64)
+
+    arc = np.repeat(ar, n)
+    k = np.arange(int(n.sum())) - np.repeat(np.cumsum(n) - n, n) + 1
+    t = k / n[arc]
+    theta = t0[arc] + sweep[arc] * t
+    rr = rs[arc] + (re - rs)[arc] * t
+    out = np.empty((len(arc), 3), dtype=np.float64)
+    a = ax[arc]
+    pr = np.arange(len(arc))
+    out[pr, a[:, 0]] = cu[arc] + rr * np.cos(theta)
+    out[pr, a[:, 1]] = cv[arc] + rr * np.sin(theta)
+    out[pr, a[:, 2]] = sw[arc] + (ew - sw)[arc] * t
+    last = np.cumsum(n) - 1
+    out[last] = e
+    return out, n
+
+
+def _fill_axes(pts: np.ndarray, home: Tuple[float, float, float]) -> np.ndarray:
+    for a in range(3):
+        col = pts[:, a]
+        known = ~np.isnan(col)
+        if not known.any():
+            col[:] = home[a]
+            continue
+        idx = np.where(known, np.arange(len(col)), 0)
+        np.maximum.accumulate(idx, out=idx)
+        first = int(np.argmax(known))
+        idx[:first] = first
+        pts[:, a] = col[idx]
+    return pts
+
+
+def segments(pts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Uç nokta dizisini (başlangıç, bitiş) parça çiftlerine çevirir;
+    tek nokta sıfır boylu parça olur.
+    """
+    if len(pts) == 1:
+        return pts, pts
+    return pts[:-1], pts[1:]
+
+
+def iter_pair_samples(
+    a: np.ndarray, b: np.ndarray, step_mm: float, max_samples: int
+) -> Iterator[np.ndarray]:
+    """a[i]→b[i] doğru parçalarını 'step_mm' aralıkla örnekler.
+    Adım voksel boyunu aşmadığı sürece yuvarlanan örnekler komşu kolonlardan geçer; iz kopmaz.
+    Parçalar, her partide en fazla 'max_samples' nokta olacak şekilde gruplanır.
+    """
+    if len(a) == 0:
+        return
+    p0 = a
+    d = b - a
+    seg_len = np.sqrt((d * d).sum(axis=1))
+    n = np.maximum(1, np.ceil(seg_len / step_mm)).astype(np.int64)
+    counts = n + 1
+    ends = np.cumsum(counts)
+    max_samples = max(int(max_samples), int(counts.max()))
+    start = 0
+    while start < len(counts):
+        base = ends[start - 1] if start else 0
+        stop = int(np.searchsorted(ends, base + max_samples, side="right"))
+        stop = max(stop, start + 1)
+        c = counts[start:stop]
+        seg = np.repeat(np.arange(start, stop), c)
+        offs = np.repeat(np.cumsum(c) - c, c)
+        k = np.arange(int(c.sum())) - offs
+        t = (k / n[seg])[:, None]
+        yield p0[seg] + d[seg] * t
+        start = stop
+
+
+def _stamp_columns(
+    samples: np.ndarray, kernel: ToolKernel, spec: GridSpec
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Örnek noktaları kernel ile genişletip (doğrusal kolon indeksi,
+    kesici taban yüksekliği) döndürür.
+    """
+    nx, ny, _ = spec.shape
+    ox, oy, _ = spec.origin
+    ix = np.rint((samples[:, 0] - ox) / spec.res_mm).astype(np.int64)
+    iy = np.rint((samples[:, 1] - oy) / spec.res_mm).astype(np.int64)
+    cx = ix[:, None] + kernel.dx[None, :]
+    cy = iy[:, None] + kernel.dy[None, :]
+    cz = samples[:, 2][:, None] + kernel.lift[None, :]
+    inside = (cx >= 0) & (cx < nx) & (cy >= 0) & (cy < ny)
+    return (cx[inside] * ny + cy[inside]), cz[inside]
+
+
+def _lowest_per_cell(samples: np.ndarray, spec: GridSpec) -> np.ndarray:
+    """Aynı kolona düşen örneklerden yalnızca en düşüğünü bırakır (dalma
+    hareketlerinde kernel tekrarını önler).
+    """
+    ix = np.rint((samples[:, 0] - spec.origin[0]) / spec.res_mm).astype(np.int64)
+    iy = np.rint((samples[:, 1] - spec.origin[1]) / spec.res_mm).astype(np.int64)
+    key = ix * (1 << 31) + iy
+    uk, first, inv = np.unique(key, return_index=True, return_inverse=True)
+    if len(uk) == len(key):
+        return samples
+    z = np.full(len(uk), np.inf)
+    np.minimum.at(z, inv.reshape(-1), samples[:, 2])
+    out = samples[first]
+    out[:, 2] = z
+    return out
+
+
+def sweep_column_floor(
+    floor: np.ndarray, pts: np.ndarray, kernel: ToolKernel, spec: GridSpec
+) -> None:
+    """Tüm hareketlerin süpürdüğü takım gövdesi için kolon başına en düşük kesici yüksekliğini (mm)
+    'floor' (nx,ny) dizisine yerinde indirger. Kesme sırası sonucu etkilemez.
+    """
+    if len(pts):
+        sweep_segments(floor, *segments(pts), kernel, spec)
+
+
+def sweep_segments(
+    floor: np.ndarray, a: np.ndarray, b: np.ndarray, kernel: ToolKernel, spec: GridSpec
+) -> None:
+    """sweep_column_floor'un parça çiftleri (a[i]→b[i]) üzerinde çalışan hâli; döşemeli kesimde
+    her döşemeye yalnızca onu kesen parçalar verilir. 'floor' bitişik olmak zorunda değildir:
+    büyük tabanın bir döşeme görünümü kopyalanmadan yerinde güncellenir.
+    """
+    if not kernel.lift.any():
+        _sweep_flat_segments(floor, a, b, kernel.radius_mm, spec)
+        return
+    per_batch = max(1, STAMP_BATCH // len(kernel.dx))
+    for samples in iter_pair_samples(a, b, spec.res_mm, per_batch):
+        lin, cz = _stamp_columns(_lowest_per_cell(samples, spec), kernel, spec)
+        np.minimum.at(floor, np.divmod(lin, spec.shape[1]), cz.astype(floor.dtype, copy=False))
+
+
+def _sweep_flat_segments(
+    floor: np.ndarray, p0: np.ndarray, p1: np.ndarray, radius: float, spec: GridSpec
+) -> None:
+    """Düz uçlu takım için kolon tabanını örneklemeden, parça başına kesin olarak hesaplar.
+    Kolon merkezinin takım diskinde kaldığı t aralığı [ta, tb] kapalı biçimde bulunur; z doğrusal
+    olduğundan en düşük değer aralığın bir ucundadır. Uzun parçalar 2r boyunda alt parçalara
+    bölünür, böylece her alt parça sabit boyutlu bir hücre penceresiyle toplu (vektörel) işlenir.
+    """
+    nx, ny, _ = spec.shape
+    ox, oy, _ = spec.origin
+    res = spec.res_mm
+    r = max(radius, 0.5 * res)  # çözünürlükten küçük takım en az geçtiği kolonları keser
+    piece = max(2.0 * r, 4.0 * res)
+
+    d = p1 - p0
+    n = np.maximum(1, np.ceil(np.hypot(d[:, 0], d[:, 1]) / piece)).astype(np.int64)
+    seg = np.repeat(np.arange(len(n)), n)
+    k = np.arange(int(n.sum())) - np.repeat(np.cumsum(n) - n, n)
+    a = p0[seg] + d[seg] * (k / n[seg])[:, None]
+    b = p0[seg] + d[seg] * ((k + 1) / n[seg])[:, None]
+
+    w = int(math.ceil((piece + 2.0 * r) / res)) + 2
+    i0 = np.floor((np.minimum(a[:, 0], b[:, 0]) - r - ox) / res).astype(np.int64)
+    j0 = np.floor((np.minimum(a[:, 1], b[:, 1]) - r - oy) / res).astype(np.int64)
+    u = np.arange(w, dtype=np.int64)
+    r2 = r * r + 1e-9
+    # Pencere başına ~10 geçici float64 dizi: parti boyu tepe belleği STAMP_BATCH'e yakın tutar
+    per_batch = max(1, (STAMP_BATCH // 4) // (w * w))
+    for s in range(0, len(a), per_batch):
+        e = min(len(a), s + per_batch)
+        ci = i0[s:e, None, None] + u[None, :, None]
+        cj = j0[s:e, None, None] + u[None, None, :]
+        ax, ay, az = (a[s:e, q, None, None] for q in range(3))
+        ddx, ddy, ddz = ((b[s:e, q] - a[s:e, q])[:, None, None] for q in range(3))
+        rx = ox + ci * res - ax
+        ry = oy + cj * res - ay
+        l2 = ddx * ddx + ddy * ddy
+        moving = l2 > 1e-18
+        l2s = np.where(moving, l2, 1.0)
+        tc = np.where(moving, (rx * ddx + ry * ddy) / l2s, 0.0)
+        h2 = np.where(moving, (rx * ddy - ry * ddx) ** 2 / l2s, rx * rx + ry * ry)
+        half = np.where(moving, np.sqrt(np.maximum(r2 - h2, 0.0) / l2s), np.inf)
+        ta = np.maximum(tc - half, 0.0)
+        tb = np.minimum(tc + half, 1.0)
+        ok = (h2 <= r2) & (ta <= tb) & (ci >= 0) & (ci < nx) & (cj >= 0) & (cj < ny)
+        z = az + ddz * np.where(ddz < 0, tb, ta)
+        ii, jj = np.broadcast_arrays(ci, cj)
+        np.minimum.at(floor, (ii[ok], jj[ok]), z[ok].astype(floor.dtype, copy=False))
+
+
+def apply_column_floor(grid: VoxelGrid, floor: np.ndarray, spec: GridSpec) -> int:
+    """Kolon tabanının üstünde kalan vokselleri sıfırlar; kaldırılan
+    dolu voksel sayısını döndürür.
+    """
+    nz = spec.shape[2]
+    kmin = np.ceil((floor - spec.origin[2]) / spec.res_mm - 1e-6)
+    kmin = np.clip(np.nan_to_num(kmin, nan=nz, posinf=nz, neginf=0), 0, nz).astype(np.int32)
+    return grid.apply_column_floor(kmin)
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Protocol, Tuple, Union
+
+import numpy as np
+
+from ..gcode.tokenizer import MOTION_TYPES, TOOL_CHANGE, motion_rows
+from .cancel import CHECK_EVERY_SEGMENTS, CancelToken, SimInterrupted
+from .carve import ARC_TOL_FACTOR, GridSpec, KernelSet, ToolKernel, as_kernel_set, move_path
+from .parallel import SweepPool, sweep_path_parallel
+
+# Kolon tabanı biçimi ya da kesim geometrisi değişirse artırılır
+CHECKPOINT_VERSION = 2
+
+
+class CheckpointStore(Protocol):
+    def get(self, key: str) -> Optional[bytes]: ...
+
+    def put(self, key: str, data: bytes) -> None: ...
+
+
+@dataclass
+class ResumeStats:
+    checkpoints: int = 0
+    resumed_from_line: int = 0
+    resumed_moves: int = 0
+    carved_moves: int = 0
+    total_moves: int = 0
+    # Kesim yarıda kaldıysa 'cancelled' | 'deadline'; taban o ana kadar işlenen hareketleri içerir
+    interrupted: Optional[str] = None
+    saved: List[str] = field(default_factory=list)
+
+    @property
+    def processed_pct(self) -> float:
+        if not self.total_moves:
+            return 100.0
+        return round(100.0 * (self.resumed_moves + self.carved_moves) / self.total_moves, 2)
+
+    def as_metrics(self) -> Dict:
+        return {
+            "checkpoints": self.checkpoints,
+            "resumed_from_line": self.resumed_from_line,
+            "resumed_moves": self.resumed_moves,
+            "carved_moves": self.carved_moves,
+            "checkpoints_saved": len(self.saved),
+            "moves_processed_pct": self.processed_pct,
+        }
+
+
+def dump_floor(floor: np.ndarray) -> bytes:
+    bio = io.BytesIO()
+    np.savez_compressed(bio, floor=floor)
+    return bio.getvalue()
+
+
+def load_floor(data: bytes, shape: Tuple[int, int]) -> Optional[np.ndarray]:
+    with np.load(io.BytesIO(data)) as z:
+        floor = z["floor"]
+    return floor if floor.shape == shape else None
+
+
+def tool_change_boundaries(
+    source: bytes, moves: np.ndarray, salt: str
+) -> List[Tuple[int, int, str]]:
+    """Her T/M6 satırı için (hareket indeksi, satır no, anahtar) üretir.
+    hareket indeksi: takım değişiminden önceki hareket satırı sayısı (uç nokta dizisinde sınır).
+    anahtar: G-code önekinin (takım değişimi satırı dahil) sha256'sı + ızgara/takım tuzlaması.
+    """
+    tc = np.flatnonzero(moves["type"] == TOOL_CHANGE)
+    if len(tc) == 0:
+        return []
+    is_motion = np.isin(moves["type"], MOTION_TYPES)
+    motion_before = np.cumsum(is_motion) - is_motion
+    newlines = np.flatnonzero(np.frombuffer(source, dtype=np.uint8) == 10)
+    h = hashlib.sha256(salt.encode())
+    pos = 0
+    out: List[Tuple[int, int, str]] = []
+    for r in tc:
+        line = int(moves["line_no"][r])
+        end = int(newlines[line - 1]) + 1 if line - 1 < len(newlines) else len(source)
+        h.update(source[pos:end])
+        pos = end
+        k = int(motion_before[r])
+        if k > 0 and (not out or out[-1][0] < k):
+            out.append((k, line, h.copy().hexdigest()))
+    return out
+
+
+def checkpoint_salt(spec: GridSpec, kernels: KernelSet, first_point: np.ndarray) -> str:
+    """Öneki aynı olsa da tabanı değiştiren her şey: ızgara, takım ve başlangıç noktası.
+    İlk nokta, hiç görülmemiş eksenlerin dosyanın ilerisinden geri doldurulmasını yakalar.
+    """
+    doc = {
+        "v": CHECKPOINT_VERSION,
+        "origin": list(spec.origin),
+        "res": spec.res_mm,
+        "shape": list(spec.shape),
+        "kernels": kernels.digest(),
+        "arc_tol": ARC_TOL_FACTOR,
+        "p0": [round(float(v), 6) for v in first_point],
+    }
+    return json.dumps(doc, sort_keys=True)
+
+
+def sweep_with_checkpoints(
+    floor: np.ndarray,
+    moves: np.ndarray,
+    source: bytes,
+    kernels: Union[KernelSet, ToolKernel],
+    spec: GridSpec,
+    store: Optional[CheckpointStore],
+    pool: Optional[SweepPool] = None,
+    token: Optional[CancelToken] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> ResumeStats:
+    """Kolon tabanını takım değişimi kontrol noktalarıyla hesaplar.
+    Eşleşen en derin kontrol noktasından devam eder, yalnızca değişen son kısmı keser ve sonraki
+    her takım değişiminde yeni kontrol noktası yazar. Kesim min işlemi olduğundan
+    taban(önek ∪ sonek) = min(taban(önek), taban(sonek)); sonuç tam kesimle aynıdır.
+    'token' her CHECK_EVERY_SEGMENTS parçada yoklanır; kesilirse taban işlenmiş önekin tabanıdır ve
+    stats.interrupted nedeni taşır (yarım bölüm için kontrol noktası yazılmaz).
+    'progress' her partiden sonra (işlenmiş hareket, toplam hareket) ile çağrılır.
+    'pool' verilirse 'floor' pool.floor olmalıdır; tüm partiler aynı işçi havuzuyla kesilir.
+    """
+    stats = ResumeStats()
+    kernels = as_kernel_set(kernels)
+    pts, row = move_path(
+        moves, home=(0.0, 0.0, spec.top_mm), arc_tol_mm=ARC_TOL_FACTOR * spec.res_mm
+    )
+    if len(pts) == 0:
+        return stats
+    tools = motion_rows(moves)["tool"][row]
+    n_moves = int(row[-1]) + 1
+    stats.total_moves = n_moves
+    bounds = (
+        tool_change_boundaries(source, moves, checkpoint_salt(spec, kernels, pts[0]))
+        if store is not None
+        else []
+    )
+    stats.checkpoints = len(bounds)
+
+    start, bounds = _resume(floor, bounds, store, stats)
+    stops = [(k, key) for k, _, key in bounds if k > start] + [(n_moves, None)]
+    prev = start
+    for k, key in stops:
+        # Hareket sınırları nokta indeksine çevrilir (yaylar birden çok noktaya açılır);
+        # sınırdaki parça (pts[p0-1] → pts[p0]) sonraki bölüme aittir
+        p0, p1 = int(np.searchsorted(row, prev)), int(np.searchsorted(row, k))
+        s0 = max(p0 - 1, 0)
+        if p1 - s0 == 1 and p0 == 0:
+            sweep_path_parallel(floor, pts[:1], tools[:1], kernels, spec, pool)
+        # Partiler bir nokta örtüşür: her parti bir önceki partinin son noktasından başlar
+        for c0 in range(s0, p1 - 1, CHECK_EVERY_SEGMENTS):
+            c1 = min(c0 + CHECK_EVERY_SEGMENTS + 1, p1)
+            sweep_path_parallel(floor, pts[c0:c1], tools[c0:c1], kernels, spec, pool)
+            if progress is not None:
+                progress(moves_done(row, c1), n_moves)
+            if token is not None:
+                try:
+                    token.check()
+                except SimInterrupted as e:
+                    stats.interrupted = e.reason
+                    stats.carved_moves = moves_done(row, c1) - start
+                    return stats
+        if key:
+            store.put(key, dump_floor(floor))
+            stats.saved.append(key)
+        prev = k
+    stats.carved_moves = n_moves - start
+    return stats
+
+
+def _resume(
+    floor: np.ndarray,
+    bounds: List[Tuple[int, int, str]],
+    store: Optional[CheckpointStore],
+    stats: ResumeStats,
+) -> Tuple[int, List[Tuple[int, int, str]]]:
+    """Depodaki en derin kontrol noktasını 'floor'a uygular.
+    Dönüş: (devam edilecek hareket indeksi, ondan sonraki sınırlar).
+    """
+    for i in range(len(bounds) - 1, -1, -1):
+        k, line, key = bounds[i]
+        data = store.get(key)
+        saved = load_floor(data, floor.shape) if data else None
+        if saved is not None:
+            floor[...] = np.minimum(floor, saved)
+            stats.resumed_from_line = line
+            stats.resumed_moves = k
+            return k, bounds[i + 1 :]
+    return 0, bounds
+
+
+def moves_done(row: np.ndarray, end: int) -> int:
+    """pts[:end] süpürüldüğünde tamamı işlenmiş hareket sayısı (yarım kalan yay sayılmaz)."""
+    if end <= 0:
+        return 0
+    last = int(row[end - 1])
+    return last + 1 if end >= len(row) or int(row[end]) != last else last
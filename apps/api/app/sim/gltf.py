@@ -0,0 +1,318 @@
+from __future__ import annotations
+
+import shutil
+import struct
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Hashable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from pygltflib import GLTF2, Accessor, Attributes, Buffer, BufferView, Mesh, Node, Primitive, Scene
+
+from .cancel import CHECK_EVERY_BLOCKS, CancelToken
+from .voxgrid import VoxelGrid, iter_mesh_blocks
+
+MeshPiece = Tuple[Hashable, np.ndarray, np.ndarray]
+
+# Uzamsal parça kenarı (tuğla sayısı); parça başına köşe sayısını
+# çoğunlukla uint16 indeks sınırında tutar
+CHUNK_BRICKS = 4
+# LOD0'a göre kümeleme hücresi çarpanları (voksel boyu cinsinden)
+LOD_CELLS = (2.0, 4.0)
+
+_ARRAY_BUFFER = 34962
+_ELEMENT_ARRAY_BUFFER = 34963
+_SHORT = 5122
+_UNSIGNED_SHORT = 5123
+_UNSIGNED_INT = 5125
+
+
+def box_faces(
+    shape: Tuple[int, int, int], origin: Tuple[int, int, int], brick: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Kirlenmemiş sınır bloğunun içine düşen stok kutusu yüzleri (voksel indeks biriminde).
+    Kutu, marching cubes'un iso 0.5 yüzeyiyle aynı yerde durur: [-0.5, n-0.5]. Normaller dışa bakar.
+    """
+    verts: List[List[float]] = []
+    tris: List[List[int]] = []
+    rng = [(max(o, -0.5), min(o + brick, n - 0.5)) for o, n in zip(origin, shape)]
+    for a in range(3):
+        b, c = (a + 1) % 3, (a + 2) % 3
+        for plane, sign in ((-0.5, -1), (shape[a] - 0.5, 1)):
+            if not origin[a] < plane < origin[a] + brick:
+                continue
+            (b0, b1), (c0, c1) = rng[b], rng[c]
+            base = len(verts)
+            for vb, vc in ((b0, c0), (b1, c0), (b1, c1), (b0, c1)):
+                v = [0.0, 0.0, 0.0]
+                v[a], v[b], v[c] = plane, vb, vc
+                verts.append(v)
+            quad = [[0, 1, 2], [0, 2, 3]] if sign > 0 else [[0, 2, 1], [0, 3, 2]]
+            tris.extend([[base + i for i in t] for t in quad])
+    return np.array(verts, dtype=np.float64).reshape(-1, 3), np.array(tris, dtype=np.int64).reshape(
+        -1, 3
+    )
+
+
+def iter_voxel_meshes(grid: VoxelGrid, token: Optional[CancelToken] = None) -> Iterator[MeshPiece]:
+    """Izgarayı ağa çevirir: kesimin değdiği bloklar tuğla tuğla marching cubes ile, dokunulmamış
+    stok kutusu yüzleri analitik dörtgenlerle. Tüm ızgaranın float32 kopyası hiç oluşmaz.
+    Parçalar uzamsal parça anahtarıyla (CHUNK_BRICKS^3 tuğla) art arda, makine koordinatlarında
+    gelir. 'token' her CHECK_EVERY_BLOCKS blokta yalnızca iptal için yoklanır.
+    """
+    from .voxgrid import BRICK
+
+    mcubes = None
+    spec = grid.spec
+    step = BRICK * CHUNK_BRICKS
+    for n, ((x0, y0, z0), blk) in enumerate(iter_mesh_blocks(grid, BRICK, CHUNK_BRICKS)):
+        if token is not None and n % CHECK_EVERY_BLOCKS == 0:
+            token.check(deadline=False)
+        if blk is None:
+            verts, tris = box_faces(spec.shape, (x0, y0, z0), BRICK)
+        else:
+            if mcubes is None:
+                # Yerel import: binary uyumsuzluk riskini minimize etmek
+                # için yalnızca ihtiyaç anında yükle
+                import mcubes
+            verts, tris = mcubes.marching_cubes(blk.astype(np.float32), 0.5)
+            verts += (x0, y0, z0)
+        if len(tris) == 0:
+            continue
+        verts = verts * spec.res_mm + np.asarray(spec.origin)
+        yield ((x0 + 1) // step, (y0 + 1) // step, (z0 + 1) // step), verts, tris
+
+
+def split_spatial(verts: np.ndarray, tris: np.ndarray, cell_mm: float) -> Iterator[MeshPiece]:
+    """Tek parça ağı, üçgen ağırlık merkezinin XY hücresine göre uzamsal parçalara böler."""
+    if len(tris) == 0:
+        return
+    c = verts[tris].mean(axis=1)
+    lo = verts.min(axis=0)
+    cx = np.floor((c[:, 0] - lo[0]) / cell_mm).astype(np.int64)
+    cy = np.floor((c[:, 1] - lo[1]) / cell_mm).astype(np.int64)
+    key = cx * (1 << 20) + cy
+    order = np.argsort(key, kind="stable")
+    uk, starts = np.unique(key[order], return_index=True)
+    ends = np.append(starts[1:], len(order))
+    for k, s, e in zip(uk.tolist(), starts.tolist(), ends.tolist()):
+        t = tris[order[s:e]]
+        used, inv = np.unique(t.reshape(-1), return_inverse=True)
+        yield (k >> 20, k & ((1 << 20) - 1)), verts[used], inv.reshape(-1, 3)
+
+
+def weld(verts: np.ndarray, tris: np.ndarray, tol: float) -> Tuple[np.ndarray, np.ndarray]:
+    """'tol' ızgarasında çakışan köşeleri birleştirir (tuğla dikişlerindeki kopyalar) ve
+    bozulan (iki köşesi aynı) üçgenleri atar.
+    """
+    key = np.round(verts / tol).astype(np.int64)
+    _, first, inv = np.unique(key, axis=0, return_index=True, return_inverse=True)
+    inv = inv.reshape(-1)
+    t = inv[tris]
+    ok = (t[:, 0] != t[:, 1]) & (t[:, 1] != t[:, 2]) & (t[:, 0] != t[:, 2])
+    return verts[first], t[ok]
+
+
+def cluster_decimate(
+    verts: np.ndarray, tris: np.ndarray, cell: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Köşe kümeleme ile seyreltme: her hücredeki köşeler ortalamalarında birleşir,
+    bozulan ve yinelenen üçgenler atılır. Topolojiyi korumaz; uzak görünüm LOD'ları içindir.
+    """
+    key = np.floor(verts / cell).astype(np.int64)
+    _, inv = np.unique(key, axis=0, return_inverse=True)
+    inv = inv.reshape(-1)
+    n = int(inv.max()) + 1 if len(inv) else 0
+    counts = np.bincount(inv, minlength=n).astype(np.float64)[:, None]
+    out = np.zeros((n, 3), dtype=np.float64)
+    np.add.at(out, inv, verts)
+    out /= np.maximum(counts, 1)
+    t = inv[tris]
+    ok = (t[:, 0] != t[:, 1]) & (t[:, 1] != t[:, 2]) & (t[:, 0] != t[:, 2])
+    t = t[ok]
+    if len(t):
+        # Aynı köşe kümesine sahip üçgenlerden birini tut (yön korunarak)
+        canon = np.sort(t, axis=1)
+        _, keep = np.unique(canon, axis=0, return_index=True)
+        t = t[np.sort(keep)]
+    used, remap = np.unique(t.reshape(-1), return_inverse=True)
+    return out[used].astype(np.float32), remap.reshape(-1, 3)
+
+
+def quantize_positions(verts: np.ndarray) -> Tuple[np.ndarray, List[float], float]:
+    """KHR_mesh_quantization: konumlar int16'ya eşlenir, düğüm dönüşümü
+    (öteleme + eş ölçek) geri açar.
+    Dönüş: (n,4) int16 (4. bileşen 4 bayt hizalama dolgusu), translation, scale.
+    """
+    lo = verts.min(axis=0).astype(np.float64)
+    span = float((verts.max(axis=0) - lo).max())
+    scale = span / 65535.0 if span > 0 else 1.0
+    q = np.zeros((len(verts), 4), dtype=np.int16)
+    q[:, :3] = np.clip(np.round((verts - lo) / scale) - 32768, -32768, 32767).astype(np.int16)
+    translation = [float(v) for v in lo + 32768.0 * scale]
+    return q, translation, scale
+
+
+@dataclass
+class GlbBuilder:
+    """Ağ düzeylerini geçici bir ikili dosyaya akıtarak tek bir GLB toplar.
+    Her düğüm kendi niceleme dönüşümünü taşır; LOD düğümleri MSFT_lod ile LOD0 düğümüne bağlanır.
+    """
+
+    bin_file: object
+    offset: int = 0
+    gltf: GLTF2 = field(default_factory=GLTF2)
+    roots: List[int] = field(default_factory=list)
+    n_verts: int = 0
+    n_tris: int = 0
+
+    def _view(self, data: bytes, target: int, stride: Optional[int] = None) -> int:
+        pad = (-self.offset) % 4
+        if pad:
+            self.bin_file.write(b"\0" * pad)
+            self.offset += pad
+        self.bin_file.write(data)
+        self.gltf.bufferViews.append(
+            BufferView(
+                buffer=0,
+                byteOffset=self.offset,
+                byteLength=len(data),
+                byteStride=stride,
+                target=target,
+            )
+        )
+        self.offset += len(data)
+        return len(self.gltf.bufferViews) - 1
+
+    def add_level(self, verts: np.ndarray, tris: np.ndarray, name: str) -> int:
+        q, translation, scale = quantize_positions(verts)
+        pos_view = self._view(q.tobytes(), _ARRAY_BUFFER, stride=8)
+        small = len(verts) <= 0xFFFF
+        idx = tris.astype(np.uint16 if small else np.uint32)
+        idx_view = self._view(idx.tobytes(), _ELEMENT_ARRAY_BUFFER)
+        acc = self.gltf.accessors
+        acc.append(
+            Accessor(
+                bufferView=pos_view,
+                componentType=_SHORT,
+                count=len(verts),
+                type="VEC3",
+                min=[int(v) for v in q[:, :3].min(axis=0)],
+                max=[int(v) for v in q[:, :3].max(axis=0)],
+            )
+        )
+        acc.append(
+            Accessor(
+                bufferView=idx_view,
+                componentType=_UNSIGNED_SHORT if small else _UNSIGNED_INT,
+                count=int(idx.size),
+                type="SCALAR",
+            )
+        )
+        self.gltf.meshes.append(
+            Mesh(
+                name=name,
+                primitives=[
+                    Primitive(attributes=Attributes(POSITION=len(acc) - 2), indices=len(acc) - 1)
+                ],
+            )
+        )
+        self.gltf.nodes.append(
+            Node(
+                name=name,
+                mesh=len(self.gltf.meshes) - 1,
+                translation=translation,
+                scale=[scale, scale, scale],
+            )
+        )
+        return len(self.gltf.nodes) - 1
+
+    def add_chunk(
+        self,
+        key: Hashable,
+        verts: np.ndarray,
+        tris: np.ndarray,
+        weld_mm: float,
+        lod_cells: Sequence[float],
+    ) -> None:
+        verts, tris = weld(verts.astype(np.float64), tris.astype(np.int64), weld_mm)
+        if len(tris) == 0:
+            return
+        name = "chunk_" + "_".join(str(k) for k in (key if isinstance(key, tuple) else (key,)))
+        root = self.add_level(verts, tris, name)
+        self.n_verts += len(verts)
+        self.n_tris += len(tris)
+        lods: List[int] = []
+        prev = len(tris)
+        for i, cell in enumerate(lod_cells, start=1):
+            lv, lt = cluster_decimate(verts, tris, cell)
+            # Kazanç küçükse (düz yüzeyler zaten seyrek) düzeyi atla
+            if len(lt) == 0 or len(lt) > 0.8 * prev:
+                continue
+            lods.append(self.add_level(lv, lt, f"{name}_lod{i}"))
+            prev = len(lt)
+        if lods:
+            self.gltf.nodes[root].extensions = {"MSFT_lod": {"ids": lods}}
+        self.roots.append(root)
+
+    def finish(self) -> GLTF2:
+        g = self.gltf
+        g.scene = 0
+        g.scenes = [Scene(nodes=self.roots)]
+        # glTF byteLength >= 1 ister; boş ağda tampon hiç yazılmaz
+        g.buffers = [Buffer(byteLength=self.offset)] if self.offset else []
+        g.extensionsUsed = ["KHR_mesh_quantization"]
+        g.extensionsRequired = ["KHR_mesh_quantization"]
+        if any(n.extensions for n in g.nodes):
+            g.extensionsUsed.append("MSFT_lod")
+        return g
+
+
+def write_glb(
+    pieces: Iterable[MeshPiece],
+    out_path: Path,
+    weld_mm: float,
+    lod_cells: Sequence[float] = (),
+) -> Tuple[int, int]:
+    """Ardışık aynı anahtarlı parçaları tek uzamsal parçada toplar; her parçayı kaynaştırıp
+    nicelenmiş LOD0 ve seyreltilmiş LOD düzeyleriyle tek dosyalık GLB'ye yazar.
+    Bellekte aynı anda yalnızca bir uzamsal parça tutulur. (LOD0 köşe, üçgen) sayısını döndürür.
+    """
+    with tempfile.TemporaryFile() as fb:
+        b = GlbBuilder(fb)
+        cur_key: Optional[Hashable] = None
+        vs: List[np.ndarray] = []
+        ts: List[np.ndarray] = []
+        base = 0
+
+        def flush():
+            if vs:
+                b.add_chunk(cur_key, np.concatenate(vs), np.concatenate(ts), weld_mm, lod_cells)
+
+        for key, verts, tris in pieces:
+            if len(tris) == 0:
+                continue
+            if key != cur_key:
+                flush()
+                cur_key, vs, ts, base = key, [], [], 0
+            vs.append(np.asarray(verts))
+            ts.append(np.asarray(tris, dtype=np.int64) + base)
+            base += len(verts)
+        flush()
+
+        # to_json boş/varsayılan alanları atar (to_dict null'ları da yazar)
+        js = b.finish().to_json(separators=(",", ":")).encode()
+        js += b" " * ((-len(js)) % 4)
+        bin_len = b.offset + (-b.offset) % 4
+        total = 12 + 8 + len(js) + (8 + bin_len if bin_len else 0)
+        with open(out_path, "wb") as f:
+            f.write(struct.pack("<4sII", b"glTF", 2, total))
+            f.write(struct.pack("<I4s", len(js), b"JSON"))
+            f.write(js)
+            if bin_len:
+                f.write(struct.pack("<I4s", bin_len, b"BIN\0"))
+                fb.seek(0)
+                shutil.copyfileobj(fb, f)
+                f.write(b"\0" * (bin_len - b.offset))
+    return b.n_verts, b.n_tris
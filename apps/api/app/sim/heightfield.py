@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from typing import Tuple
+
+import numpy as np
+
+from .carve import GridSpec
+
+
+def heightfield_from_floor(floor: np.ndarray, spec: GridSpec) -> np.ndarray:
+    """Kolon tabanını stok tepesi ve ızgara tabanı arasına kırparak stok üst yüzeyinin Z haritasına
+    (dexel) çevirir. Bellek O(nx·ny); 3 eksen işler içindir.
+    """
+    zmap = np.minimum(floor, np.float32(spec.top_mm)).astype(np.float32, copy=False)
+    np.maximum(zmap, np.float32(spec.origin[2]), out=zmap)
+    return zmap
+
+
+def removed_volume_mm3(zmap: np.ndarray, spec: GridSpec) -> float:
+    return float((spec.top_mm - zmap.astype(np.float64)).sum() * spec.res_mm * spec.res_mm)
+
+
+def heightfield_mesh(zmap: np.ndarray, spec: GridSpec) -> Tuple[np.ndarray, np.ndarray]:
+    """Z haritasını kapalı bir ızgara ağına çevirir: üst yüzey, çevre duvarları ve taban."""
+    nx, ny = zmap.shape
+    ox, oy, oz = spec.origin
+    res = spec.res_mm
+    gx, gy = np.meshgrid(
+        (ox + np.arange(nx) * res).astype(np.float32),
+        (oy + np.arange(ny) * res).astype(np.float32),
+        indexing="ij",
+    )
+    top = np.column_stack([gx.ravel(), gy.ravel(), zmap.ravel()])
+
+    a = (np.arange(nx - 1)[:, None] * ny + np.arange(ny - 1)[None, :]).ravel().astype(np.uint32)
+    b = a + ny
+    c = a + 1
+    d = b + 1
+    top_tris = np.concatenate([np.column_stack([a, b, d]), np.column_stack([a, d, c])])
+
+    # Üstten bakınca saat yönü tersine sınır döngüsü
+    i = np.arange(nx)
+    j = np.arange(ny)
+    loop = np.concatenate(
+        [
+            i * ny,
+            (nx - 1) * ny + j[1:],
+            i[::-1][1:] * ny + (ny - 1),
+            j[::-1][1:-1],
+        ]
+    ).astype(np.uint32)
+    n_top = np.uint32(len(top))
+    bottom = top[loop].copy()
+    bottom[:, 2] = oz
+    bl = n_top + np.arange(len(loop), dtype=np.uint32)
+    p, q = loop, np.roll(loop, -1)
+    pb, qb = bl, np.roll(bl, -1)
+    wall_tris = np.concatenate([np.column_stack([p, pb, qb]), np.column_stack([p, qb, q])])
+    base_tris = np.column_stack([np.full(len(bl) - 2, bl[0]), bl[2:], bl[1:-1]])
+
+    verts = np.concatenate([top, bottom]).astype(np.float32)
+    tris = np.concatenate([top_tris, wall_tris, base_tris]).astype(np.uint32)
+    return verts, tris
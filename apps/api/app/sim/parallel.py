@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import math
+import mmap
+import os
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .carve import GridSpec, KernelSet, ToolKernel, segments, sweep_column_floor, sweep_segments
+
+# Bu kolon sayısının altında süreç havuzu kurmak kazançtan pahalı
+PARALLEL_MIN_COLUMNS = 1 << 18
+# Çekirdek başına döşeme sayısı: dengesiz döşemelerde boşta kalan çekirdekleri azaltır
+TILES_PER_WORKER = 4
+
+Tile = Tuple[int, int, int, int]
+
+
+def resolve_workers(workers: Optional[int]) -> int:
+    """0/None → makinedeki çekirdek sayısı."""
+    if not workers:
+        return os.cpu_count() or 1
+    return max(1, int(workers))
+
+
+def plan_tiles(nx: int, ny: int, n_tiles: int) -> List[Tile]:
+    """(nx, ny) kolon düzlemini yaklaşık kare, örtüşmeyen (x0, x1, y0, y1) döşemelere böler."""
+    n_tiles = max(1, min(n_tiles, nx * ny))
+    sx = max(1, min(nx, int(round(math.sqrt(n_tiles * nx / max(1, ny))))))
+    sy = max(1, min(ny, -(-n_tiles // sx)))
+    xs = np.linspace(0, nx, sx + 1).astype(int)
+    ys = np.linspace(0, ny, sy + 1).astype(int)
+    return [
+        (int(xs[i]), int(xs[i + 1]), int(ys[j]), int(ys[j + 1]))
+        for i in range(sx)
+        for j in range(sy)
+        if xs[i + 1] > xs[i] and ys[j + 1] > ys[j]
+    ]
+
+
+def tile_segments(
+    a: np.ndarray, b: np.ndarray, radius: float, spec: GridSpec, tiles: List[Tile]
+) -> Iterator[np.ndarray]:
+    """Her döşeme için, takım yarıçapıyla genişletilmiş XY sınır kutusu
+    döşemeyi kesen parça indeksleri.
+    """
+    ox, oy, _ = spec.origin
+    res = spec.res_mm
+    pad = radius + res
+    lo_x = (np.minimum(a[:, 0], b[:, 0]) - pad - ox) / res
+    hi_x = (np.maximum(a[:, 0], b[:, 0]) + pad - ox) / res
+    lo_y = (np.minimum(a[:, 1], b[:, 1]) - pad - oy) / res
+    hi_y = (np.maximum(a[:, 1], b[:, 1]) + pad - oy) / res
+    for x0, x1, y0, y1 in tiles:
+        yield np.nonzero((hi_x >= x0) & (lo_x <= x1 - 1) & (hi_y >= y0) & (lo_y <= y1 - 1))[0]
+
+
+# Havuz açılmadan önce ayarlanır; fork ile açılan işçiler aynı anonim paylaşımlı eşlemeyi devralır
+_SHARED_FLOOR: Optional[np.ndarray] = None
+
+
+def _sweep_tiles(jobs) -> None:
+    """İşçi süreç: paylaşılan taban dizisinde kendine atanan döşemeleri hesaplar ve yerinde yazar.
+    Döşemeler örtüşmediği için kilit ya da birleştirme kopyası gerekmez.
+    """
+    floor = _SHARED_FLOOR
+    for spec, tile, a, b, kernel in jobs:
+        x0, x1, y0, y1 = tile
+        sweep_segments(floor[x0:x1, y0:y1], a, b, kernel, spec.sub(x0, x1, y0, y1))
+
+
+def assign_jobs(costs: List[int], workers: int) -> List[List[int]]:
+    """En uzun iş önce (LPT) açgözlü atama: her işi o ana kadar en az yüklü işçiye verir."""
+    bins: List[List[int]] = [[] for _ in range(max(1, workers))]
+    load = [0] * len(bins)
+    for i in sorted(range(len(costs)), key=lambda k: -costs[k]):
+        w = load.index(min(load))
+        bins[w].append(i)
+        load[w] += costs[i]
+    return [b for b in bins if b]
+
+
+class SweepPool:
+    """Bir sim boyunca açık kalan kesim havuzu. Kolon tabanı ('floor') anonim MAP_SHARED eşlemede
+    tutulur; işçiler ilk paralel süpürmede bir kez fork edilir ve sonraki tüm partilerde ve takım
+    gruplarında yeniden kullanılır. İşçiler döşemelerini doğrudan bu tabana yazar.
+    Aynı süreçte aynı anda tek havuz açık olabilir (işçiler tabanı modül değişkeninden devralır).
+    """
+
+    def __init__(self, shape: Tuple[int, int], workers: Optional[int] = None, dtype=np.float32):
+        self.workers = resolve_workers(workers)
+        self._buf = mmap.mmap(-1, max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize))
+        # Dizi eşlemeye referans tutar; havuz kapandıktan sonra da taban okunabilir
+        self.floor = np.frombuffer(self._buf, dtype=dtype, count=int(np.prod(shape))).reshape(shape)
+        self.floor.fill(np.inf)
+        self._pool = None
+
+    @property
+    def parallel(self) -> bool:
+        nx, ny = self.floor.shape
+        return self.workers > 1 and nx * ny >= PARALLEL_MIN_COLUMNS
+
+    def run(self, a: np.ndarray, b: np.ndarray, kernel: ToolKernel, spec: GridSpec) -> None:
+        """Parçaları döşemelere bölüp havuz işçilerine dağıtır;
+        sonuç 'floor' üzerinde yerindedir.
+        """
+        nx, ny = self.floor.shape
+        tiles = plan_tiles(nx, ny, self.workers * TILES_PER_WORKER)
+        jobs = [
+            (spec, tile, a[idx], b[idx], kernel)
+            for tile, idx in zip(tiles, tile_segments(a, b, kernel.radius_mm, spec, tiles))
+            if len(idx)
+        ]
+        bins = assign_jobs([len(j[2]) for j in jobs], self.workers)
+        pool = self._open()
+        # map yerine iş başına apply_async: billiard, map işlerinde yalnızca ilk işçinin teslim
+        # sayacını artırır ve diğer işçiler kapanışta teslim onayı için ~30 sn bekler
+        pending = [pool.apply_async(_sweep_tiles, ([jobs[i] for i in b],)) for b in bins]
+        for r in pending:
+            r.get()
+
+    def _open(self):
+        global _SHARED_FLOOR
+        if self._pool is None:
+            if _SHARED_FLOOR is not None:
+                raise RuntimeError("Aynı süreçte ikinci kesim havuzu açılamaz")
+            # Celery prefork işçileri daemon süreçtir; billiard bu durumda da alt süreç açabilir
+            from billiard import Pool
+
+            _SHARED_FLOOR = self.floor
+            self._pool = Pool(self.workers)
+        return self._pool
+
+    def close(self) -> None:
+        global _SHARED_FLOOR
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+            _SHARED_FLOOR = None
+
+    def __enter__(self) -> "SweepPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def sweep_segments_parallel(
+    floor: np.ndarray,
+    a: np.ndarray,
+    b: np.ndarray,
+    kernel: ToolKernel,
+    spec: GridSpec,
+    pool: Optional[SweepPool] = None,
+) -> None:
+    """'floor' havuzun kendi tabanıysa ve ızgara yeterince büyükse havuzla, değilse seri süpürür."""
+    if pool is None or floor is not pool.floor or not pool.parallel:
+        sweep_segments(floor, a, b, kernel, spec)
+        return
+    pool.run(a, b, kernel, spec)
+
+
+def sweep_tool_segments(
+    floor: np.ndarray,
+    a: np.ndarray,
+    b: np.ndarray,
+    tools: np.ndarray,
+    kernels: KernelSet,
+    spec: GridSpec,
+    pool: Optional[SweepPool] = None,
+) -> None:
+    """Her parça a[i]→b[i], o parçayı kesen takımın (tools[i]) kernel'iyle süpürülür.
+    Kesim min işlemi olduğundan takım grupları ayrı ayrı ve herhangi bir sırayla işlenebilir.
+    """
+    for tool in np.unique(tools):
+        m = tools == tool
+        sweep_segments_parallel(floor, a[m], b[m], kernels.get(int(tool)), spec, pool)
+
+
+def sweep_path_parallel(
+    floor: np.ndarray,
+    pts: np.ndarray,
+    tools: np.ndarray,
+    kernels: KernelSet,
+    spec: GridSpec,
+    pool: Optional[SweepPool] = None,
+) -> None:
+    """Nokta dizisini takım bazında süpürür; pts[i-1]→pts[i] parçası tools[i] ile kesilir."""
+    if len(pts) < 2:
+        if len(pts):
+            sweep_column_floor(floor, pts, kernels.get(int(tools[0])), spec)
+        return
+    a, b = segments(pts)
+    sweep_tool_segments(floor, a, b, tools[1:], kernels, spec, pool)
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import io
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from ..gcode.tokenizer import motion_rows
+from .cancel import CHECK_EVERY_SEGMENTS, CancelToken
+from .carve import (
+    ARC_TOL_FACTOR,
+    Bounds,
+    GridSpec,
+    KernelSet,
+    ToolKernel,
+    as_kernel_set,
+    move_path,
+    segments,
+)
+from .parallel import SweepPool, sweep_tool_segments, tile_segments
+
+Slab = Tuple[int, int]
+
+
+def plan_slabs(nx: int, parts: int) -> List[Slab]:
+    """X eksenini en fazla 'parts' adet, boş olmayan [x0, x1) dilimine böler."""
+    xs = np.linspace(0, nx, max(1, min(parts, nx)) + 1).astype(int)
+    return [(int(xs[i]), int(xs[i + 1])) for i in range(len(xs) - 1) if xs[i + 1] > xs[i]]
+
+
+def carve_slab_floor(
+    moves: np.ndarray,
+    bounds: Bounds,
+    res_mm: float,
+    kernels: Union[KernelSet, ToolKernel],
+    slab: Slab,
+    workers: Optional[int] = 1,
+    token: Optional[CancelToken] = None,
+) -> np.ndarray:
+    """Tek bir X diliminin kolon tabanını (x1-x0, ny) hesaplar. Yalnızca süpürme kutusu dilimi
+    kesen parçalar işlenir; 3 eksen (sonsuz boylu takım) için dilimin tüm kesim sonucu budur.
+    'token' parti aralarında yalnızca iptal için yoklanır: dilimler farklı noktalarda yarım kalırsa
+    birleşik taban hiçbir program önekine karşılık gelmez.
+    """
+    spec = GridSpec.from_bounds(bounds, res_mm)
+    x0, x1 = slab
+    ny = spec.shape[1]
+    pts, row = move_path(moves, home=(0.0, 0.0, spec.top_mm), arc_tol_mm=ARC_TOL_FACTOR * res_mm)
+    with SweepPool((x1 - x0, ny), workers) as pool:
+        if len(pts) == 0:
+            return pool.floor
+        kernels = as_kernel_set(kernels)
+        tools = motion_rows(moves)["tool"][row]
+        a, b = segments(pts)
+        t = tools[1:] if len(pts) > 1 else tools
+        idx = next(tile_segments(a, b, kernels.radius_mm, spec, [(x0, x1, 0, ny)]))
+        sub = spec.sub(x0, x1, 0, ny)
+        for c0 in range(0, len(idx), CHECK_EVERY_SEGMENTS):
+            part = idx[c0 : c0 + CHECK_EVERY_SEGMENTS]
+            sweep_tool_segments(pool.floor, a[part], b[part], t[part], kernels, sub, pool)
+            if token is not None:
+                token.check(deadline=False)
+        return pool.floor
+
+
+def save_slab(path: Path, slab: Slab, floor: np.ndarray) -> Path:
+    """Dilim tabanını sıkıştırılmış .npz olarak yazar (dokunulmamış kolonlar inf, iyi sıkışır)."""
+    np.savez_compressed(path, x0=slab[0], x1=slab[1], floor=floor)
+    return path
+
+
+def load_slab(data: bytes) -> Tuple[Slab, np.ndarray]:
+    with np.load(io.BytesIO(data)) as z:
+        return (int(z["x0"]), int(z["x1"])), z["floor"]
+
+
+def stitch_floors(spec: GridSpec, parts: Iterable[Tuple[Slab, np.ndarray]]) -> np.ndarray:
+    """Dilim tabanlarını tam (nx, ny) kolon tabanında birleştirir; eksik dilim hata verir."""
+    nx, ny, _ = spec.shape
+    floor = np.full((nx, ny), np.inf, dtype=np.float32)
+    covered = np.zeros(nx, dtype=bool)
+    for (x0, x1), part in parts:
+        if part.shape != (x1 - x0, ny):
+            raise RuntimeError(f"Dilim boyutu uyumsuz: {(x0, x1)} {part.shape}")
+        floor[x0:x1] = part
+        covered[x0:x1] = True
+    if not covered.all():
+        raise RuntimeError("Eksik sim dilimi: ızgara tamamen kapsanmadı")
+    return floor
@@ -0,0 +1,384 @@
+from __future__ import annotations
+
+from itertools import product
+from typing import TYPE_CHECKING, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .carve import GridSpec
+
+
+# X dilimi başına en fazla voksel (kolon tabanı → voksel uygulamasında geçici maske boyutu)
+SLAB_VOXELS = 1 << 24
+# Depolama türü verilmediğinde yoğun ızgaranın üst sınırı (hücre)
+DENSE_MAX_CELLS = 1 << 26
+# Seyrek ızgarada tuğla kenarı (voksel); 8'in katı olmalı (Z ekseni bayt sınırına hizalı)
+BRICK = 32
+
+EMPTY, FULL, MIXED = 0, 1, 2
+
+# Bayt başına dolu bit sayısı
+_POPCOUNT = (
+    np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.int64)
+)
+
+
+def _popcount(a: np.ndarray) -> int:
+    return int(_POPCOUNT[a.reshape(-1)].sum())
+
+
+def _clear_above(packed: np.ndarray, kmin: np.ndarray) -> int:
+    """Z ekseninde bit paketli (X,Y,NB) dizide her kolonun 'kmin' ve üstündeki bitlerini sıfırlar.
+    packbits varsayılanı (big-endian): bayt içindeki ilk voksel en yüksek bittir.
+    Sıfırlanan dolu bit sayısını döndürür.
+    """
+    nb = packed.shape[2]
+    kmin = np.clip(kmin, 0, nb * 8).astype(np.int64)
+    b = np.arange(nb, dtype=np.int64)[None, None, :]
+    keep_bits = np.clip(kmin[:, :, None] - b * 8, 0, 8)
+    mask = ((0xFF00 >> keep_bits) & 0xFF).astype(np.uint8)
+    lost = packed & ~mask
+    carved = _popcount(lost)
+    packed &= mask
+    return carved
+
+
+class VoxelGrid:
+    """Stok voksel ızgarası arayüzü. 1 = malzeme, 0 = boşluk.
+    Kesme işlemleri yerindedir ve kaldırılan dolu voksel sayısını döndürür.
+    """
+
+    kind = "abstract"
+
+    def __init__(self, spec: "GridSpec"):
+        self.spec = spec
+        nx, ny, nz = spec.shape
+        # Tuğla kolonu başına kesimin indiği en alçak Z (nz: dokunulmamış). Ağ üretimi yalnızca
+        # bu kirli bölgede marching cubes çalıştırır; gerisi stok kutusudur.
+        self.dirty_z = np.full((-(-nx // BRICK), -(-ny // BRICK)), nz, dtype=np.int32)
+
+    @property
+    def size(self) -> int:
+        nx, ny, nz = self.spec.shape
+        return nx * ny * nz
+
+    @property
+    def nbytes(self) -> int:
+        raise NotImplementedError
+
+    def apply_column_floor(self, kmin: np.ndarray) -> int:
+        """Her kolonun 'kmin' ve üstündeki voksellerini sıfırlar."""
+        nx, ny, nz = self.spec.shape
+        bx, by = self.dirty_z.shape
+        pad = np.full((bx * BRICK, by * BRICK), nz, dtype=np.int32)
+        pad[:nx, :ny] = kmin
+        np.minimum(
+            self.dirty_z, pad.reshape(bx, BRICK, by, BRICK).min(axis=(1, 3)), out=self.dirty_z
+        )
+        return self._apply_column_floor(kmin)
+
+    def _apply_column_floor(self, kmin: np.ndarray) -> int:
+        raise NotImplementedError
+
+    def dirty(self, x0: int, x1: int, y0: int, y1: int, z1: int) -> bool:
+        """[x0,x1)×[y0,y1) kolonlarında z1'in altına inen bir kesim olduysa True (muhafazakâr)."""
+        nx, ny, nz = self.spec.shape
+        x0, y0, x1, y1 = max(0, x0), max(0, y0), min(nx, x1), min(ny, y1)
+        if x1 <= x0 or y1 <= y0:
+            return False
+        dz = self.dirty_z[x0 // BRICK : (x1 - 1) // BRICK + 1, y0 // BRICK : (y1 - 1) // BRICK + 1]
+        return bool(dz.min() < min(z1, nz))
+
+    def dirty_fraction(self) -> float:
+        """Kesime değen tuğla kolonlarının oranı."""
+        return float(np.count_nonzero(self.dirty_z < self.spec.shape[2])) / max(
+            1, self.dirty_z.size
+        )
+
+    def block(self, x0: int, x1: int, y0: int, y1: int, z0: int, z1: int) -> np.ndarray:
+        """[x0,x1)×[y0,y1)×[z0,z1) bölgesini yoğun uint8 olarak döndürür
+        (ızgara dışı kısımlar kırpılır).
+        """
+        raise NotImplementedError
+
+    def uniform(self, x0: int, x1: int, y0: int, y1: int, z0: int, z1: int) -> Optional[int]:
+        """Bölgenin tamamı aynı değerdeyse o değer; bilinmiyorsa
+        None (ağ üretiminde atlamak için).
+        """
+        return None
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+    def to_dense(self) -> np.ndarray:
+        nx, ny, nz = self.spec.shape
+        return self.block(0, nx, 0, ny, 0, nz)
+
+
+class DenseGrid(VoxelGrid):
+    """Voksel başına 1 bayt; küçük ızgaralar için en hızlı yol."""
+
+    kind = "dense"
+
+    def __init__(self, spec: "GridSpec"):
+        super().__init__(spec)
+        self.vox = np.ones(spec.shape, dtype=np.uint8)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.vox.nbytes)
+
+    def _apply_column_floor(self, kmin: np.ndarray) -> int:
+        nx, ny, nz = self.spec.shape
+        kz = np.arange(nz, dtype=np.int32)
+        step = max(1, SLAB_VOXELS // max(1, ny * nz))
+        carved = 0
+        for x0 in range(0, nx, step):
+            x1 = min(nx, x0 + step)
+            cut = kz[None, None, :] >= kmin[x0:x1, :, None]
+            sl = self.vox[x0:x1]
+            carved += int(np.count_nonzero(sl[cut]))
+            sl[cut] = 0
+        return carved
+
+    def block(self, x0, x1, y0, y1, z0, z1) -> np.ndarray:
+        return self.vox[x0:x1, y0:y1, z0:z1]
+
+    def count(self) -> int:
+        return int(np.count_nonzero(self.vox))
+
+
+class PackedGrid(VoxelGrid):
+    """Z ekseninde bit paketli ızgara (bayt başına 8 voksel): yoğun ızgaranın 1/8'i bellek."""
+
+    kind = "packed"
+
+    def __init__(self, spec: "GridSpec"):
+        super().__init__(spec)
+        nx, ny, nz = spec.shape
+        self.bits = (
+            np.packbits(np.ones((1, 1, nz), dtype=np.uint8), axis=2).repeat(nx, 0).repeat(ny, 1)
+        )
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.bits.nbytes)
+
+    def _apply_column_floor(self, kmin: np.ndarray) -> int:
+        return _clear_above(self.bits, kmin)
+
+    def block(self, x0, x1, y0, y1, z0, z1) -> np.ndarray:
+        b0 = z0 >> 3
+        b1 = min(self.bits.shape[2], (z1 + 7) >> 3)
+        out = np.unpackbits(self.bits[x0:x1, y0:y1, b0:b1], axis=2)
+        z1 = min(z1, self.spec.shape[2])
+        return out[:, :, z0 - b0 * 8 : z1 - b0 * 8]
+
+    def count(self) -> int:
+        return _popcount(self.bits)
+
+
+class BrickGrid(VoxelGrid):
+    """Seyrek tuğla haritası. Tuğlalar örtük DOLU başlar; yalnızca takım yolunun kısmen kestiği
+    tuğlalar bit paketli olarak ayrılır, tamamen kesilenler örtük BOŞ olur.
+    Bellek kesilen yüzeyin alanıyla ölçeklenir, stok hacmiyle değil.
+    """
+
+    kind = "sparse"
+
+    def __init__(self, spec: "GridSpec", brick: int = BRICK):
+        super().__init__(spec)
+        if brick % 8:
+            raise ValueError("Tuğla boyu 8'in katı olmalı")
+        self.brick = brick
+        nx, ny, nz = spec.shape
+        self.nbrick = tuple(-(-n // brick) for n in (nx, ny, nz))
+        self.state = np.full(self.nbrick, FULL, dtype=np.uint8)
+        self.bricks: Dict[Tuple[int, int, int], np.ndarray] = {}
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.state.nbytes + sum(b.nbytes for b in self.bricks.values()))
+
+    def _extent(self, bx: int, by: int, bz: int) -> Tuple[int, int, int]:
+        B = self.brick
+        nx, ny, nz = self.spec.shape
+        return min(B, nx - bx * B), min(B, ny - by * B), min(B, nz - bz * B)
+
+    def _materialize(self, key: Tuple[int, int, int]) -> np.ndarray:
+        arr = self.bricks.get(key)
+        if arr is not None:
+            return arr
+        B = self.brick
+        ex, ey, ez = self._extent(*key)
+        dense = np.zeros((B, B, B), dtype=np.uint8)
+        if self.state[key] == FULL:
+            dense[:ex, :ey, :ez] = 1
+        arr = np.packbits(dense, axis=2)
+        self.bricks[key] = arr
+        self.state[key] = MIXED
+        return arr
+
+    def _drop_if_empty(self, key: Tuple[int, int, int]) -> None:
+        if not self.bricks[key].any():
+            del self.bricks[key]
+            self.state[key] = EMPTY
+
+    def _apply_column_floor(self, kmin: np.ndarray) -> int:
+        B = self.brick
+        nx, ny, nz = self.spec.shape
+        nbx, nby, nbz = self.nbrick
+        # Izgara dışı kolonlar: min için "kesme yok" (nz), max için "boş" (0)
+        pad_lo = np.full((nbx * B, nby * B), nz, dtype=np.int64)
+        pad_hi = np.zeros((nbx * B, nby * B), dtype=np.int64)
+        pad_lo[:nx, :ny] = kmin
+        pad_hi[:nx, :ny] = kmin
+        kmin_lo = pad_lo.reshape(nbx, B, nby, B).min(axis=(1, 3))
+        kmin_hi = pad_hi.reshape(nbx, B, nby, B).max(axis=(1, 3))
+        z0 = (np.arange(nbz, dtype=np.int64) * B)[None, None, :]
+        untouched = kmin_lo[:, :, None] >= z0 + B
+        cleared = (kmin_hi[:, :, None] <= z0) & ~untouched
+
+        carved = 0
+        for key in zip(*np.nonzero(cleared & (self.state != EMPTY))):
+            key = tuple(int(k) for k in key)
+            if self.state[key] == FULL:
+                ex, ey, ez = self._extent(*key)
+                carved += ex * ey * ez
+            else:
+                carved += _popcount(self.bricks.pop(key))
+            self.state[key] = EMPTY
+
+        partial = ~untouched & ~cleared & (self.state != EMPTY)
+        for key in zip(*np.nonzero(partial)):
+            bx, by, bz = (int(k) for k in key)
+            arr = self._materialize((bx, by, bz))
+            local = pad_lo[bx * B : (bx + 1) * B, by * B : (by + 1) * B] - bz * B
+            carved += _clear_above(arr, local)
+            self._drop_if_empty((bx, by, bz))
+        return carved
+
+    def block(self, x0, x1, y0, y1, z0, z1) -> np.ndarray:
+        nx, ny, nz = self.spec.shape
+        x1, y1, z1 = min(x1, nx), min(y1, ny), min(z1, nz)
+        out = np.zeros((x1 - x0, y1 - y0, z1 - z0), dtype=np.uint8)
+        B = self.brick
+        for bx in range(x0 // B, -(-x1 // B)):
+            for by in range(y0 // B, -(-y1 // B)):
+                for bz in range(z0 // B, -(-z1 // B)):
+                    st = self.state[bx, by, bz]
+                    if st == EMPTY:
+                        continue
+                    gx0, gy0, gz0 = max(x0, bx * B), max(y0, by * B), max(z0, bz * B)
+                    gx1, gy1, gz1 = (
+                        min(x1, (bx + 1) * B),
+                        min(y1, (by + 1) * B),
+                        min(z1, (bz + 1) * B),
+                    )
+                    dst = out[gx0 - x0 : gx1 - x0, gy0 - y0 : gy1 - y0, gz0 - z0 : gz1 - z0]
+                    if st == FULL:
+                        dst[...] = 1
+                    else:
+                        src = np.unpackbits(self.bricks[(bx, by, bz)], axis=2)
+                        dst[...] = src[
+                            gx0 - bx * B : gx1 - bx * B,
+                            gy0 - by * B : gy1 - by * B,
+                            gz0 - bz * B : gz1 - bz * B,
+                        ]
+        return out
+
+    def uniform(self, x0, x1, y0, y1, z0, z1) -> Optional[int]:
+        B = self.brick
+        st = self.state[x0 // B : -(-x1 // B), y0 // B : -(-y1 // B), z0 // B : -(-z1 // B)]
+        if (st == FULL).all():
+            return 1
+        if (st == EMPTY).all():
+            return 0
+        return None
+
+    def count(self) -> int:
+        n = sum(_popcount(b) for b in self.bricks.values())
+        for key in zip(*np.nonzero(self.state == FULL)):
+            ex, ey, ez = self._extent(*(int(k) for k in key))
+            n += ex * ey * ez
+        return n
+
+
+GRID_KINDS = {"dense": DenseGrid, "packed": PackedGrid, "sparse": BrickGrid}
+
+
+def make_grid(
+    spec: "GridSpec", storage: Optional[str] = None, dense_max_cells: int = DENSE_MAX_CELLS
+) -> VoxelGrid:
+    """storage verilmezse küçük ızgaralar yoğun, büyükler seyrek tuğla haritasıyla tutulur."""
+    if storage is None:
+        nx, ny, nz = spec.shape
+        storage = "dense" if nx * ny * nz <= dense_max_cells else "sparse"
+    if storage not in GRID_KINDS:
+        raise ValueError(f"Bilinmeyen voksel depolama türü: {storage}")
+    return GRID_KINDS[storage](spec)
+
+
+def padded_block(
+    grid: VoxelGrid, x0: int, x1: int, y0: int, y1: int, z0: int, z1: int
+) -> np.ndarray:
+    """Izgara dışına (bir voksel) taşabilen bölgeyi döndürür; dışarısı boş (0) okunur."""
+    nx, ny, nz = grid.spec.shape
+    out = np.zeros((x1 - x0, y1 - y0, z1 - z0), dtype=np.uint8)
+    cx0, cy0, cz0 = max(0, x0), max(0, y0), max(0, z0)
+    cx1, cy1, cz1 = min(nx, x1), min(ny, y1), min(nz, z1)
+    out[cx0 - x0 : cx1 - x0, cy0 - y0 : cy1 - y0, cz0 - z0 : cz1 - z0] = grid.block(
+        cx0, cx1, cy0, cy1, cz0, cz1
+    )
+    return out
+
+
+# _mesh_block: bu tuğla için ağ üretilmez
+_SKIP = object()
+
+
+def _clean_interior(grid: VoxelGrid, gx: int, gy: int, gz: int, step: int) -> bool:
+    """Parça tamamen ızgara içindeyse ve hiç kirlenmemişse True (stok içi, ağ üretilmez)."""
+    nx, ny, nz = grid.spec.shape
+    inner = min(gx, gy, gz) >= 0 and gx + step < nx and gy + step < ny and gz + step < nz
+    return inner and not grid.dirty(gx, gx + step + 1, gy, gy + step + 1, gz + step + 1)
+
+
+def _mesh_block(grid: VoxelGrid, x0: int, y0: int, z0: int, brick: int):
+    """Tuğlanın (brick+1)^3 bloğu; kirlenmemiş sınır tuğlası için None, ağ gerekmiyorsa _SKIP."""
+    nx, ny, nz = grid.spec.shape
+    x1, y1, z1 = (min(n + 1, v + brick + 1) for n, v in ((nx, x0), (ny, y0), (nz, z0)))
+    boundary = min(x0, y0, z0) < 0 or x1 > nx or y1 > ny or z1 > nz
+    if not grid.dirty(x0, x1, y0, y1, z1):
+        return None if boundary else _SKIP
+    if not boundary and grid.uniform(x0, x1, y0, y1, z0, z1) is not None:
+        return _SKIP
+    blk = padded_block(grid, x0, x1, y0, y1, z0, z1)
+    return _SKIP if blk.min() == blk.max() else blk
+
+
+def iter_mesh_blocks(
+    grid: VoxelGrid, brick: int = BRICK, group: int = 1
+) -> Iterator[Tuple[Tuple[int, int, int], Optional[np.ndarray]]]:
+    """Ağ üretimi için tuğla tuğla (brick+1)^3 bloklar üretir; +1 katman komşu tuğlayla dikişi
+    kapatır. Izgara örtük bir boş katmanla çevrilidir (blok başlangıçları -1'den başlar), böylece
+    kesimin stok kenarını açtığı yerlerde de yüzey kapanır. Marching cubes yalnızca kirli tuğla
+    kolonlarına değen bloklar için gerekir; kirlenmemiş bir blok ya stok içindedir (atlanır) ya da
+    stok kutusunun dış yüzündedir ve blok yerine None döner (yüzü analitik olarak üretilir).
+    group>1 ise bloklar group^3 tuğlalık uzamsal parçalar hâlinde art arda gelir.
+    """
+    nx, ny, nz = grid.spec.shape
+    step = brick * max(1, group)
+    for gx, gy, gz in product(range(-1, nx, step), range(-1, ny, step), range(-1, nz, step)):
+        if _clean_interior(grid, gx, gy, gz, step):
+            continue
+        bricks = product(
+            range(gx, min(gx + step, nx), brick),
+            range(gy, min(gy + step, ny), brick),
+            range(gz, min(gz + step, nz), brick),
+        )
+        for x0, y0, z0 in bricks:
+            blk = _mesh_block(grid, x0, y0, z0, brick)
+            if blk is not _SKIP:
+                yield (x0, y0, z0), blk
@@ -1,10 +1,10 @@
 from __future__ import annotations
 
+import hashlib
 import mimetypes
 from datetime import timedelta
 from pathlib import Path
 from typing import Optional
-import hashlib
 
 import boto3
 
@@ -57,3 +57,13 @@ def upload_and_sign(path: Path, artefact_type: str) -> dict:
     }
 
 
+def get_range(key: str, start: int, end: int) -> bytes:
+    """Nesnenin [start, end) bayt aralığını tek ranged GET ile indirir."""
+    s3 = get_s3_client()
+    obj = s3.get_object(Bucket=settings.s3_bucket_name, Key=key, Range=f"bytes={start}-{end - 1}")
+    return obj["Body"].read()
+
+
+def get_bytes(key: str) -> bytes:
+    s3 = get_s3_client()
+    return s3.get_object(Bucket=settings.s3_bucket_name, Key=key)["Body"].read()
@@ -1,12 +1,47 @@
 from __future__ import annotations
 
-from celery import shared_task
+import hashlib
 import tempfile
+from pathlib import Path
+from typing import Dict
+
+from celery import shared_task
 
 from ..db import SessionLocal
-from ..models_project import Project, ProjectFile, FileKind, ProjectStatus
-from ..storage import upload_and_sign
-from ..freecad.cad_build import build_from_plan
+from ..freecad.cad_build import build_from_params, freecad_version, parse_plan_to_params
+from ..logging_setup import get_logger
+from ..models_project import FileKind, Project, ProjectFile, ProjectStatus
+from ..services import cad_cache
+from ..storage import presigned_url, upload_and_sign
+
+logger = get_logger(__name__)
+
+
+def _file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _build_and_upload(params, key: str, project_id: int) -> tuple[Dict[str, Dict], Dict]:
+    """FreeCAD ile üretip yükler. S3 anahtarı dosya adından türediğinden ad içerik özetini taşır:
+    aynı ada yalnızca aynı baytlar yazılır, önceki bir yüklemenin (ve onu gösteren önbellek
+    girdisinin) üzerine başka içerik yazılmaz. Doğrulamadan geçmeyen üretim paylaşılan
+    'cad-<anahtar>' adlarını kullanmaz, projeye özel adla yüklenir."""
+    arts: Dict[str, Dict] = {}
+    with tempfile.TemporaryDirectory() as d:
+        paths, stats = build_from_params(params, d)
+        stem = f"cad-{key[:16]}" if stats.get("ok") else f"cad-failed-p{project_id}"
+        for kind, path in paths.items():
+            if not path:
+                continue
+            src = Path(path)
+            named = src.rename(src.with_name(f"{stem}-{_file_sha256(src)[:16]}{src.suffix}"))
+            art = upload_and_sign(named, f"cad/{kind}")
+            arts[kind] = {"s3_key": art["s3_key"], "size": art["size"], "sha256": art["sha256"]}
+    return arts, stats
 
 
 @shared_task(bind=True, autoretry_for=(Exception,), retry_backoff=True, max_retries=3, acks_late=True, queue='cpu')
@@ -17,14 +52,20 @@ def cad_build_task(self, project_id: int):
         if not p or not p.summary_json:
             raise RuntimeError("Plan bulunamadı.")
         plan = (p.summary_json or {}).get("plan") or {}
-        with tempfile.TemporaryDirectory() as d:
-            paths, stats = build_from_plan(plan, d)
-            out = {}
-            for kind, path in paths.items():
-                if not path:
-                    continue
-                art = upload_and_sign(path, type=f"cad/{kind}")
-                f = ProjectFile(
+        params = parse_plan_to_params(plan)
+        key = cad_cache.cad_cache_key(params, freecad_version())
+        hit = cad_cache.lookup(key) if cad_cache.enabled() else None
+        if hit:
+            # Aynı geometri daha önce üretilmiş: FreeCAD başlatılmadan mevcut artefaktlar bağlanır
+            arts, stats = hit["artifacts"], hit["stats"]
+        else:
+            arts, stats = _build_and_upload(params, key, p.id)
+            if stats.get("ok") and cad_cache.enabled():
+                cad_cache.store(key, arts, stats)
+        out = {}
+        for kind, art in arts.items():
+            db.add(
+                ProjectFile(
                     project_id=p.id,
                     kind=FileKind.cad,
                     s3_key=art["s3_key"],
@@ -33,14 +74,19 @@ def cad_build_task(self, project_id: int):
                     version=(plan or {}).get("rev") or "v1",
                     notes=kind,
                 )
-                db.add(f)
-                db.commit()
-                out[kind] = art.get("signed_url")
-            p.status = ProjectStatus.cad_ready if stats.get("ok") else ProjectStatus.error
-            p.summary_json = {**(p.summary_json or {}), "cad_stats": stats, "cad_artifacts": out}
-            db.commit()
-            return {"project_id": p.id, "artifacts": out, "stats": stats}
+            )
+            out[kind] = presigned_url(art["s3_key"])
+        p.status = ProjectStatus.cad_ready if stats.get("ok") else ProjectStatus.error
+        p.summary_json = {
+            **(p.summary_json or {}),
+            "cad_stats": stats,
+            "cad_artifacts": out,
+            "cad_cache": {"key": key, "hit": bool(hit)},
+        }
+        db.commit()
+        logger.info(
+            "CAD üretimi tamamlandı", extra={"project_id": p.id, "cad_cache_hit": bool(hit)}
+        )
+        return {"project_id": p.id, "artifacts": out, "stats": stats, "cached": bool(hit)}
     finally:
         db.close()
-
-
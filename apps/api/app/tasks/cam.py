@@ -3,53 +3,94 @@ from __future__ import annotations
 import json
 from datetime import datetime
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Tuple
 
-from .worker import celery_app
+import numpy as np
+from billiard.exceptions import SoftTimeLimitExceeded
+from opentelemetry import trace
 
+from ..audit import audit
+from ..cam.cycle_time import CycleTime, MachineLimits, OpMarkers, estimate_cycle_time
 from ..config import settings
 from ..db import db_session
+from ..freecad.capabilities import FreeCADUnavailable
+from ..freecad.capabilities import require as require_freecad
+from ..freecad.path_job import make_path_job
+from ..gcode.line_index import write_line_index
 from ..logging_setup import get_logger
+from ..metrics import failures_total, job_latency_seconds, queue_wait_seconds, retried_total
 from ..models import Job
-from ..storage import upload_and_sign, get_s3_client
-from ..freecad.service import detect_freecad
-from ..freecad.path_job import make_path_job
+from ..post.compact import compact_gcode
+from ..post.lint import cam_rules, scan
 from ..services.dlq import push_dead
-from ..audit import audit
-from ..metrics import job_latency_seconds, failures_total, queue_wait_seconds, retried_total
-from opentelemetry import trace
-from billiard.exceptions import SoftTimeLimitExceeded
-
+from ..services.job_events import start_stage
+from ..settings import app_settings as appset
+from ..storage import get_s3_client, upload_and_sign
+from .worker import celery_app
 
 logger = get_logger(__name__)
 
-
-def lint_gcode(text: str, params: Dict) -> Dict:
-    lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
-    if not lines:
-        raise RuntimeError("G-code boş")
-    if not any(ln.startswith("G0") or ln.startswith("G1") for ln in lines):
-        raise RuntimeError("G0/G1 komutları bulunamadı")
-    # İlk G1 öncesi F set edilmiş mi
-    f_set = False
-    for ln in lines:
-        if "F" in ln:
-            f_set = True
-            break
-        if ln.startswith("G1"):
-            break
-    if not f_set:
-        raise RuntimeError("İlk G1 öncesinde ilerleme (F) ayarı bulunamadı")
-    txt_lower = "\n".join(lines).lower()
-    if "nan" in txt_lower or "inf" in txt_lower:
-        raise RuntimeError("Geçersiz sayı (NaN/Inf) içeriyor")
-    units = params.get("units", "mm")
-    if units == "mm" and not any("G21" in ln for ln in lines[:20]):
-        raise RuntimeError("Birim bildirimi (G21) bulunamadı")
-    if units == "inch" and not any("G20" in ln for ln in lines[:20]):
-        raise RuntimeError("Birim bildirimi (G20) bulunamadı")
-    # Basit bbox kontrolü: X/Y/Z değerlerini kaba regex olmadan pars etmek zor; hızlı kontrol: sınır anahtarlarına göre döndür
-    return {"lines": len(lines)}
+# Aşamaların işin genel ilerleme yüzdesindeki aralıkları (SSE olayları)
+CAM_STAGES = {
+    "download": (0.0, 10.0),
+    "generate": (10.0, 75.0),
+    "lint": (75.0, 90.0),
+    "upload": (90.0, 100.0),
+}
+
+
+def lint_program(source, params: Dict, on_line=None) -> Tuple[Dict, np.ndarray]:
+    """CAM çıktısını tek geçişte denetler; ilk hata RuntimeError olarak yükselir.
+    'source' metin ya da açık dosya olabilir. params.machine_bounds_mm verilmişse her hareket
+    makine çalışma alanına göre denetlenir. Aynı geçişte ayrıştırılan hareket tablosu da döner.
+    """
+    res, moves = scan(source, cam_rules(params), on_line)
+    if res.errors:
+        raise RuntimeError(res.errors[0].message)
+    return {"lines": res.lines, "moves": res.moves}, moves
+
+
+def lint_gcode(text, params: Dict) -> Dict:
+    return lint_program(text, params)[0]
+
+
+def check_program(gcode_path: Path, params: Dict, tracer) -> Tuple[Dict, Dict, CycleTime]:
+    """İsteğe bağlı sadeleştirme + lint + çevrim süresi; (sadeleştirme, lint, süre) döndürür.
+    Sadeleştirme kapalıysa program bir kez akışla okunur: lint, hareket tablosu ve operasyon
+    işaretleri aynı geçişte toplanır.
+    """
+    compact: Dict = {}
+    markers = OpMarkers()
+    if params.get("compact", appset.gcode_compact):
+        text = gcode_path.read_text(encoding="utf-8", errors="ignore")
+        with tracer.start_as_current_span("cam.compact"):
+            text, cstats = compact_gcode(
+                text, float(params.get("arc_tol_mm", appset.gcode_arc_tol_mm))
+            )
+        gcode_path.write_text(text, encoding="utf-8")
+        compact = cstats.as_metrics()
+        lint, moves = lint_program(text, params, markers)
+    else:
+        with open(gcode_path, "r", encoding="utf-8", errors="ignore") as f:
+            lint, moves = lint_program(f, params, markers)
+    machine = MachineLimits.from_settings(params.get("machine"))
+    return compact, lint, estimate_cycle_time(moves, machine, markers=markers)
+
+
+def observe_success(job: Job) -> None:
+    """Başarılı işin gecikme ve kuyruk bekleme ölçümleri."""
+    if job.started_at and job.finished_at:
+        job_latency_seconds.labels(type="cam", status="succeeded").observe(
+            (job.finished_at - job.started_at).total_seconds()
+        )
+    if job.started_at and (job.metrics or {}).get("created_at"):
+        try:
+            created = datetime.fromisoformat(job.metrics["created_at"]).replace(tzinfo=None)
+            queue_wait_seconds.labels(queue=(job.metrics or {}).get("queue", "cpu")).observe(
+                (job.started_at - created).total_seconds()
+            )
+        except Exception:
+            ...
 
 
 @celery_app.task(
@@ -58,6 +99,7 @@ def lint_gcode(text: str, params: Dict) -> Dict:
     queue="cpu",
     acks_late=True,
     autoretry_for=(Exception,),
+    dont_autoretry_for=(FreeCADUnavailable,),
     retry_backoff=True,
     retry_jitter=True,
     retry_kwargs={"max_retries": 3},
@@ -84,43 +126,46 @@ def cam_generate(self, job_id: int) -> dict:
             raise RuntimeError("FCStd s3_key eksik")
 
     # indir
+    start_stage(job_id, CAM_STAGES, "download")
     s3 = get_s3_client()
     tmp_dir = Path("/tmp/cam")
     tmp_dir.mkdir(parents=True, exist_ok=True)
     fcstd_path = tmp_dir / "assembly.fcstd"
     s3.download_file(settings.s3_bucket_name, s3_key, str(fcstd_path))
 
-    # FreeCADCmd
-    fc = detect_freecad()
-    if not fc.found or not fc.path:
-        raise RuntimeError("FreeCADCmd bulunamadı")
-
     try:
+        # FreeCADCmd (yoksa iş yeniden denenmeden başarısız kapanır)
+        fc = require_freecad("Path")
+
         # Path Job → gcode
+        start_stage(job_id, CAM_STAGES, "generate")
         tracer = trace.get_tracer(__name__)
         with tracer.start_as_current_span("cam.path_job") as span:
-            gcode_path, stats = make_path_job(fc.path, fcstd_path, params, params.get("post", "grbl"), settings.freecad_timeout_seconds)
+            post = params.get("post", "grbl")
+            timeout = settings.freecad_timeout_seconds
+            gcode_path, stats = make_path_job(fc.path, fcstd_path, params, post, timeout)
             span.set_attribute("job_id", job_id)
             span.set_attribute("type", "cam")
-        text = gcode_path.read_text(encoding="utf-8", errors="ignore")
-        lint = lint_gcode(text, params)
+        start_stage(job_id, CAM_STAGES, "lint")
+        compact, lint, cycle = check_program(gcode_path, params, tracer)
 
+        # Artefakt anahtarı dosya adından türediği için iş başına benzersiz ad;
+        # satır dizini yanına yazılır
+        gcode_path = gcode_path.rename(gcode_path.with_name(f"cam-{job_id}.gcode"))
+        start_stage(job_id, CAM_STAGES, "upload")
         art = upload_and_sign(gcode_path, "gcode")
+        idx_art = upload_and_sign(write_line_index(gcode_path), "gcode-index")
         with db_session() as s:
             job = s.get(Job, job_id)
             job.status = "succeeded"
             job.finished_at = datetime.utcnow()
-            job.metrics = {**(job.metrics or {}), **stats, **lint}
-            job.artefacts = [{"type": art["type"], "s3_key": art["s3_key"], "size": art["size"], "sha256": art["sha256"]}]
+            job.metrics = {**(job.metrics or {}), **stats, **compact, **lint, **cycle.as_metrics()}
+            job.artefacts = [
+                {"type": a["type"], "s3_key": a["s3_key"], "size": a["size"], "sha256": a["sha256"]}
+                for a in (art, idx_art)
+            ]
             s.commit()
-        if job.started_at and job.finished_at:
-            job_latency_seconds.labels(type="cam", status="succeeded").observe((job.finished_at - job.started_at).total_seconds())
-        if job.started_at and (job.metrics or {}).get("created_at"):
-            try:
-                created = datetime.fromisoformat(job.metrics["created_at"]).replace(tzinfo=None)
-                queue_wait_seconds.labels(queue=(job.metrics or {}).get("queue", "cpu")).observe((job.started_at - created).total_seconds())
-            except Exception:
-                ...
+        observe_success(job)
         audit("task.success", job_id=job_id, task="cam.generate")
         return {"ok": True}
     except SoftTimeLimitExceeded:
@@ -145,11 +190,8 @@ def cam_generate(self, job_id: int) -> dict:
             s.commit()
         push_dead(job_id, "cam.generate", str(e))
         failures_total.labels(task="cam.generate", reason=type(e).__name__).inc()
-        if getattr(self.request, "retries", 0) < getattr(self.request, "max_retries", 0):
+        retry = getattr(self.request, "retries", 0) < getattr(self.request, "max_retries", 0)
+        if retry and not isinstance(e, FreeCADUnavailable):
             retried_total.labels(task="cam.generate").inc()
         audit("dlq.push", job_id=job_id, task="cam.generate", reason=str(e))
         raise
-
-
-
-
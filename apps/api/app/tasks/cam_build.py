@@ -7,15 +7,25 @@ from typing import Any, Dict
 
 from celery import shared_task
 
+from ..cam.cam_plan import derive_cam_params
+from ..cam.sequencing import apply_actual_path
 from ..db import db_session
-from ..models_project import Project, ProjectFile, FileKind, ProjectStatus
-from ..storage import upload_and_sign, get_s3_client, presigned_url
-from ..freecad.service import detect_freecad
+from ..freecad.capabilities import FreeCADUnavailable
+from ..freecad.capabilities import require as require_freecad
 from ..freecad.path_build import build_cam_job
-from ..cam.cam_plan import derive_cam_params
-
-
-@shared_task(bind=True, autoretry_for=(Exception,), retry_backoff=True, max_retries=3, acks_late=True, queue="cpu")
+from ..models_project import FileKind, Project, ProjectFile, ProjectStatus
+from ..storage import get_s3_client, presigned_url, upload_and_sign
+
+
+@shared_task(
+    bind=True,
+    autoretry_for=(Exception,),
+    dont_autoretry_for=(FreeCADUnavailable,),
+    retry_backoff=True,
+    max_retries=3,
+    acks_late=True,
+    queue="cpu",
+)
 def cam_build_task(self, project_id: int, machine_post: str | None, wcs: str, stock: Dict[str, Any], strategy: str = "balanced"):
     # Plan ve FCStd artefaktını hazırla
     with db_session() as s:
@@ -50,9 +60,7 @@ def cam_build_task(self, project_id: int, machine_post: str | None, wcs: str, st
         s3.download_file("artefacts", s3_key, str(fcstd_local))
 
     # FreeCADCmd hazır mı
-    fc = detect_freecad()
-    if not fc.found or not fc.path:
-        raise RuntimeError("FreeCADCmd bulunamadı")
+    require_freecad("Path")
 
     # CAM paramları türet
     cam = derive_cam_params(plan, strategy=strategy)
@@ -88,7 +96,20 @@ def cam_build_task(self, project_id: int, machine_post: str | None, wcs: str, st
         p.status = ProjectStatus.cam_ready
         prev = p.summary_json or {}
         prev["cam_artifacts"] = arts
-        prev["cam_job"] = {"ops": out.get("ops", []), "wcs": wcs, "stock": stock}
+        prev["cam_job"] = {
+            "ops": out.get("ops", []),
+            "est_total_s": out.get("est_total_s"),
+            "wcs": wcs,
+            "stock": stock,
+        }
+        if out.get("op_order"):
+            prev["cam_job"]["op_order"] = out["op_order"]
+        if cam.get("drill_sequence"):
+            stats = cam["drill_sequence"]
+            if out.get("drill_xy") is not None:
+                # Kazanç planlanan sıradan değil, FreeCAD'in ürettiği yoldan raporlanır
+                stats = apply_actual_path(stats, out["drill_xy"])
+            prev["cam_job"]["drill_sequence"] = stats
         p.summary_json = prev
         s.commit()
 
@@ -96,6 +117,6 @@ def cam_build_task(self, project_id: int, machine_post: str | None, wcs: str, st
         "project_id": project_id,
         "artifacts": arts,
         "ops": out.get("ops", []),
+        "est_total_s": out.get("est_total_s"),
+        "tool_changes_saved": (out.get("op_order") or {}).get("tool_changes_saved"),
     }
-
-
@@ -8,11 +8,25 @@ from pathlib import Path
 from celery import shared_task
 
 from ..db import db_session
-from ..models import Job
+from ..freecad.generate import (
+  build_freecad_python,
+  parse_run_metrics,
+  run_freecad_cmd,
+  validate_script_security,
+)
 from ..llm_router import generate_structured
-from ..freecad.generate import validate_script_security, build_freecad_python, run_freecad_cmd, build_freecad_validation
+from ..models import Job
+from ..services.job_events import start_stage
 from ..storage import upload_and_sign
 
+# Aşamaların işin genel ilerleme yüzdesindeki aralıkları (SSE olayları)
+DESIGN_STAGES = {
+  'generate': (0.0, 40.0),
+  'lint': (40.0, 45.0),
+  'build': (45.0, 90.0),
+  'upload': (90.0, 100.0),
+}
+
 
 @shared_task(name='design.orchestrate', queue='cpu', time_limit=600)
 def design_orchestrate(job_id: int):
@@ -25,20 +39,21 @@ def design_orchestrate(job_id: int):
   try:
     params = (job.metrics or {}).get('params') if job and job.metrics else None
     brief = (params or {}).get('brief') if isinstance(params, dict) else {}
+    start_stage(job_id, DESIGN_STAGES, 'generate')
     data, meta = generate_structured(brief or {})
     script_body = data.get('script','')
+    start_stage(job_id, DESIGN_STAGES, 'lint')
     validate_script_security(script_body)
     full_script = build_freecad_python(script_body)
     out_dir = Path(tempfile.mkdtemp())
     out_fcstd = out_dir / 'design.fcstd'
+    start_stage(job_id, DESIGN_STAGES, 'build')
     res1 = run_freecad_cmd('FreeCADCmd', full_script, out_fcstd, 600, pid_file=None)
+    # üretim + doğrulama tek oturumda (belge kaydedilmeden önce bellekte doğrulanır)
     if res1['returncode'] != 0:
-      raise RuntimeError('FreeCAD üretim hatası')
-    # doğrulama
-    res2 = run_freecad_cmd('FreeCADCmd', build_freecad_validation(), out_fcstd, 120, pid_file=None)
-    if res2['returncode'] != 0:
-      raise RuntimeError('FreeCAD doğrulama hatası')
+      raise RuntimeError('FreeCAD üretim/doğrulama hatası')
     # artefakt yükle
+    start_stage(job_id, DESIGN_STAGES, 'upload')
     artefacts = []
     artefacts.append(upload_and_sign(out_fcstd, 'fcstd'))
     bom = data.get('bom') or []
@@ -50,7 +65,14 @@ def design_orchestrate(job_id: int):
       if not job:
         return
       met = job.metrics or {}
-      met.update({'elapsed_ms': res1.get('elapsed_ms'), 'model_name': meta.get('model_name'), 'token_in': meta.get('token_input'), 'token_out': meta.get('token_output'), 'escalated': meta.get('escalated')})
+      met.update({
+        'elapsed_ms': res1.get('elapsed_ms'),
+        **parse_run_metrics(res1.get('stdout', '')),
+        'model_name': meta.get('model_name'),
+        'token_in': meta.get('token_input'),
+        'token_out': meta.get('token_output'),
+        'escalated': meta.get('escalated'),
+      })
       job.metrics = met
       job.artefacts = artefacts
       job.status = 'success'
@@ -1,15 +1,17 @@
 from __future__ import annotations
 
-from celery import shared_task
 import time
 from datetime import datetime
 from pathlib import Path
 
+from celery import shared_task
+
+from ..audit import audit
 from ..db import db_session
-from ..models_project import Setup, PostRun
-from ..post.lint import lint_gcode
+from ..gcode.line_index import write_line_index
 from ..metrics import job_latency_seconds
-from ..audit import audit
+from ..models_project import PostRun, Setup
+from ..post.lint import lint_gcode
 from ..storage import upload_and_sign
 
 
@@ -30,18 +32,32 @@ def setup_post_task(self, setup_id: int):
     out.write_text(nc_text, encoding="utf-8")
     lint = lint_gcode(nc_text, dialect="grbl", tool_plane_enabled=False)
     art = {}
+    arts = []
     try:
         art = upload_and_sign(out, "nc")
+        art["index"] = upload_and_sign(write_line_index(out), "nc-index")
+        arts = [
+            {"type": a["type"], "s3_key": a["s3_key"], "size": a["size"], "sha256": a["sha256"]}
+            for a in (art, art["index"])
+        ]
     except Exception:
         ...
     with db_session() as s:
-        pr = PostRun(setup_id=setup_id, processor="grbl", nc_path=str(out), line_count=len(nc_text.splitlines()), lint_json=lint, duration_ms=int((time.time()-started)*1000), ok=True)
+        pr = PostRun(
+            setup_id=setup_id,
+            processor="grbl",
+            nc_path=str(out),
+            line_count=len(nc_text.splitlines()),
+            lint_json=lint,
+            duration_ms=int((time.time() - started) * 1000),
+            ok=True,
+            artefacts_json=arts or None,
+        )
         s.add(pr)
         st = s.get(Setup, setup_id)
         st.status = "post_ok"
         s.commit()
+        post_id = pr.id
     job_latency_seconds.labels(type="post", status="succeeded").observe(time.time()-started)
     audit("post.finish", setup_id=setup_id)
-    return {"ok": True, "lint": lint, "artefact": art}
-
-
+    return {"ok": True, "post_id": post_id, "lint": lint, "artefact": art}
@@ -4,30 +4,195 @@ import io
 import json
 import math
 import time
+from dataclasses import asdict
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Tuple
 
 import numpy as np
+from billiard.exceptions import SoftTimeLimitExceeded
+from celery import chord, group
+from celery.exceptions import Ignore
+from opentelemetry import trace
 
-from .worker import celery_app
-from ..settings import app_settings as appset
+from ..audit import audit
 from ..config import settings
 from ..db import db_session
+from ..gcode.tokenizer import parse_moves
 from ..logging_setup import get_logger
+from ..metrics import failures_total, job_latency_seconds, queue_wait_seconds, retried_total
 from ..models import Job
-from ..storage import get_s3_client, upload_and_sign
-from pygltflib import GLTF2, Scene, Node, Mesh, Buffer, BufferView, Accessor
+from ..models_project import Project
+from ..models_tooling import Tool
+from ..services import sim_cache
 from ..services.dlq import push_dead
-from ..audit import audit
-from billiard.exceptions import SoftTimeLimitExceeded
-from ..metrics import job_latency_seconds, failures_total, queue_wait_seconds, retried_total
-from opentelemetry import trace
-
+from ..services.job_control import cancel_requested
+from ..services.job_events import StageProgress, start_stage
+from ..settings import app_settings as appset
+from ..sim.bounds import fit_bounds
+from ..sim.cancel import CANCELLED, CancelToken, SimInterrupted
+from ..sim.carve import Bounds, GridSpec, KernelSet, ToolShape, apply_column_floor, tool_kernel
+from ..sim.checkpoints import sweep_with_checkpoints
+from ..sim.gltf import CHUNK_BRICKS, LOD_CELLS, iter_voxel_meshes, split_spatial, write_glb
+from ..sim.heightfield import heightfield_from_floor, heightfield_mesh, removed_volume_mm3
+from ..sim.parallel import SweepPool
+from ..sim.slabs import carve_slab_floor, load_slab, plan_slabs, save_slab, stitch_floors
+from ..sim.voxgrid import BRICK, make_grid
+from ..storage import get_s3_client, upload_and_sign
+from .worker import celery_app
 
 logger = get_logger(__name__)
 
 
+DEFAULT_BOUNDS = {"x": [0, 300], "y": [0, 300], "z": [-50, 150]}
+DEFAULT_TOOL_DIAM_MM = 6.0
+# Aşamaların işin genel ilerleme yüzdesindeki aralıkları (SSE olayları)
+SIM_STAGES = {
+    "download": (0.0, 5.0),
+    "parse": (5.0, 10.0),
+    "carve": (10.0, 80.0),
+    "mesh": (80.0, 95.0),
+    "upload": (95.0, 100.0),
+}
+
+
+def sim_stage(job_id: int, stage: str, message: str | None = None) -> StageProgress:
+    """Aşama başlangıç olayını yayınlar; dönen nesne aşama içi ilerleme geri çağrısıdır."""
+    return start_stage(job_id, SIM_STAGES, stage, message)
+
+
+def download_bytes(key: str) -> bytes:
+    s3 = get_s3_client()
+    bio = io.BytesIO()
+    s3.download_fileobj(settings.s3_bucket_name, key, bio)
+    return bio.getvalue()
+
+
+def load_gcode(gcode_job_id: int | None) -> str:
+    if not gcode_job_id:
+        return ""
+    with db_session() as s:
+        gj = s.get(Job, gcode_job_id)
+        if not gj or not gj.artefacts:
+            raise RuntimeError("G-code artefaktı bulunamadı")
+        gk = gj.artefacts[0].get("s3_key")
+        if not gk:
+            raise RuntimeError("G-code s3_key eksik")
+    return download_bytes(gk).decode("utf-8", "ignore")
+
+
+def job_params(job_id: int) -> Dict:
+    with db_session() as s:
+        job = s.get(Job, job_id)
+        if not job:
+            raise RuntimeError("job yok")
+        return dict((job.metrics or {}).get("params", {}))
+
+
+def project_stock(project_id: int | None) -> Dict | None:
+    """Projenin son CAM işindeki stok tanımı (summary_json.cam_job.stock)."""
+    if not project_id:
+        return None
+    with db_session() as s:
+        p = s.get(Project, project_id)
+        cam_job = ((p.summary_json or {}).get("cam_job") or {}) if p else {}
+        stock = cam_job.get("stock") if isinstance(cam_job, dict) else None
+        return dict(stock) if stock else None
+
+
+def auto_bounds(params: Dict) -> bool:
+    """bounds verilmemiş ya da "auto" ise sınırlar G-code ve stoktan çıkarılır."""
+    return not isinstance(params.get("bounds"), dict)
+
+
+def resolve_bounds(
+    params: Dict, moves: np.ndarray, tool_radius: float, res_mm: float, stock: Dict | None
+) -> Bounds:
+    if not auto_bounds(params):
+        return params["bounds"]
+    # Kafese yuvarlanan sınırlar küçük düzenlemelerde değişmez; kontrol
+    # noktaları yeniden kullanılabilir
+    return fit_bounds(
+        moves,
+        tool_radius,
+        res_mm,
+        stock=stock,
+        fallback=DEFAULT_BOUNDS,
+        snap_mm=appset.sim_bounds_snap_mm,
+    )
+
+
+def toolbit_geometry(path: str | None) -> Dict:
+    """ToolBit JSON'undaki geometry bölümü (köşe yarıçapı, uç açısı); okunamazsa boş."""
+    if not path:
+        return {}
+    try:
+        return json.loads(Path(path).read_text(encoding="utf-8")).get("geometry") or {}
+    except (OSError, ValueError, AttributeError):
+        return {}
+
+
+def load_tool_shapes(params: Dict) -> Dict[int | None, ToolShape]:
+    """params.tool_id (tüm takımlar) ve params.tools ({T numarası: Tool.id}) → takım profilleri.
+    None anahtarı varsayılan profildir.
+    """
+    ids = {
+        None: params.get("tool_id"),
+        **{int(t): i for t, i in (params.get("tools") or {}).items()},
+    }
+    ids = {t: int(i) for t, i in ids.items() if i}
+    if not ids:
+        return {}
+    with db_session() as s:
+        rows = {t.id: t for t in s.query(Tool).filter(Tool.id.in_(set(ids.values()))).all()}
+        shapes: Dict[int | None, ToolShape] = {}
+        for t, i in ids.items():
+            tool = rows.get(i)
+            if tool is None or not tool.diameter_mm:
+                raise RuntimeError(f"Takım bulunamadı ya da çapı tanımsız: {i}")
+            shapes[t] = ToolShape.from_library(
+                tool.type, tool.diameter_mm, toolbit_geometry(tool.toolbit_json_path)
+            )
+    return shapes
+
+
+def tool_kernels(params: Dict, res_mm: float) -> Tuple[KernelSet, Dict]:
+    """Takım kütüphanesinden kernel kümesi; takım verilmezse DEFAULT_TOOL_DIAM_MM düz uç.
+    İkinci dönüş, önbellek anahtarına giren profil özetidir.
+    """
+    shapes = load_tool_shapes(params)
+    default = shapes.pop(None, ToolShape("flat", DEFAULT_TOOL_DIAM_MM))
+    kernels = KernelSet(
+        tool_kernel(default, res_mm), {t: tool_kernel(sh, res_mm) for t, sh in shapes.items()}
+    )
+    doc = {"default": asdict(default), **{str(t): asdict(sh) for t, sh in sorted(shapes.items())}}
+    return kernels, doc
+
+
+def record_bounds(job_id: int, bounds: Bounds, auto: bool, spec: GridSpec) -> Dict:
+    """Çözülen sınırları işe yazar (dilim görevleri aynı ızgarayı buradan okur)."""
+    info = {
+        "bounds": bounds,
+        "bounds_mode": "auto" if auto else "explicit",
+        "grid_shape": list(spec.shape),
+    }
+    with db_session() as s:
+        job = s.get(Job, job_id)
+        job.metrics = {**(job.metrics or {}), **info}
+        s.commit()
+    return info
+
+
+def job_bounds(job_id: int) -> Bounds:
+    with db_session() as s:
+        job = s.get(Job, job_id)
+        if not job:
+            raise RuntimeError("job yok")
+        metrics = job.metrics or {}
+    bounds = metrics.get("bounds") or metrics.get("params", {}).get("bounds")
+    return bounds if isinstance(bounds, dict) else DEFAULT_BOUNDS
+
+
 def load_inputs(assembly_job_id: int, gcode_job_id: int | None) -> Tuple[Path, str]:
     with db_session() as s:
         asm = s.get(Job, assembly_job_id)
@@ -36,19 +201,7 @@ def load_inputs(assembly_job_id: int, gcode_job_id: int | None) -> Tuple[Path, s
         fcstd_key = asm.artefacts[0].get("s3_key")
         if not fcstd_key:
             raise RuntimeError("FCStd s3_key eksik")
-        gcode_txt = None
-        if gcode_job_id:
-            gj = s.get(Job, gcode_job_id)
-            if not gj or not gj.artefacts:
-                raise RuntimeError("G-code artefaktı bulunamadı")
-            gk = gj.artefacts[0].get("s3_key")
-            if not gk:
-                raise RuntimeError("G-code s3_key eksik")
-            s3 = get_s3_client()
-            bio = io.BytesIO()
-            s3.download_fileobj(settings.s3_bucket_name, gk, bio)
-            bio.seek(0)
-            gcode_txt = bio.read().decode("utf-8", "ignore")
+        gcode_txt = load_gcode(gcode_job_id)
         s3 = get_s3_client()
         tmp_dir = Path("/tmp/sim")
         tmp_dir.mkdir(parents=True, exist_ok=True)
@@ -57,86 +210,199 @@ def load_inputs(assembly_job_id: int, gcode_job_id: int | None) -> Tuple[Path, s
         return fcstd_path, gcode_txt or ""
 
 
-def parse_gcode_basic(text: str):
-    moves = []
-    units = 'mm'
-    for raw in text.splitlines():
-        ln = raw.strip()
-        if not ln: continue
-        if ln.startswith('G21'): units = 'mm'
-        if ln.startswith('G20'): units = 'inch'
-        if ln.startswith('G0') or ln.startswith('G1'):
-            def num(tag):
-                import re
-                m = re.search(fr"\b{tag}(-?\d+(?:\.\d+)?)\b", ln, re.I)
-                return float(m.group(1)) if m else None
-            moves.append({
-                'type': 'G0' if ln.startswith('G0') else 'G1',
-                'x': num('X'), 'y': num('Y'), 'z': num('Z'), 'f': num('F')
-            })
-    return moves, units
-
-
-def carve_voxels(moves, bounds: Dict[str, Tuple[float, float]], res_mm: float, tool_diam_mm: float):
-    nx = int((bounds['x'][1] - bounds['x'][0]) / res_mm) + 1
-    ny = int((bounds['y'][1] - bounds['y'][0]) / res_mm) + 1
-    nz = int((bounds['z'][1] - bounds['z'][0]) / res_mm) + 1
-    vox = np.ones((nx, ny, nz), dtype=np.uint8)
-    carved = 0
-    last = [0.0, 0.0, 0.0]
-    radius = tool_diam_mm / 2.0
-    for i, mv in enumerate(moves):
-        x = mv.get('x', last[0]); y = mv.get('y', last[1]); z = mv.get('z', last[2])
-        # kaba: nokta çevresinde silindir çapında carving
-        ix = int((x - bounds['x'][0]) / res_mm)
-        iy = int((y - bounds['y'][0]) / res_mm)
-        iz = int((z - bounds['z'][0]) / res_mm)
-        r = max(1, int(radius / res_mm))
-        x0, x1 = max(0, ix - r), min(nx - 1, ix + r)
-        y0, y1 = max(0, iy - r), min(ny - 1, iy + r)
-        z0, z1 = max(0, iz - r), min(nz - 1, iz + r)
-        for xi in range(x0, x1 + 1):
-            for yi in range(y0, y1 + 1):
-                for zi in range(z0, z1 + 1):
-                    if vox[xi, yi, zi]:
-                        vox[xi, yi, zi] = 0
-                        carved += 1
-        last = [x, y, z]
-    return vox, carved
-
-
-def marching_cubes_to_gltf(vox: np.ndarray, res_mm: float, out_path: Path):
-    # Yerel import: binary uyumsuzluk riskini minimize etmek için yalnızca ihtiyaç anında yükle
-    import mcubes
-    verts, tris = mcubes.marching_cubes(vox.astype(np.float32), 0.5)
-    verts *= res_mm
-    vertices = verts.astype(np.float32).tobytes()
-    indices = tris.astype(np.uint32).tobytes()
-
-    gltf = GLTF2()
-    gltf.scene = 0
-    gltf.scenes = [Scene(nodes=[0])]
-
-    # Buffers
-    buffer = Buffer(byteLength=len(vertices) + len(indices))
-    gltf.buffers = [buffer]
-    gltf.bufferViews = [
-        BufferView(buffer=0, byteOffset=0, byteLength=len(vertices), target=34962),
-        BufferView(buffer=0, byteOffset=len(vertices), byteLength=len(indices), target=34963),
-    ]
-    gltf.accessors = [
-        Accessor(bufferView=0, byteOffset=0, componentType=5126, count=len(verts), type="VEC3"),
-        Accessor(bufferView=1, byteOffset=0, componentType=5125, count=len(tris) * 3, type="SCALAR"),
-    ]
-    gltf.meshes = [Mesh(primitives=[{"attributes": {"POSITION": 0}, "indices": 1}])]
-    gltf.nodes = [Node(mesh=0)]
-
-    # Bin dosya yaz
-    bin_path = out_path.with_suffix('.bin')
-    with open(bin_path, 'wb') as fb:
-        fb.write(vertices + indices)
-    gltf.buffers[0].uri = bin_path.name
-    gltf.save(str(out_path))
+def voxel_metrics(grid, carved: int) -> Dict:
+    return {
+        "carved_voxels": int(carved),
+        "grid_cells": int(grid.size),
+        "voxel_storage": grid.kind,
+        "grid_bytes": grid.nbytes,
+        "dirty_columns_pct": round(100.0 * grid.dirty_fraction(), 2),
+    }
+
+
+def sim_token(job_id: int, soft_limit_s: float | None = None) -> CancelToken:
+    """İşin iptal bayrağını yoklayan belirteç. soft_limit_s verilirse kesim, yumuşak sınırdan
+    SIM_PARTIAL_RESERVE_S önce (en geç sürenin yarısında) bırakılır; kalan süre kısmi ağ içindir.
+    """
+    deadline = None
+    if soft_limit_s:
+        deadline = time.monotonic() + max(
+            soft_limit_s - appset.sim_partial_reserve_s, soft_limit_s / 2
+        )
+    return CancelToken(cancelled=lambda: cancel_requested(job_id), deadline=deadline)
+
+
+def close_cancelled(job_id: int, task_name: str) -> dict:
+    """İşbirlikçi iptal: iş durumu cancel_job tarafından zaten yazıldı;
+    görev yeniden denemeden çıkar.
+    """
+    audit("task.cancelled", job_id=job_id, task=task_name)
+    return {"ok": False, "cancelled": True}
+
+
+def floor_result(
+    method: str,
+    floor: np.ndarray,
+    spec: GridSpec,
+    storage: str | None,
+    token: CancelToken | None = None,
+):
+    """Kolon tabanından stok durumunu kurar; (ağ parçaları, kesim metrikleri) döndürür."""
+    if method == "heightfield":
+        zmap = heightfield_from_floor(floor, spec)
+        verts, tris = heightfield_mesh(zmap, spec)
+        pieces = split_spatial(verts, tris, cell_mm=BRICK * CHUNK_BRICKS * spec.res_mm)
+        return pieces, {"removed_mm3": removed_volume_mm3(zmap, spec), "grid_cells": int(zmap.size)}
+    grid = make_grid(spec, storage, appset.sim_dense_max_cells)
+    carved = apply_column_floor(grid, floor, spec)
+    return iter_voxel_meshes(grid, token), voxel_metrics(grid, carved)
+
+
+def sim_cache_params(
+    method: str, res_mm: float, bounds: Dict | str, tools: Dict, stock: Dict | None = None
+) -> Dict:
+    """Ağ çıktısını belirleyen parametreler (önbellek anahtarına girer).
+    Otomatik sınırlar G-code'dan (özeti anahtarda) ve stoktan türediği için stok da anahtara girer.
+    """
+    doc = {"method": method, "resolution_mm": res_mm, "bounds": bounds, "tools": tools}
+    if stock:
+        doc["stock"] = stock
+    return doc
+
+
+def finish_sim(
+    job_id: int,
+    task_name: str,
+    chunks,
+    metrics: Dict,
+    cache_key: str | None = None,
+    partial: bool = False,
+) -> None:
+    """Ağı akıtarak nicelenmiş, LOD'lu GLB'ye yazar, yükler ve işi başarılı olarak kapatır.
+    partial: kesim süre sınırında yarıda kaldı; artefakt 'sim-mesh-partial' olarak yüklenir,
+    önbelleğe yazılmaz ve iş SIM_PARTIAL koduyla başarısız kapanır.
+    """
+    tracer = trace.get_tracer(__name__)
+    # Artefakt anahtarı dosya adından türediği için ad iş/önbellek girdisi başına benzersiz olmalı
+    if partial:
+        out = Path(f"/tmp/sim/sim-{job_id}-partial.glb")
+    else:
+        out = Path(f"/tmp/sim/sim-{cache_key[:24] if cache_key else job_id}.glb")
+    out.parent.mkdir(parents=True, exist_ok=True)
+    sim_stage(job_id, "mesh")
+    with tracer.start_as_current_span("sim.meshing") as span:
+        res_mm = float(metrics["voxel_resolution_mm"])
+        n_verts, n_tris = write_glb(
+            chunks, out, weld_mm=res_mm / 8, lod_cells=[c * res_mm for c in LOD_CELLS]
+        )
+        metrics = {**metrics, "mesh_vertices": n_verts, "mesh_triangles": n_tris}
+        span.set_attribute("job_id", job_id)
+        span.set_attribute("type", "sim")
+    sim_stage(job_id, "upload")
+    art = upload_and_sign(out, "sim-mesh-partial" if partial else "sim-mesh")
+    artefact = {
+        "type": art["type"],
+        "s3_key": art["s3_key"],
+        "size": art["size"],
+        "sha256": art["sha256"],
+    }
+    if partial:
+        partial_sim(job_id, task_name, artefact, metrics)
+        return
+    if cache_key:
+        sim_cache.store(cache_key, artefact, metrics)
+    complete_sim(job_id, task_name, artefact, metrics)
+
+
+def partial_sim(job_id: int, task_name: str, artefact: Dict, metrics: Dict) -> None:
+    """Süre sınırında kesilen sim: kısmi ağ artefakt olarak eklenir,
+    iş yeniden denenmeden kapanır.
+    """
+    pct = metrics.get("moves_processed_pct")
+    with db_session() as s:
+        job = s.get(Job, job_id)
+        job.status = "failed"
+        job.finished_at = datetime.utcnow()
+        job.error_code = "SIM_PARTIAL"
+        job.error_message = (
+            f"Zaman sınırına yaklaşıldı; kısmi sonuç yüklendi (hareketlerin %{pct} kadarı)"
+        )
+        job.metrics = {**(job.metrics or {}), **metrics, "partial": True}
+        job.artefacts = [artefact]
+        s.commit()
+    if job.started_at and job.finished_at:
+        job_latency_seconds.labels(type="sim", status="partial").observe(
+            (job.finished_at - job.started_at).total_seconds()
+        )
+    failures_total.labels(task=task_name, reason="time_limit_partial").inc()
+    audit("task.partial", job_id=job_id, task=task_name, moves_processed_pct=pct)
+
+
+def complete_sim(job_id: int, task_name: str, artefact: Dict, metrics: Dict) -> None:
+    """İşi başarılı kapatır. İptal son kesim yoklamasından sonra gelmiş olabilir: bayrak iş satırı
+    kilitliyken aynı işlemde yeniden okunur; iptal edilmişse artefakt
+    eklenir ama iş iptal olarak kalır.
+    """
+    with db_session() as s:
+        job = s.query(Job).filter(Job.id == job_id).with_for_update().one()
+        cancelled = job.error_code == "CANCELLED" or cancel_requested(job_id)
+        job.finished_at = datetime.utcnow()
+        job.metrics = {**(job.metrics or {}), **metrics}
+        job.artefacts = [artefact]
+        if cancelled:
+            job.status = "failed"
+            job.error_code = "CANCELLED"
+            job.error_message = job.error_message or "İş kullanıcı tarafından iptal edildi"
+        else:
+            job.status = "succeeded"
+        s.commit()
+    if cancelled:
+        close_cancelled(job_id, task_name)
+        return
+    if job.started_at and job.finished_at:
+        job_latency_seconds.labels(type="sim", status="succeeded").observe(
+            (job.finished_at - job.started_at).total_seconds()
+        )
+    if job.started_at and (job.metrics or {}).get("created_at"):
+        try:
+            created = datetime.fromisoformat(job.metrics["created_at"]).replace(tzinfo=None)
+            queue_wait_seconds.labels(queue=(job.metrics or {}).get("queue", "sim")).observe(
+                (job.started_at - created).total_seconds()
+            )
+        except Exception:
+            ...
+    audit("task.success", job_id=job_id, task=task_name)
+
+
+def fail_sim(job_id: int, task_name: str, e: Exception) -> None:
+    with db_session() as s:
+        job = s.get(Job, job_id)
+        if job:
+            job.status = "failed"
+            job.finished_at = datetime.utcnow()
+            job.error_message = str(e)
+            s.commit()
+    push_dead(job_id, task_name, str(e))
+    failures_total.labels(task=task_name, reason=type(e).__name__).inc()
+    audit("dlq.push", job_id=job_id, task=task_name, reason=str(e))
+
+
+def serve_cached(job_id: int, cache_key: str | None, start: float) -> bool:
+    """Önbellek isabetinde işi mevcut artefaktla kapatır (True); ıskada anahtarı işe yazar."""
+    if not cache_key:
+        return False
+    hit = sim_cache.lookup(cache_key)
+    if not hit:
+        with db_session() as s:
+            job = s.get(Job, job_id)
+            job.metrics = {**(job.metrics or {}), "cache": "miss", "cache_key": cache_key}
+            s.commit()
+        return False
+    complete_sim(job_id, "sim.generate", hit["artefact"], {
+        **hit.get("metrics", {}), "cache": "hit", "cache_key": cache_key,
+        "elapsed_ms": int((time.time() - start) * 1000),
+    })
+    return True
 
 
 @celery_app.task(
@@ -166,46 +432,82 @@ def sim_generate(self, job_id: int) -> dict:
     asm_id = params.get('assembly_job_id')
     gcode_job_id = params.get('gcode_job_id')
     res_mm = float(params.get('resolution_mm', 0.8))
-    bounds = params.get('bounds') or {"x": [0, 300], "y": [0, 300], "z": [-50, 150]}
-    tool_diam = 6.0
+    method = params.get("method") or "voxel"
+    storage = params.get("storage")
+    partitions = int(params.get("partitions") or 1)
+    auto = auto_bounds(params)
+    token = sim_token(job_id, appset.task_soft_limits.get("sim", 1140))
 
     try:
+        stock = project_stock(params.get("project_id")) if auto else None
+        kernels, tools_doc = tool_kernels(params, res_mm)
+        cache_key = sim_cache.key_for_job(
+            params,
+            sim_cache_params(
+                method,
+                res_mm,
+                "auto" if auto else params["bounds"],
+                tools_doc,
+                stock,
+            ),
+        )
+        if serve_cached(job_id, cache_key, start):
+            return {"ok": True, "cached": True}
+        if partitions > 1:
+            moves = parse_moves(load_gcode(gcode_job_id)) if auto else None
+            bounds = resolve_bounds(params, moves, kernels.radius_mm, res_mm, stock)
+            record_bounds(job_id, bounds, auto, GridSpec.from_bounds(bounds, res_mm))
+            return dispatch_slabs(job_id, bounds, res_mm, partitions)
+        sim_stage(job_id, "download")
         fcstd_path, gcode_txt = load_inputs(asm_id, gcode_job_id)
-        moves, units = parse_gcode_basic(gcode_txt)
-        if units == 'inch':
-            for mv in moves:
-                for k in ('x','y','z','f'):
-                    if mv.get(k) is not None:
-                        mv[k] *= 25.4
+        sim_stage(job_id, "parse")
+        moves = parse_moves(gcode_txt)
+        bounds = resolve_bounds(params, moves, kernels.radius_mm, res_mm, stock)
+        spec = GridSpec.from_bounds(bounds, res_mm)
+        bounds_info = record_bounds(job_id, bounds, auto, spec)
         tracer = trace.get_tracer(__name__)
         with tracer.start_as_current_span("sim.carve") as span:
-            vox, carved = carve_voxels(moves, bounds, res_mm, tool_diam)
+            # Havuz tüm kesim boyunca açık kalır; taban havuz kapandıktan sonra da geçerlidir
+            with SweepPool(spec.shape[:2], appset.sim_carve_workers) as pool:
+                floor = pool.floor
+                resume = sweep_with_checkpoints(
+                    floor,
+                    moves,
+                    gcode_txt.encode("utf-8"),
+                    kernels,
+                    spec,
+                    sim_cache.checkpoint_store(),
+                    pool=pool,
+                    token=token,
+                    progress=sim_stage(job_id, "carve"),
+                )
+            if resume.interrupted == CANCELLED:
+                return close_cancelled(job_id, "sim.generate")
+            chunks, carve_metrics = floor_result(method, floor, spec, storage, token)
             span.set_attribute("job_id", job_id)
             span.set_attribute("type", "sim")
-        out = Path('/tmp/sim/result.gltf')
-        out.parent.mkdir(parents=True, exist_ok=True)
-        with tracer.start_as_current_span("sim.meshing") as span:
-            marching_cubes_to_gltf(vox, res_mm, out)
-            span.set_attribute("job_id", job_id)
-            span.set_attribute("type", "sim")
-        art = upload_and_sign(out, 'sim-mesh')
-        with db_session() as s:
-            job = s.get(Job, job_id)
-            job.status = 'succeeded'
-            job.finished_at = datetime.utcnow()
-            job.metrics = {**(job.metrics or {}), 'voxel_resolution_mm': res_mm, 'carved_voxels': int(carved), 'elapsed_ms': int((time.time()-start)*1000)}
-            job.artefacts = [{"type": art["type"], "s3_key": art["s3_key"], "size": art["size"], "sha256": art["sha256"]}]
-            s.commit()
-        if job.started_at and job.finished_at:
-            job_latency_seconds.labels(type="sim", status="succeeded").observe((job.finished_at - job.started_at).total_seconds())
-        if job.started_at and (job.metrics or {}).get("created_at"):
-            try:
-                created = datetime.fromisoformat(job.metrics["created_at"]).replace(tzinfo=None)
-                queue_wait_seconds.labels(queue=(job.metrics or {}).get("queue", "sim")).observe((job.started_at - created).total_seconds())
-            except Exception:
-                ...
-        audit("task.success", job_id=job_id, task="sim.generate")
-        return {"ok": True}
+            span.set_attribute("method", method)
+            span.set_attribute("resumed_moves", resume.resumed_moves)
+            span.set_attribute("partial", bool(resume.interrupted))
+        finish_sim(
+            job_id,
+            "sim.generate",
+            chunks,
+            {
+                "voxel_resolution_mm": res_mm,
+                "method": method,
+                **bounds_info,
+                **carve_metrics,
+                **resume.as_metrics(),
+                "moves": int(len(moves)),
+                "elapsed_ms": int((time.time() - start) * 1000),
+            },
+            cache_key,
+            partial=bool(resume.interrupted),
+        )
+        return {"ok": True, "partial": bool(resume.interrupted)}
+    except SimInterrupted:
+        return close_cancelled(job_id, "sim.generate")
     except SoftTimeLimitExceeded as e:
         with db_session() as s:
             job = s.get(Job, job_id)
@@ -220,17 +522,138 @@ def sim_generate(self, job_id: int) -> dict:
             retried_total.labels(task='sim.generate').inc()
         raise
     except Exception as e:
-        with db_session() as s:
-            job = s.get(Job, job_id)
-            job.status = 'failed'
-            job.finished_at = datetime.utcnow()
-            job.error_message = str(e)
-            s.commit()
-        push_dead(job_id, "sim.generate", str(e))
-        failures_total.labels(task='sim.generate', reason=type(e).__name__).inc()
-        audit("dlq.push", job_id=job_id, task="sim.generate", reason=str(e))
+        fail_sim(job_id, "sim.generate", e)
         if getattr(self.request, "retries", 0) < getattr(self.request, "max_retries", 0):
             retried_total.labels(task='sim.generate').inc()
         raise
 
 
+def dispatch_slabs(job_id: int, bounds: Dict, res_mm: float, partitions: int) -> dict:
+    """Voksel alanını X dilimlerine bölüp her dilim için bir sim.carve_slab alt görevi başlatır;
+    chord geri çağrısı (sim.merge_slabs) dilimleri birleştirip ağı üretir.
+    """
+    spec = GridSpec.from_bounds(bounds, res_mm)
+    slabs = plan_slabs(spec.shape[0], partitions)
+    header = group(sim_carve_slab.s(job_id, i, x0, x1) for i, (x0, x1) in enumerate(slabs))
+    callback = sim_merge_slabs.s(job_id).on_error(sim_slabs_failed.s(job_id=job_id))
+    result = chord(header)(callback)
+    with db_session() as s:
+        job = s.get(Job, job_id)
+        job.metrics = {**(job.metrics or {}), "partitions": len(slabs), "merge_task_id": result.id}
+        s.commit()
+    audit("sim.distributed", job_id=job_id, partitions=len(slabs))
+    return {"ok": True, "partitions": len(slabs)}
+
+
+@celery_app.task(
+    bind=True,
+    name="sim.carve_slab",
+    queue="sim",
+    acks_late=True,
+    autoretry_for=(Exception,),
+    retry_backoff=True,
+    retry_jitter=True,
+    retry_kwargs={"max_retries": 3},
+    soft_time_limit=appset.task_soft_limits.get("sim", 1140),
+    time_limit=appset.task_time_limits.get("sim", 1200),
+)
+def sim_carve_slab(self, job_id: int, index: int, x0: int, x1: int) -> dict:
+    """Tek bir X diliminin kolon tabanını hesaplar ve sıkıştırılmış artefakt olarak yükler."""
+    params = job_params(job_id)
+    res_mm = float(params.get("resolution_mm", 0.8))
+    bounds = job_bounds(job_id)
+    moves = parse_moves(load_gcode(params.get("gcode_job_id")))
+    tracer = trace.get_tracer(__name__)
+    sim_stage(job_id, "carve", f"dilim {index}")
+    with tracer.start_as_current_span("sim.carve_slab") as span:
+        try:
+            floor = carve_slab_floor(
+                moves,
+                bounds,
+                res_mm,
+                tool_kernels(params, res_mm)[0],
+                (x0, x1),
+                workers=appset.sim_carve_workers,
+                token=sim_token(job_id),
+            )
+        except SimInterrupted:
+            # Chord geri çağrısı tetiklenmez; iş durumu cancel_job tarafından yazıldı
+            close_cancelled(job_id, "sim.carve_slab")
+            raise Ignore()
+        span.set_attribute("job_id", job_id)
+        span.set_attribute("slab", index)
+    path = Path(f"/tmp/sim/sim-{job_id}-slab-{index}.npz")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    art = upload_and_sign(save_slab(path, (x0, x1), floor), "sim-slab")
+    path.unlink(missing_ok=True)
+    return {
+        "index": index,
+        "x0": x0,
+        "x1": x1,
+        "s3_key": art["s3_key"],
+        "size": art["size"],
+        "moves": int(len(moves)),
+    }
+
+
+@celery_app.task(
+    bind=True,
+    name="sim.merge_slabs",
+    queue="sim",
+    acks_late=True,
+    autoretry_for=(Exception,),
+    retry_backoff=True,
+    retry_jitter=True,
+    retry_kwargs={"max_retries": 3},
+    soft_time_limit=appset.task_soft_limits.get("sim", 1140),
+    time_limit=appset.task_time_limits.get("sim", 1200),
+)
+def sim_merge_slabs(self, results: list, job_id: int) -> dict:
+    """Chord geri çağrısı: dilim tabanlarını birleştirir, stoktan çıkarır ve ağı üretir."""
+    try:
+        params = job_params(job_id)
+        res_mm = float(params.get("resolution_mm", 0.8))
+        method = params.get("method") or "voxel"
+        bounds = job_bounds(job_id)
+        spec = GridSpec.from_bounds(bounds, res_mm)
+        floor = stitch_floors(spec, (load_slab(download_bytes(r["s3_key"])) for r in results))
+        chunks, carve_metrics = floor_result(
+            method, floor, spec, params.get("storage"), sim_token(job_id)
+        )
+        with db_session() as s:
+            job = s.get(Job, job_id)
+            started = job.started_at if job else None
+            params_cache_key = (job.metrics or {}).get("cache_key") if job else None
+        elapsed_ms = int((datetime.utcnow() - started).total_seconds() * 1000) if started else None
+        finish_sim(
+            job_id,
+            "sim.merge_slabs",
+            chunks,
+            {
+                "voxel_resolution_mm": res_mm,
+                "method": method,
+                "bounds": bounds,
+                "grid_shape": list(spec.shape),
+                **carve_metrics,
+                "moves": max((int(r.get("moves", 0)) for r in results), default=0),
+                "slab_bytes": sum(int(r.get("size", 0)) for r in results),
+                "elapsed_ms": elapsed_ms,
+            },
+            params_cache_key,
+        )
+        return {"ok": True, "partitions": len(results)}
+    except SimInterrupted:
+        return close_cancelled(job_id, "sim.merge_slabs")
+    except Exception as e:
+        if getattr(self.request, "retries", 0) >= getattr(self.request, "max_retries", 0):
+            fail_sim(job_id, "sim.merge_slabs", e)
+        else:
+            retried_total.labels(task="sim.merge_slabs").inc()
+        raise
+
+
+@celery_app.task(name="sim.slabs_failed", queue="sim")
+def sim_slabs_failed(*args, job_id: int, **kwargs) -> None:
+    """Chord hata geri çağrısı: bir dilim kalıcı olarak başarısız olursa işi kapatır."""
+    exc = next((a for a in args if isinstance(a, BaseException)), None)
+    fail_sim(job_id, "sim.carve_slab", exc or RuntimeError("Sim dilimi başarısız"))
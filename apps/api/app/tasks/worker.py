@@ -5,7 +5,6 @@ from celery import Celery
 from ..config import settings
 from ..settings import app_settings as appset
 
-
 celery_app = Celery(
     "freecad_tasks",
     broker=settings.redis_url,
@@ -59,9 +58,19 @@ celery_app.conf.task_routes = {
 celery_app.conf.broker_connection_retry_on_startup = True
 
 
+# FreeCAD yetenekleri işçi açılışında bir kez yoklanır ve Redis'e yayınlanır
+from celery.signals import worker_ready  # noqa: E402
+
+from ..freecad.capabilities import on_worker_ready  # noqa: E402
+
+worker_ready.connect(on_worker_ready, weak=False)
+
+# İş durumu değişikliklerini olay akışına yayınlayan oturum
+# dinleyicilerini işçi süreçlerinde de kaydet
+from ..services import job_events  # noqa: E402,F401
+
 # API prosesi içinde shared_task çağrılarının doğru broker'a publish edebilmesi için
 try:  # pragma: no cover
     celery_app.set_default()
 except Exception:
     pass
-
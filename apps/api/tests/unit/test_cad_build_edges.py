@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from app.freecad.cad_build import corner_edges, overlapping_holes, top_edges
+
+
+def _line(p0, p1):
+    return {
+        "kind": "line",
+        "points": [p0, p1],
+        "radius": 0.0,
+        "closed": False,
+        "zmin": min(p0[2], p1[2]),
+        "zmax": max(p0[2], p1[2]),
+    }
+
+
+def _circle(x, y, z, r):
+    return {
+        "kind": "circle",
+        "points": [(x + r, y, z)],
+        "radius": r,
+        "closed": True,
+        "zmin": z,
+        "zmax": z,
+    }
+
+
+def _arc(p0, p1, r):
+    return {
+        "kind": "circle",
+        "points": [p0, p1],
+        "radius": r,
+        "closed": False,
+        "zmin": p0[2],
+        "zmax": p0[2],
+    }
+
+
+# 90×60×8 plaka: üst çevre, dikey köşeler, bir dikey iç kenar ve iki delik ağzı
+EDGES = [
+    _line((0, 0, 8), (90, 0, 8)),
+    _line((0, 0, 0), (0, 0, 8)),
+    _line((90, 60, 0), (90, 60, 8)),
+    _line((45, 0, 0), (45, 0, 8)),
+    _circle(20, 20, 8, 2.5),
+    _circle(40, 20, 8, 0.4),
+    _circle(20, 20, 0, 2.5),
+    _line((0, 0, 0), (90, 0, 0)),
+]
+
+
+def test_chamfer_selects_top_edges_only():
+    assert top_edges(EDGES, 8.0, min_radius=0.5) == [1, 5]
+
+
+def test_chamfer_keeps_fillet_arcs_smaller_than_chamfer():
+    # Yuvarlatılmış köşe (r=0.3) pah boyundan (0.5) küçük olsa da dış konturun parçasıdır
+    edges = EDGES + [_arc((89.7, 60, 8), (90, 59.7, 8), 0.3)]
+    assert top_edges(edges, 8.0, min_radius=0.5) == [1, 5, 9]
+
+
+def test_fillet_selects_vertical_corner_edges():
+    assert corner_edges(EDGES, 90.0, 60.0) == [2, 3]
+
+
+def test_overlap_detection_scales_to_many_holes():
+    grid = [(i * 10.0, j * 10.0, 5.0) for i in range(30) for j in range(30)]
+    assert not overlapping_holes(grid)
+    assert overlapping_holes(grid + [(104.0, 100.0, 5.0)])
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from app.freecad.cad_build import parse_plan_to_params
+from app.services.cad_cache import cad_cache_key
+
+PLAN = {
+    "cad": {
+        "size": {"x": 90, "y": 60, "z": 8},
+        "holes": [{"x": 10, "y": 10, "d": 5}],
+        "chamfer_mm": 0.5,
+    }
+}
+
+
+def test_unrelated_plan_fields_do_not_change_key():
+    edited = {**PLAN, "answers": {"malzeme": "6061"}, "notes": "müşteri notu", "material": "AL"}
+    floats = {
+        "cad": {
+            "size": {"x": 90.0, "y": 60.0, "z": 8.0},
+            "holes": [{"x": 10.0, "y": 10.0, "d": 5.0}],
+            "chamfer_mm": 0.5,
+        }
+    }
+    base = cad_cache_key(parse_plan_to_params(PLAN), "FreeCAD 0.21.2")
+    assert cad_cache_key(parse_plan_to_params(edited), "FreeCAD 0.21.2") == base
+    assert cad_cache_key(parse_plan_to_params(floats), "FreeCAD 0.21.2") == base
+
+
+def test_key_changes_with_geometry_and_freecad_version():
+    base = cad_cache_key(parse_plan_to_params(PLAN), "FreeCAD 0.21.2")
+    assert cad_cache_key(parse_plan_to_params(PLAN), "FreeCAD 1.0.0") != base
+    moved = {"cad": {**PLAN["cad"], "holes": [{"x": 11, "y": 10, "d": 5}]}}
+    assert cad_cache_key(parse_plan_to_params(moved), "FreeCAD 0.21.2") != base
+    no_chamfer = {"cad": {**PLAN["cad"], "chamfer_mm": None}}
+    assert cad_cache_key(parse_plan_to_params(no_chamfer), "FreeCAD 0.21.2") != base
+
+
+def _fake_build(ok):
+    def build(params, d):
+        paths = {}
+        for kind, body in (("fcstd", b"doc"), ("step", b"solid")):
+            path = f"{d}/model.{kind}"
+            with open(path, "wb") as f:
+                f.write(body + (b"" if ok else b"-bad"))
+            paths[kind] = path
+        return paths, {"ok": ok}
+
+    return build
+
+
+def test_upload_names_are_content_addressed_and_failed_builds_are_private(monkeypatch):
+    from app.tasks import cad as cad_tasks
+
+    names = []
+
+    def fake_upload(path, artefact_type):
+        names.append(path.name)
+        return {"s3_key": f"artefacts/{path.name}", "size": path.stat().st_size, "sha256": "x"}
+
+    monkeypatch.setattr(cad_tasks, "upload_and_sign", fake_upload)
+    key = "ab" * 32
+    monkeypatch.setattr(cad_tasks, "build_from_params", _fake_build(True))
+    cad_tasks._build_and_upload(None, key, 7)
+    monkeypatch.setattr(cad_tasks, "build_from_params", _fake_build(False))
+    cad_tasks._build_and_upload(None, key, 7)
+
+    ok, failed = names[:2], names[2:]
+    assert all(n.startswith(f"cad-{key[:16]}-") for n in ok)
+    assert all(n.startswith("cad-failed-p7-") for n in failed)
+    # Farklı içerik farklı S3 anahtarına gider
+    assert len(set(n.split(".")[0] for n in ok)) == 2
+
+
+def test_freecad_version_comes_from_in_process_module(monkeypatch):
+    import sys
+    import types
+
+    from app.freecad.cad_build import freecad_version
+
+    monkeypatch.delitem(sys.modules, "FreeCAD", raising=False)
+    monkeypatch.setattr("builtins.__import__", _no_freecad(__import__))
+    assert freecad_version() == "unknown"
+    monkeypatch.undo()
+    fake = types.SimpleNamespace(Version=lambda: ["0", "21", "2", "33772 (Git)", "https://..."])
+    monkeypatch.setitem(sys.modules, "FreeCAD", fake)
+    assert freecad_version() == "0.21.2"
+
+
+def _no_freecad(real_import):
+    def imp(name, *a, **kw):
+        if name == "FreeCAD":
+            raise ImportError(name)
+        return real_import(name, *a, **kw)
+
+    return imp
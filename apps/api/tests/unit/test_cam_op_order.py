@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from app.cam.op_order import PRECEDENCE, controller_key, order_ops
+
+
+def _respects_precedence(types, order):
+    pos = {i: n for n, i in enumerate(order)}
+    for i, a in enumerate(types):
+        for j, b in enumerate(types):
+            if (a, b) in PRECEDENCE and pos[i] > pos[j]:
+                return False
+            # Aynı türdeki (delme dışı) op'lar plan sırasını korur
+            if a == b != "drill" and i < j and pos[i] > pos[j]:
+                return False
+    return True
+
+
+def test_op_order_shares_tools_and_respects_precedence():
+    types = ["face", "contour", "drill", "drill", "chamfer", "drill"]
+    keys = ["em6", "em6", "dr5", "dr8", "ch6", "dr5"]
+    plan = order_ops(types, keys)
+    seq = [types[i] for i in plan.order]
+    assert seq[0] == "face" and seq[-1] == "chamfer"
+    assert [keys[i] for i in plan.order] == ["em6", "em6", "dr5", "dr5", "dr8", "ch6"]
+    assert plan.tool_changes_before == 6 and plan.tool_changes_after == 4 and plan.saved == 2
+
+
+def test_op_order_moves_chamfer_after_later_drill():
+    plan = order_ops(["chamfer", "drill"], ["ch6", "dr5"])
+    assert plan.order == [1, 0]
+
+
+def test_controller_key_ignores_float_noise_in_feeds():
+    op = {"tool": {"type": "endmill_flat", "dia": 6}}
+    base = controller_key(op, {"rpm": 12000, "feed": 600, "plunge": 200})
+    noisy = controller_key(
+        {"tool": {"type": "endmill_flat", "dia": 6.0000000001}},
+        {"rpm": 11999.9999999, "feed": 600.0000001, "plunge": 199.99999999},
+    )
+    assert noisy == base
+    assert controller_key(op, {"rpm": 12000, "feed": 650, "plunge": 200}) != base
+    # Gürültü farkı olan op'lar tek denetleyiciyi paylaşır: araya takım değişimi girmez
+    plan = order_ops(["contour", "contour"], [base, noisy])
+    assert plan.tool_changes_after == 1 and plan.as_dict()["tool_changes_saved"] == 1
+
+
+def test_precedence_holds_when_contours_share_a_tool():
+    types = ["contour", "face", "contour", "chamfer", "drill", "contour"]
+    keys = ["em6", "em10", "em6", "ch6", "dr5", "em6"]
+    plan = order_ops(types, keys)
+    assert _respects_precedence(types, plan.order)
+    assert [types[i] for i in plan.order] == [
+        "face",
+        "contour",
+        "contour",
+        "contour",
+        "drill",
+        "chamfer",
+    ]
+    assert [i for i in plan.order if types[i] == "contour"] == [0, 2, 5]
+    assert plan.tool_changes_after == 4 and plan.saved == 2
+
+    # Alın da aynı takımı kullanıyorsa öne alınır, konturlar arkasından takım değiştirmeden gelir
+    types = ["contour", "contour", "chamfer", "face"]
+    plan = order_ops(types, ["em6", "em6", "ch6", "em6"])
+    assert plan.order == [3, 0, 1, 2] and plan.tool_changes_after == 2
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import numpy as np
+
+from app.cam.cam_plan import derive_cam_params
+from app.cam.sequencing import (
+    apply_actual_path,
+    cycle_locations,
+    path_length,
+    same_order,
+    sequence_holes,
+)
+
+
+def _grid_holes(n=15, pitch=10.0, seed=0):
+    rng = np.random.default_rng(seed)
+    pts = [(i * pitch, j * pitch) for i in range(n) for j in range(n)]
+    rng.shuffle(pts)
+    return [{"x": x, "y": y, "d": 5.0} for x, y in pts]
+
+
+def test_grid_order_is_near_optimal_and_reported():
+    holes = _grid_holes()
+    seq = sequence_holes(holes, budget_ms=5000)
+    ordered = seq.groups[0]["holes"]
+    assert sorted((h["x"], h["y"]) for h in ordered) == sorted((h["x"], h["y"]) for h in holes)
+    xy = np.array([[h["x"], h["y"]] for h in ordered])
+    # En kısa açık yol 224 adım × 10 mm; sezgisel en fazla %10 uzun olmalı
+    assert path_length(xy) <= 1.1 * 2240
+    assert seq.stats["rapid_mm_after"] < 0.2 * seq.stats["rapid_mm_before"]
+    assert seq.stats["holes"] == 225
+
+
+def test_groups_by_tool_in_first_seen_order():
+    holes = [
+        {"x": 0, "y": 50, "d": 8},
+        {"x": 10, "y": 0, "d": 5},
+        {"x": 0, "y": 0, "d": 8},
+        {"x": 20, "y": 0, "d": 5},
+    ]
+    seq = sequence_holes(holes)
+    assert [g["tool"] for g in seq.groups] == [8.0, 5.0]
+    assert [(h["x"], h["y"]) for h in seq.groups[0]["holes"]] == [(0, 0), (0, 50)]
+    assert seq.stats["tool_changes_before"] == 4 and seq.stats["tool_changes_after"] == 2
+
+
+def test_cam_plan_emits_one_drill_op_per_tool():
+    plan = {"cad": {"size": {"z": 8}, "holes": _grid_holes(n=4) + [{"x": 1, "y": 1, "d": 3.0}]}}
+    cam = derive_cam_params(plan)
+    drills = [op for op in cam["ops"] if op["type"] == "drill"]
+    assert [op["tool"]["dia"] for op in drills] == [5.0, 3.0]
+    assert len(drills[0]["params"]["locations"]) == 16
+    assert cam["drill_sequence"]["holes"] == 17
+
+
+def test_cycle_locations_follow_generated_path_and_detect_resort():
+    cmds = [
+        ("G0", {"X": 0.0, "Y": 0.0, "Z": 5.0}),
+        ("G81", {"X": 10.0, "Y": 0.0, "Z": -3.0, "R": 1.0}),
+        ("G81", {"Y": 20.0, "Z": -3.0, "R": 1.0}),
+        ("G80", {}),
+        ("G0", {"Z": 5.0}),
+    ]
+    xy = cycle_locations(cmds)
+    assert xy.tolist() == [[10.0, 0.0], [10.0, 20.0]]
+    assert same_order(xy, [[10, 0], [10, 20]])
+    assert not same_order(xy, [[10, 20], [10, 0]])
+    assert not same_order(xy, [[10, 0]])
+
+
+def test_savings_are_reported_from_actual_path():
+    holes = _grid_holes(n=5)
+    seq = sequence_holes(holes)
+    # FreeCAD kendi sırasına dizdiyse (ör. plan sırası) kazanç kalmaz
+    actual = np.array([[h["x"], h["y"]] for h in holes])
+    stats = apply_actual_path(seq.stats, actual)
+    assert stats["planned_rapid_mm_after"] == seq.stats["rapid_mm_after"]
+    assert stats["rapid_mm_after"] == stats["rapid_mm_before"] and stats["reduction_pct"] == 0.0
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import math
+
+import pytest
+
+from app.cam.cycle_time import MachineLimits, estimate_cycle_time
+from app.gcode.tokenizer import parse_moves
+
+TEXT = (
+    "G21 G90\n"
+    "(Begin operation: Face)\n"
+    "T1 M6\n"
+    "G0 X0 Y0 Z5\n"
+    "G1 Z0 F600\n"
+    "G1 X100\n"
+    "G2 X100 Y20 I0 J10\n"
+    "(Begin operation: Drill)\n"
+    "T2 M6\n"
+    "G0 X10 Y10\n"
+    "G1 Z-5 F120\n"
+)
+MACHINE = MachineLimits(rapid_mm_min=6000.0, tool_change_s=5.0)
+
+
+def test_feed_rapid_arc_and_tool_changes():
+    r = estimate_cycle_time(parse_moves(TEXT), MACHINE, text=TEXT)
+    face = (5 + 100 + 10 * math.pi) / 10.0  # 600 mm/dk = 10 mm/s
+    drill = math.hypot(90, 10) / 100.0 + 5 / 2.0
+    assert r.total_s == pytest.approx(face + drill + 10.0, abs=1e-3)
+    assert r.tool_changes == 2
+    assert [o["name"] for o in r.ops] == ["Face", "Drill"]
+    assert r.ops[0]["seconds"] == pytest.approx(face + 5.0, abs=0.01)
+    assert r.ops[1]["tool"] == 2
+
+
+def test_ops_fall_back_to_tool_changes():
+    r = estimate_cycle_time(parse_moves(TEXT), MACHINE)
+    assert [o["name"] for o in r.ops] == ["T1", "T2"]
+
+
+def test_trapezoid_acceleration():
+    text = "G21 G90\nG0 X0 Y0 Z0\nG1 X100 F6000\nG1 X100.5\n"
+    machine = MachineLimits(rapid_mm_min=6000.0, tool_change_s=0.0, accel_mm_s2={"x": 1000.0})
+    r = estimate_cycle_time(parse_moves(text), machine)
+    # 100 mm: hedef hıza ulaşır (t = L/v + v/a); 0.5 mm: üçgen profil (t = 2·sqrt(L/a))
+    assert r.feed_s == pytest.approx(100 / 100 + 100 / 1000 + 2 * math.sqrt(0.5 / 1000), rel=1e-6)
+
+
+def test_cam_job_estimate_is_unknown_not_zero_when_an_op_fails():
+    from types import SimpleNamespace
+
+    from app.freecad.path_build import _ops_seconds, _total_seconds
+
+    def op(label, *gcode):
+        return SimpleNamespace(
+            Label=label,
+            Path=SimpleNamespace(Commands=[SimpleNamespace(toGCode=lambda g=g: g) for g in gcode]),
+        )
+
+    machine = MachineLimits(rapid_mm_min=6000.0, tool_change_s=10.0)
+    # FreeCAD Path ilerlemesi mm/s: F10 -> 600 mm/dk, 100 mm -> 10 s
+    good = op("Profile", "G0 X0 Y0 Z0", "G1 X100 F10")
+    bad = SimpleNamespace(Label="Broken")
+    assert _ops_seconds([good], machine) == 10.0
+    assert _ops_seconds([good, bad], machine) is None
+    ops = [{"est_seconds": 10.0}, {"est_seconds": 5.0}]
+    assert _total_seconds(ops, 10.0) == 25.0
+    assert _total_seconds(ops + [{"est_seconds": None}], 10.0) is None
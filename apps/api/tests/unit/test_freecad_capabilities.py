@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import os
+import stat
+import sys
+import time
+
+import pytest
+
+from app.freecad import capabilities as caps_mod
+
+
+@pytest.fixture
+def fake_freecad(tmp_path, monkeypatch):
+    (tmp_path / "FreeCAD.py").write_text("def Version():\n    return ['0', '21', '2', 'rev']\n")
+    (tmp_path / "Part.py").write_text("")
+    scripts = tmp_path / "Path" / "Post" / "scripts"
+    scripts.mkdir(parents=True)
+    (tmp_path / "Path" / "__init__.py").write_text("")
+    (tmp_path / "Path" / "Post" / "__init__.py").write_text("def export(*a):\n    pass\n")
+    (scripts / "__init__.py").write_text("")
+    for name in ("grbl", "fanuc"):
+        (scripts / f"{name}_post.py").write_text("")
+    exe = tmp_path / "FreeCADCmd"
+    exe.write_text(f'#!/bin/sh\nexec {sys.executable} "$@"\n')
+    exe.chmod(exe.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PYTHONPATH", str(tmp_path))
+    return str(exe)
+
+
+@pytest.mark.skipif(os.name == "nt", reason="posix kabuk betiği")
+def test_probe_reports_workbenches_posts_and_api(fake_freecad):
+    c = caps_mod.probe(fake_freecad)
+    assert c.found and c.version == "FreeCAD 0.21.2"
+    assert c.workbenches == {"Part": True, "Sketcher": False, "Path": True, "Asm4": False}
+    assert c.asm4_available is False and c.path_api == "Path.Post"
+    assert c.posts == ["fanuc", "grbl"]
+    assert c.missing("Path", "Asm4") == ["Asm4"]
+
+
+def test_registry_probes_once_and_require_checks_workbenches(monkeypatch):
+    calls = []
+
+    def fake_probe(path):
+        calls.append(path)
+        return caps_mod.Capabilities(
+            found=True, node="n1", path=path, workbenches={"Path": False}, probed_at=time.time()
+        )
+
+    monkeypatch.setattr(caps_mod, "probe", fake_probe)
+    monkeypatch.setattr(caps_mod, "publish", lambda c: None)
+    monkeypatch.setattr(caps_mod, "_published", lambda node: None)
+    monkeypatch.setattr(caps_mod, "_cached", None)
+    monkeypatch.setattr("app.freecad.service.find_freecadcmd_path", lambda: "/opt/FreeCADCmd")
+
+    assert caps_mod.get_capabilities().path == "/opt/FreeCADCmd"
+    caps_mod.get_capabilities()
+    assert len(calls) == 1
+    caps_mod.get_capabilities(refresh=True)
+    assert len(calls) == 2
+    with pytest.raises(caps_mod.FreeCADUnavailable, match="Path"):
+        caps_mod.require("Path")
+
+
+def test_missing_freecad_is_not_autoretried():
+    from app.tasks.cam import cam_generate
+    from app.tasks.cam_build import cam_build_task
+
+    for task in (cam_generate, cam_build_task):
+        assert caps_mod.FreeCADUnavailable in tuple(task.dont_autoretry_for)
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import sys
+import types
+
+import pytest
+
+from app.freecad.generate import build_freecad_python, parse_run_metrics
+
+
+class _Shape:
+    def __init__(self, volume):
+        self.Solids = [types.SimpleNamespace(Volume=volume)] if volume else []
+
+    def isNull(self):
+        return False
+
+    def isValid(self):
+        return True
+
+
+def _fake_app(volumes, saved):
+    doc = types.SimpleNamespace(Objects=[types.SimpleNamespace(Shape=_Shape(v)) for v in volumes])
+    doc.recompute = lambda: None
+    doc.saveAs = saved.append
+    app = types.ModuleType("App")
+    app.newDocument = lambda name: doc
+    app.ActiveDocument = doc
+    return app
+
+
+def _install(monkeypatch, volumes):
+    saved = []
+    monkeypatch.setitem(sys.modules, "App", _fake_app(volumes, saved))
+    monkeypatch.setitem(sys.modules, "Part", types.ModuleType("Part"))
+    monkeypatch.setenv("OUT_FCSTD", "/tmp/x.fcstd")
+    return saved
+
+
+def test_validates_in_memory_before_saving(monkeypatch, capsys):
+    saved = _install(monkeypatch, [10.0, 20.5, 0, 0, 1.0])
+    with pytest.raises(SystemExit):
+        exec(build_freecad_python("pass"), {"__name__": "__main__"})
+    m = parse_run_metrics(capsys.readouterr().out)
+    assert saved == ["/tmp/x.fcstd"]
+    assert m["obj_count"] == 5 and m["solids"] == 3 and m["volume_mm3"] == 31.5
+    assert "script_ms" in m
+
+
+def test_invalid_document_is_not_saved(monkeypatch):
+    saved = _install(monkeypatch, [0] * 6)
+    with pytest.raises(RuntimeError, match="katı"):
+        exec(build_freecad_python("pass"), {"__name__": "__main__"})
+    assert saved == []
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import os
+import stat
+import sys
+
+import pytest
+
+from app.freecad.pool import FreeCADPool, FreeCADWorker
+
+
+@pytest.fixture
+def fake_freecadcmd(tmp_path, monkeypatch):
+    # FreeCADCmd yerine betiği çalıştıran python; belge API'si için en küçük FreeCAD modülü
+    (tmp_path / "FreeCAD.py").write_text(
+        "def listDocuments():\n    return {}\n\ndef closeDocument(name):\n    pass\n"
+    )
+    exe = tmp_path / "FreeCADCmd"
+    exe.write_text(f'#!/bin/sh\nexec {sys.executable} "$@"\n')
+    exe.chmod(exe.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PYTHONPATH", str(tmp_path))
+    return str(exe)
+
+
+PID = "import os, sys\nprint('PID=' + str(os.getpid()))\n"
+
+
+@pytest.mark.skipif(os.name == "nt", reason="posix kabuk betiği")
+def test_scripts_share_a_warm_interpreter(fake_freecadcmd):
+    pool = FreeCADPool(fake_freecadcmd, size=1, max_jobs=10)
+    try:
+        a = pool.run(
+            PID + "print(os.environ['OUT_FCSTD'])\nsys.exit(0)\n",
+            {"OUT_FCSTD": "/tmp/a.fcstd"},
+            timeout=30,
+        )
+        b = pool.run(
+            PID + "assert 'OUT_FCSTD' not in os.environ\nraise RuntimeError('boom')\n", timeout=30
+        )
+        assert a.returncode == 0 and "/tmp/a.fcstd" in a.stdout
+        assert b.returncode == 1 and "boom" in b.stderr
+        assert a.stdout.splitlines()[0] == b.stdout.splitlines()[0]  # aynı süreç
+    finally:
+        pool.close()
+
+
+@pytest.mark.skipif(os.name == "nt", reason="posix kabuk betiği")
+def test_timeout_and_max_jobs_recycle_worker(fake_freecadcmd, tmp_path):
+    pool = FreeCADPool(fake_freecadcmd, size=1, max_jobs=1)
+    pid_file = tmp_path / "job.pid"
+    try:
+        slow = pool.run("import time\ntime.sleep(30)\n", timeout=0.5, pid_file=str(pid_file))
+        assert slow.timed_out and slow.returncode == -9
+        assert not pid_file.exists() and pool.started == 0
+        a = pool.run(PID, timeout=30)
+        b = pool.run(PID, timeout=30)
+        assert a.returncode == 0 and b.returncode == 0
+        assert a.stdout != b.stdout  # max_jobs=1: her betikten sonra yeni çalışan
+    finally:
+        pool.close()
+
+
+@pytest.mark.skipif(os.name == "nt", reason="posix kabuk betiği")
+def test_worker_close_releases_process_and_files(fake_freecadcmd):
+    w = FreeCADWorker(fake_freecadcmd)
+    w.close()
+    assert not w.alive and w.stderr_file.closed and not os.path.exists(w.host_path)
+
+
+def test_generated_scripts_bypass_the_warm_pool(monkeypatch, tmp_path):
+    from app.freecad import generate
+    from app.freecad.subprocess_runner import RunResult
+
+    calls = []
+
+    def fake_oneshot(*args, **kwargs):
+        calls.append(args)
+        return RunResult(0, "", "", 1, False)
+
+    monkeypatch.setattr(generate, "run_oneshot", fake_oneshot)
+    generate.run_freecad_cmd("FreeCADCmd", "print(1)", tmp_path / "out.fcstd", 10)
+    assert len(calls) == 1
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+from app.gcode.tokenizer import ARC_CCW, ARC_CW, parse_moves
+from app.post.compact import compact_gcode
+
+
+def _circle_text(r=20.0, n=180, tol_digits=3):
+    lines = ["G21 G90", "G0 X%.3f Y0 Z5" % r, "G1 Z-1 F300"]
+    for k in range(1, n + 1):
+        a = 2 * math.pi * k / n
+        lines.append(
+            "G1 X%.*f Y%.*f F300" % (tol_digits, r * math.cos(a), tol_digits, r * math.sin(a))
+        )
+    lines.append("G0 Z5")
+    return "\n".join(lines) + "\n"
+
+
+def test_modal_words_and_unchanged_coords_are_dropped():
+    text = "G21 G90\nG0 X0 Y0 Z5\nG1 Z-1 F300\nG1 X10 Y0 Z-1 F300\nG1 X10 Y0\nG0 Z5\n"
+    out, st = compact_gcode(text, fit_arcs=False)
+    assert out == "G21 G90\nG0 X0 Y0 Z5\nG1 Z-1 F300\nX10\nG0 Z5\n"
+    assert st.lines_in - st.lines_out == 1 and st.words_dropped == 7
+    assert st.bytes_out < st.bytes_in
+
+
+def test_polygonal_circle_becomes_arcs_within_tolerance():
+    text = _circle_text()
+    out, st = compact_gcode(text, arc_tol_mm=0.01)
+    assert st.arcs_fitted >= 1 and st.lines_out < 12
+    moves = parse_moves(out)
+    assert ((moves["type"] == ARC_CCW) | (moves["type"] == ARC_CW)).any()
+    # Uç nokta korunur; tüm yay uç noktaları çember üzerinde kalır
+    arcs = moves[(moves["type"] == ARC_CCW)]
+    assert np.allclose(np.hypot(arcs["x"], arcs["y"]), 20.0, atol=0.01)
+    assert "G0 Z5" in out.splitlines()[-1]
+
+
+def test_collinear_run_merges_into_one_g1():
+    text = "G21 G90\nG0 X0 Y0 Z0\nG1 X1 F100\nG1 X2\nG1 X3\nG1 X4\nG1 X4 Y5\n"
+    out, st = compact_gcode(text)
+    assert out.splitlines()[2:] == ["G1 X4 F100", "Y5"]
+    assert st.segments_merged == 4
+
+
+def test_unknown_and_commented_lines_pass_through_and_reset_state():
+    text = "G21 G90\nG0 X0 Y0 Z5\nG81 X10 Y10 Z-3 R1 F100\nG80\n(keep me)\nG0 X0 Y0 Z5\nN10 G1 X5\n"
+    out, _ = compact_gcode(text)
+    # G81 sonrası konum bilinmez: G0 satırı olduğu gibi yazılır
+    assert out == text
+
+
+def test_tool_change_forgets_position():
+    text = "G21 G90\nG0 X0 Y0 Z5\nG1 Z-1 F300\nG0 Z5\nM5\nM6 T2\nG0 Z5\nG1 Z-1 F300\n"
+    out, _ = compact_gcode(text)
+    # Takım değişimi eksenleri oynatabilir; sonrasındaki güvenli yükseklik ve ilerleme korunur
+    assert out.splitlines()[-3:] == ["M6 T2", "G0 Z5", "G1 Z-1 F300"]
+
+
+def test_non_linuxcnc_header_passes_through_and_resets_state():
+    header = "%\nO0001\n(grbl post)\nG17 G21 G90 G54\nT1 M6\nS12000 M3\nG0 X0 Y0\nG0 Z5\n"
+    out, _ = compact_gcode(header + "G1 Z-1 F200\nG1 X10 F200\n%\n")
+    lines = out.splitlines()
+    # Spindle satırına kadar her şey olduğu gibi geçer; durum ancak sonrasında yeniden öğrenilir
+    assert lines[:7] == header.splitlines()[:7]
+    assert lines[7:] == ["Z5", "G1 Z-1 F200", "X10", "%"]
+
+
+def test_implicit_motion_follows_input_program_after_g1_run():
+    text = "G0 X0 Y0 Z0\nG2 X2 Y0 I1 J0 F100\nG1 X3 Y0\nX4 Y0 Z-1\nG2 X6 Y0 I1 J0\n"
+    out, _ = compact_gcode(text)
+    # 'X4 Y0 Z-1' girdide G1'dir; son yay G2 kipiyle yazılmalı (G1 altında düz çizgi olurdu)
+    assert out == "G0 X0 Y0 Z0\nG2 X2 Y0 I1 J0 F100\nG1 X3\nX4 Z-1\nG2 X6 Y0 I1 J0\n"
+    moves = parse_moves(out)
+    assert list(moves["type"][-3:]) == list(parse_moves(text)["type"][-3:])
+
+
+def test_rapid_after_g1_run_keeps_g0():
+    out, _ = compact_gcode("G0 X0 Y0 Z0\nG1 X1 Y0 F100\nX2 Y0 Z-1\nG0 Z5\n")
+    # Geri çekme ilerleme hızında yapılmamalı
+    assert out.splitlines()[-1] == "G0 Z5"
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import io
+
+import numpy as np
+
+from app.gcode.tokenizer import (
+    ARC_CW,
+    LINEAR,
+    RAPID,
+    TOOL_CHANGE,
+    ModalState,
+    iter_blocks,
+    parse_moves,
+)
+
+NC = """%
+( JOB: test )
+G21 G90
+T3 M6
+G0 X0 Y0 Z5
+G1 Z-1 F200
+X10 Y5 ; modal G1
+G91 G1 X2
+G90 G2 X20 Y5 I5 J0
+G20
+G1 X1
+M30
+"""
+
+
+def test_parse_moves_modal_state_and_units():
+    t = parse_moves(NC)
+    assert list(t["type"]) == [TOOL_CHANGE, RAPID, LINEAR, LINEAR, LINEAR, ARC_CW, LINEAR]
+    assert t["tool"][-1] == 3
+    assert t["f"][3] == 200.0  # modal F
+    assert t["x"][4] == 12.0  # G91 artımsal
+    assert (t["i"][5], t["j"][5]) == (5.0, 0.0)
+    assert t["x"][6] == 25.4 and t["f"][6] == 200.0  # G20 sonrası koordinatlar mm'ye çevrilir
+    assert t["line_no"][1] == 5
+
+
+def test_vectorized_and_streaming_paths_match_reference():
+    ref = [b for b in iter_blocks(NC, ModalState()) if b.kind is not None]
+    for t in (parse_moves(NC), parse_moves(io.StringIO(NC)), parse_moves(NC, chunk_chars=8)):
+        mv = t[t["type"] != TOOL_CHANGE]
+        assert len(mv) == len(ref)
+        assert np.allclose(mv["x"], [b.end[0] for b in ref], equal_nan=True)
+        assert list(mv["line_no"]) == [b.line_no for b in ref]
+
+
+def test_macro_programs_fall_back_to_reference_parser():
+    t = parse_moves("G1 X#1 F100\nG1 X2 Y[1+1]\n")
+    assert len(t) == 1 and t["x"][0] == 2.0 and t["line_no"][0] == 2
+
+
+def test_arc_words_and_plane_are_modal_and_scaled():
+    nc = "G21\nG18 G2 X10 Z0 K5\nG3 X0 R-5\nG17 G20\nG2 X1 Y1 R0.5\n"
+    # "#" içeren metin referans (satır satır) ayrıştırıcıdan geçer
+    for t in (parse_moves(nc), parse_moves(nc, chunk_chars=4), parse_moves(nc + "#1=2\n")):
+        assert t["plane"].tolist() == [18, 18, 17]
+        assert (t["k"][0], np.isnan(t["r"][0])) == (5.0, True)
+        assert t["r"][1] == -5.0 and t["r"][2] == 12.7
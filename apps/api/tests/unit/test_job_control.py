@@ -1,7 +1,6 @@
 from __future__ import annotations
 
-import os
-from app.services.job_control import queue_pause, queue_resume, is_queue_paused, cancel_job
+from app.services.job_control import is_queue_paused, queue_pause, queue_resume
 
 
 def test_queue_pause_resume():
@@ -18,3 +17,31 @@ def test_cancel_job_no_job(monkeypatch):
     assert isinstance(True, bool)
 
 
+def test_cancel_polls_reuse_one_redis_client(monkeypatch):
+    import redis
+
+    from app.services import redis_client
+    from app.services.job_control import cancel_requested, request_cancel
+
+    made = []
+
+    class FakeRedis:
+        def __init__(self):
+            self.keys = {}
+
+        def set(self, key, value, ex=None):
+            self.keys[key] = value
+
+        def exists(self, key):
+            return int(key in self.keys)
+
+    def from_url(url, **kw):
+        made.append(kw)
+        return FakeRedis()
+
+    monkeypatch.setattr(redis.Redis, "from_url", staticmethod(from_url))
+    monkeypatch.setattr(redis_client, "_client", None)
+    assert cancel_requested(7) is False
+    request_cancel(7)
+    assert all(cancel_requested(7) for _ in range(5))
+    assert made == [{"socket_connect_timeout": 1.0, "socket_timeout": 1.0}]
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import events
+from app.models import Base, Job
+from app.services import job_events
+
+
+def _capture(monkeypatch):
+    out = []
+    monkeypatch.setattr(job_events, "publish", lambda job_id, **kw: out.append((job_id, kw)))
+    return out
+
+
+def test_status_change_publishes_after_commit_only(monkeypatch):
+    out = _capture(monkeypatch)
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[Job.__table__])
+    s = sessionmaker(bind=engine)()
+    job = Job(type="sim", status="pending")
+    s.add(job)
+    s.commit()
+    job.status = "running"
+    s.flush()
+    assert len(out) == 1
+    s.rollback()
+    job.metrics = {"x": 1}
+    s.commit()
+    assert len(out) == 1
+    job.status = "succeeded"
+    s.commit()
+    assert out[-1] == (
+        job.id,
+        {
+            "stage": "succeeded",
+            "progress": 100.0,
+            "message": None,
+            "status": "succeeded",
+            "type": "sim",
+            "error_code": None,
+        },
+    )
+
+
+def test_stage_progress_maps_and_throttles(monkeypatch):
+    out = _capture(monkeypatch)
+    rep = job_events.StageProgress(7, "carve", 10.0, 80.0, interval_s=3600)
+    rep.start()
+    rep(1, 4)
+    rep(4, 4)
+    assert [kw["progress"] for _, kw in out] == [10.0, 80.0]
+
+
+def test_cam_stages_cover_the_whole_job(monkeypatch):
+    from app.tasks.cam import CAM_STAGES
+
+    out = _capture(monkeypatch)
+    for stage in ("download", "generate", "lint", "upload"):
+        job_events.start_stage(3, CAM_STAGES, stage)
+    assert [(kw["stage"], kw["progress"]) for _, kw in out] == [
+        ("download", 0.0),
+        ("generate", 10.0),
+        ("lint", 75.0),
+        ("upload", 90.0),
+    ]
+    assert CAM_STAGES["upload"][1] == 100.0
+
+
+class FakeRedis:
+    def __init__(self, batches):
+        self.batches = list(batches)
+        self.reads = []
+
+    async def xread(self, streams, count=None, block=None):
+        self.reads.append(dict(streams))
+        return self.batches.pop(0) if self.batches else []
+
+    async def aclose(self):
+        pass
+
+
+class FakeRequest:
+    async def is_disconnected(self):
+        return False
+
+
+def _relay(monkeypatch, fake, last_id="0"):
+    import redis.asyncio as aioredis
+
+    monkeypatch.setattr(aioredis.Redis, "from_url", staticmethod(lambda *a, **k: fake))
+
+    async def run():
+        return [chunk async for chunk in events.relay(FakeRequest(), 5, last_id)]
+
+    return asyncio.run(run())
+
+
+def _entry(eid, **doc):
+    return (eid, {"data": json.dumps(doc)})
+
+
+def test_relay_resumes_from_last_id_and_closes_on_terminal(monkeypatch):
+    key = job_events.stream_key(5)
+    fake = FakeRedis(
+        [
+            [[key, [_entry("1-0", stage="carve", progress=40.0)]]],
+            [[key, [_entry("2-0", status="failed"), _entry("3-0", status="running")]]],
+            [[key, [_entry("4-0", status="succeeded", progress=100.0)]]],
+        ]
+    )
+    chunks = _relay(monkeypatch, fake, last_id="0-5")
+    assert fake.reads[0] == {key: "0-5"}
+    assert fake.reads[1] == {key: "1-0"}
+    assert chunks[0] == b'id: 1-0\ndata: {"stage": "carve", "progress": 40.0}\n\n'
+    # 'failed' sonrası yeniden deneme olayı geldiği için akış kapanmaz
+    assert len(chunks) == 4
+    assert b"succeeded" in chunks[-1]
+
+
+def test_relay_checks_db_when_idle(monkeypatch):
+    monkeypatch.setattr(
+        events, "_job_status", lambda job_id: {"job_id": job_id, "status": "failed", "message": "x"}
+    )
+    chunks = _relay(monkeypatch, FakeRedis([]))
+    assert chunks == [b'id: 0\ndata: {"job_id": 5, "status": "failed", "message": "x"}\n\n']
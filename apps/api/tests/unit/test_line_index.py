@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import hashlib
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from app.gcode.line_index import build_line_index, read_lines, write_line_index
+
+
+def _program(tmp_path, n=10_000):
+    lines = ["G21 G90", "(Begin operation: Face)"]
+    lines += [f"G1 X{i % 100}.5 Y{i // 100}.25 F600" for i in range(n)]
+    lines.insert(6000, "(Begin operation: Finish)")
+    p = tmp_path / "cam-1.gcode"
+    p.write_bytes(("\r\n".join(lines) + "\r\n").encode())
+    return p, lines
+
+
+def test_ranged_read_fetches_only_nearby_bytes(tmp_path):
+    p, lines = _program(tmp_path)
+    data = p.read_bytes()
+    index = build_line_index(p, stride=64)
+    assert index["lines"] == len(lines) and index["size"] == len(data)
+    assert index["sha256"] == hashlib.sha256(data).hexdigest()
+    assert [(o["name"], o["line"]) for o in index["ops"]] == [("Face", 2), ("Finish", 6001)]
+    assert data[index["ops"][1]["offset"] :].startswith(b"(Begin operation: Finish)")
+
+    def fetch(lo, hi):
+        return data[lo:hi]
+
+    got, nbytes = read_lines(fetch, index, 7001, 10)
+    assert got == lines[7000:7010]
+    assert nbytes < 2 * 64 * 30
+
+    tail, _ = read_lines(fetch, index, len(lines) - 2, 50)
+    assert tail == lines[-3:]
+    assert read_lines(fetch, index, len(lines) + 1, 5) == ([], 0)
+
+
+def test_sidecar_written_next_to_program(tmp_path):
+    p, lines = _program(tmp_path, n=10)
+    out = write_line_index(p)
+    assert out.name == "cam-1.gcode.idx.json"
+    assert json.loads(out.read_text())["lines"] == len(lines)
+
+
+def test_post_nc_artefacts_resolve_to_line_index(tmp_path, monkeypatch):
+    from app.routers import jobs
+
+    p, lines = _program(tmp_path, n=10)
+    index = build_line_index(p)
+    monkeypatch.setattr(jobs, "_load_index", lambda key, sha: index)
+    nc = {"type": "nc", "s3_key": "artefacts/setup_1.nc", "sha256": index["sha256"]}
+    arts = [nc, {"type": "nc-index", "s3_key": "artefacts/setup_1.nc.idx.json"}]
+    assert jobs.resolve_gcode(arts) == (nc, index)
+    with pytest.raises(HTTPException) as e:
+        jobs.resolve_gcode([{**nc, "sha256": "x"}, arts[1]])
+    assert e.value.status_code == 409
+    with pytest.raises(HTTPException):
+        jobs.resolve_gcode([nc])
@@ -35,3 +35,48 @@ M30
     assert any("Tool plane" in w for w in out["warnings"])  # G68 yok
 
 
+def test_machine_bounds_report_line_numbers(tmp_path):
+    from app.post.lint import MachineBounds, lint_file
+
+    nc = "G21\nG90\nG0 X0 Y0 Z5\nG1 X310 F100\nG1 Y-2\nG0 Z5\n"
+    p = tmp_path / "p.nc"
+    p.write_text(nc)
+    res = lint_file(p, [MachineBounds({"x": [0, 300], "y": [0, 300], "z": [-50, 150]})])
+    assert [f.lines for f in res.errors] == [[4, 5, 6]]  # G0 Z5 hâlâ X=310 konumunda
+    assert "satır 4: X=310.000" in res.errors[0].message
+    assert res.lines == 6 and res.moves == 4
+
+
+def test_cam_lint_uses_shared_rules_and_bounds():
+    import pytest
+
+    from app.tasks.cam import lint_gcode as cam_lint
+
+    nc = "G21 G90\nG0 X0 Y0 Z5\nG1 Z-60 F100\n"
+    assert cam_lint(nc, {"units": "mm"}) == {"lines": 3, "moves": 2}
+    with pytest.raises(RuntimeError, match="satır 3"):
+        cam_lint(nc, {"units": "mm", "machine_bounds_mm": {"z": [-50, 150]}})
+    with pytest.raises(RuntimeError, match="ilerleme"):
+        cam_lint("G21\nG1 X1\n", {"units": "mm"})
+
+
+def test_cam_lint_stream_shares_moves_and_op_markers(tmp_path):
+    import numpy as np
+
+    from app.cam.cycle_time import OpMarkers, op_markers
+    from app.gcode.tokenizer import parse_moves
+    from app.tasks.cam import lint_program
+
+    nc = (
+        "G21 G90\n(Begin operation: Profile)\nG0 X0 Y0 Z5\nG1 Z-1 F100\n"
+        "(Begin operation: Drill)\nG1 X4 Y2\n"
+    )
+    p = tmp_path / "p.nc"
+    p.write_text(nc)
+    markers = OpMarkers()
+    with open(p, encoding="utf-8") as f:
+        lint, moves = lint_program(f, {"units": "mm"}, markers)
+    assert lint == {"lines": 6, "moves": 3}
+    ref = parse_moves(nc)
+    assert all(np.array_equal(moves[k], ref[k], equal_nan=True) for k in ref.dtype.names)
+    assert markers == op_markers(nc) == [(2, "Profile"), (5, "Drill")]
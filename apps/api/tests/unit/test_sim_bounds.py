@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import numpy as np
+
+from app.gcode.tokenizer import parse_moves
+from app.sim.bounds import fit_bounds, stock_bounds
+from app.sim.carve import (
+    GridSpec,
+    apply_column_floor,
+    flat_kernel,
+    move_endpoints,
+    sweep_column_floor,
+)
+from app.sim.voxgrid import make_grid
+
+NC = "G0 X10 Y20 Z30\nG1 Z-2 F300\nG1 X40 F600\nG0 Z30\n"
+DEFAULT = {"x": [0, 300], "y": [0, 300], "z": [-50, 150]}
+
+
+def _removed(text, spec):
+    floor = np.full(spec.shape[:2], np.inf, dtype=np.float32)
+    pts = move_endpoints(parse_moves(text), (0.0, 0.0, spec.top_mm))
+    sweep_column_floor(floor, pts, flat_kernel(6.0, spec.res_mm), spec)
+    return apply_column_floor(make_grid(spec, "dense"), floor, spec)
+
+
+def test_fit_bounds_tool_radius_and_cut_top():
+    b = fit_bounds(parse_moves(NC), 3.0, 0.5)
+    assert b["x"] == [6.5, 43.5] and b["y"] == [16.5, 23.5]
+    # Güvenli yükseklik (G0 Z30) stoku yukarı uzatmaz; üst Z en yüksek
+    # kesimin bir takım yarıçapı üstü
+    assert b["z"] == [-2.5, 1.0]
+    # Pay en yüksek hızlı hareketin altında kalır
+    low = fit_bounds(parse_moves("G0 X10 Y20 Z1\nG1 Z-2 F300\nG1 X40 F600\n"), 6.0, 0.5)
+    assert low["z"] == [-2.5, 0.999]
+
+
+def test_fit_bounds_unions_stock_and_clamps_top():
+    stock = {"shape": "block", "x_mm": 30, "y_mm": 25, "z_mm": 10}
+    assert stock_bounds(stock) == {"x": [0.0, 30.0], "y": [0.0, 25.0], "z": [-10.0, 0.0]}
+    b = fit_bounds(parse_moves(NC), 3.0, 0.5, stock=stock)
+    assert b == {"x": [0.0, 43.5], "y": [0.0, 25.0], "z": [-10.0, 0.0]}
+
+
+def test_fit_bounds_follows_arcs_and_falls_back():
+    b = fit_bounds(parse_moves("G0 X0 Y0\nG2 X20 Y0 I10 J0 F500\n"), 1.0, 1.0, fallback=DEFAULT)
+    assert b["y"] == [-2.0, 12.0]  # G2: yay +Y tarafında
+    assert b["z"] == DEFAULT["z"]
+    assert fit_bounds(parse_moves(""), 3.0, 1.0, fallback=DEFAULT) == DEFAULT
+
+
+def test_fitted_grid_carves_same_volume_as_large_grid():
+    moves = parse_moves(NC)
+    stock = {"x_mm": 50, "y_mm": 40, "z_mm": 10}
+    fitted = GridSpec.from_bounds(fit_bounds(moves, 3.0, 1.0, stock=stock), 1.0)
+    # Stok üstü aynı, XY'de çok daha geniş ızgara: kesilen voksel sayısı değişmemeli
+    large = GridSpec.from_bounds({"x": [-100, 200], "y": [-100, 200], "z": [-40, 0]}, 1.0)
+    assert _removed(NC, fitted) == _removed(NC, large) > 0
+    assert np.prod(fitted.shape) * 50 < np.prod(large.shape)
+
+
+def test_fit_bounds_snaps_outward_and_to_stock():
+    b = fit_bounds(parse_moves(NC), 3.0, 0.5, snap_mm=10.0)
+    assert b == {"x": [0.0, 50.0], "y": [10.0, 30.0], "z": [-10.0, 1.0]}
+    # Stok içinde kalan kenarlar stok kenarıdır; dışına taşan X üst kenarı kafese yuvarlanır
+    stock = {"x_mm": 30, "y_mm": 25, "z_mm": 10}
+    b = fit_bounds(parse_moves(NC), 3.0, 0.5, stock=stock, snap_mm=10.0)
+    assert b == {"x": [0.0, 50.0], "y": [0.0, 25.0], "z": [-10.0, 0.0]}
+
+
+def test_snapped_top_keeps_rapids_out_of_stock():
+    text = "G0 X5 Y5 Z2\nG1 Z-2 F300\nG1 X25\nG0 Z2\nG0 X45 Y25\nG1 Z-2\nG1 X55\nG0 Z2\n"
+    b = fit_bounds(parse_moves(text), 3.0, 0.5, snap_mm=10.0)
+    assert b["z"][1] < 2.0
+    spec = GridSpec.from_bounds(b, 0.5)
+    # Aynı ızgarada hızlı hareketleri çok yukarı taşımak kaldırılan hacmi değiştirmemeli
+    assert _removed(text, spec) == _removed(text.replace("Z2", "Z50"), spec) > 0
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+from app.services.sim_cache import sim_cache_key
+
+SIM = {
+    "method": "voxel",
+    "resolution_mm": 0.8,
+    "bounds": {"x": [0, 10], "y": [0, 10], "z": [0, 5]},
+    "tool_diam_mm": 6.0,
+}
+
+
+def test_key_is_stable_and_order_independent():
+    reordered = {
+        "tool_diam_mm": 6.0,
+        "bounds": {"z": [0, 5], "y": [0, 10], "x": [0, 10]},
+        "resolution_mm": 0.8,
+        "method": "voxel",
+    }
+    assert sim_cache_key("a" * 64, "b" * 64, SIM) == sim_cache_key("a" * 64, "b" * 64, reordered)
+
+
+def test_key_changes_with_inputs_and_params():
+    base = sim_cache_key("a" * 64, "b" * 64, SIM)
+    assert sim_cache_key("a" * 64, "c" * 64, SIM) != base
+    assert sim_cache_key("a" * 64, "b" * 64, {**SIM, "resolution_mm": 0.5}) != base
+    assert sim_cache_key("a" * 64, None, SIM) != base
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.data = {}
+        self.ttl = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+        self.ttl[key] = ex
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+
+class _FakeS3:
+    def __init__(self, keys):
+        self.keys = set(keys)
+
+    def head_object(self, Bucket, Key):
+        if Key not in self.keys:
+            raise RuntimeError("404")
+        return {}
+
+
+def _cache(monkeypatch, s3_keys=()):
+    from app.services import sim_cache
+
+    r = _FakeRedis()
+    monkeypatch.setattr(sim_cache, "redis_client", lambda: r)
+    monkeypatch.setattr(sim_cache, "get_s3_client", lambda: _FakeS3(s3_keys))
+    return sim_cache, r
+
+
+def test_store_sets_ttl_and_lookup_hits(monkeypatch):
+    from app.settings import app_settings
+
+    monkeypatch.setattr(app_settings, "sim_cache_ttl_s", 123)
+    sim_cache, r = _cache(monkeypatch, ["sim/a.glb"])
+    sim_cache.store("k", {"s3_key": "sim/a.glb"}, {"moves": 3})
+    assert r.ttl == {sim_cache.KEY_PREFIX + "k": 123}
+    assert sim_cache.lookup("k") == {"artefact": {"s3_key": "sim/a.glb"}, "metrics": {"moves": 3}}
+
+
+def test_lookup_drops_entry_when_artefact_is_gone(monkeypatch):
+    sim_cache, r = _cache(monkeypatch)
+    assert sim_cache.lookup("missing") is None
+    sim_cache.store("k", {"s3_key": "sim/deleted.glb"}, {})
+    assert sim_cache.lookup("k") is None
+    # Bayat girdi silinir; sonraki iş S3'e yeniden sormadan ıskalar
+    assert sim_cache.KEY_PREFIX + "k" not in r.data
+
+
+def test_sim_generate_short_circuits_on_cache_hit(monkeypatch):
+    from contextlib import contextmanager
+    from types import SimpleNamespace
+
+    from app.tasks import sim as sim_tasks
+
+    sim_cache, _ = _cache(monkeypatch, ["sim/hit.glb"])
+    params = {
+        "assembly_job_id": 1,
+        "gcode_job_id": 2,
+        "bounds": SIM["bounds"],
+        "resolution_mm": 0.8,
+    }
+    job = SimpleNamespace(
+        metrics={"params": params}, status="queued", started_at=None, task_id=None
+    )
+
+    @contextmanager
+    def fake_session():
+        yield SimpleNamespace(get=lambda model, job_id: job, commit=lambda: None)
+
+    monkeypatch.setattr(sim_tasks, "db_session", fake_session)
+    monkeypatch.setattr(sim_cache, "artefact_sha", lambda job_id: f"{job_id}" * 64)
+    done = []
+    monkeypatch.setattr(
+        sim_tasks, "complete_sim", lambda job_id, task, art, metrics: done.append((art, metrics))
+    )
+    monkeypatch.setattr(
+        sim_tasks,
+        "load_inputs",
+        lambda *a: (_ for _ in ()).throw(AssertionError("girdi indirildi")),
+    )
+
+    _, tools = sim_tasks.tool_kernels(params, 0.8)
+    key = sim_cache.sim_cache_key(
+        "1" * 64, "2" * 64, sim_tasks.sim_cache_params("voxel", 0.8, SIM["bounds"], tools)
+    )
+    sim_cache.store(key, {"s3_key": "sim/hit.glb"}, {"moves": 7})
+
+    assert sim_tasks.sim_generate.run(5) == {"ok": True, "cached": True}
+    [(art, metrics)] = done
+    assert art == {"s3_key": "sim/hit.glb"}
+    assert metrics["cache"] == "hit" and metrics["cache_key"] == key and metrics["moves"] == 7
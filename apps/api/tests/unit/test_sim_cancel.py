@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from app.gcode.tokenizer import parse_moves
+from app.sim import checkpoints
+from app.sim.cancel import CANCELLED, DEADLINE, CancelToken, SimInterrupted
+from app.sim.carve import GridSpec, flat_kernel, move_endpoints, sweep_column_floor
+from app.sim.checkpoints import sweep_with_checkpoints
+
+BOUNDS = {"x": [0, 60], "y": [0, 40], "z": [-10, 10]}
+TEXT = "G21 G90\nG0 X5 Y5 Z2\nG1 Z-2 F200\nG1 X55\nG1 Y30\nG1 X5\n"
+
+
+def test_token_polls_flag_at_most_once_per_interval():
+    calls = []
+    token = CancelToken(cancelled=lambda: calls.append(1) or False, poll_interval_s=3600)
+    for _ in range(5):
+        token.check()
+    assert len(calls) == 1
+
+
+def test_token_deadline_is_skipped_in_meshing_stage():
+    token = CancelToken(deadline=float("-inf"))
+    token.check(deadline=False)
+    with pytest.raises(SimInterrupted) as e:
+        token.check()
+    assert e.value.reason == DEADLINE
+
+
+def test_interrupted_sweep_keeps_carved_prefix(monkeypatch):
+    monkeypatch.setattr(checkpoints, "CHECK_EVERY_SEGMENTS", 1)
+    spec = GridSpec.from_bounds(BOUNDS, 0.5)
+    kernel = flat_kernel(6.0, 0.5)
+    moves = parse_moves(TEXT)
+    polls = iter([False, False, True])
+    token = CancelToken(cancelled=lambda: next(polls), poll_interval_s=0)
+    floor = np.full(spec.shape[:2], np.inf, dtype=np.float32)
+    stats = sweep_with_checkpoints(floor, moves, TEXT.encode(), kernel, spec, None, token=token)
+
+    assert stats.interrupted == CANCELLED
+    assert stats.carved_moves == 4
+    assert stats.processed_pct == 80.0
+    prefix = np.full(spec.shape[:2], np.inf, dtype=np.float32)
+    sweep_column_floor(prefix, move_endpoints(moves, (0.0, 0.0, spec.top_mm))[:4], kernel, spec)
+    assert np.array_equal(floor, prefix)
+
+
+class _Session:
+    def __init__(self, job):
+        self.job = job
+        self.committed = False
+
+    def query(self, _model):
+        return self
+
+    def filter(self, *_args):
+        return self
+
+    def with_for_update(self):
+        return self
+
+    def one(self):
+        return self.job
+
+    def commit(self):
+        self.committed = True
+
+
+@pytest.mark.parametrize("flag, status", [(False, "succeeded"), (True, "failed")])
+def test_complete_sim_rechecks_cancel_flag_before_success(monkeypatch, flag, status):
+    from contextlib import contextmanager
+    from types import SimpleNamespace
+
+    from app.tasks import sim as sim_tasks
+
+    job = SimpleNamespace(
+        error_code=None,
+        error_message=None,
+        status="running",
+        metrics={},
+        artefacts=[],
+        started_at=None,
+        finished_at=None,
+    )
+    session = _Session(job)
+
+    @contextmanager
+    def fake_session():
+        yield session
+
+    monkeypatch.setattr(sim_tasks, "db_session", fake_session)
+    monkeypatch.setattr(sim_tasks, "cancel_requested", lambda job_id: flag)
+    monkeypatch.setattr(sim_tasks, "audit", lambda *a, **k: None)
+    sim_tasks.complete_sim(1, "sim.generate", {"s3_key": "k"}, {"carved_voxels": 3})
+    assert session.committed and job.status == status and job.artefacts == [{"s3_key": "k"}]
+    assert job.error_code == ("CANCELLED" if flag else None)
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import numpy as np
+
+from app.gcode.tokenizer import parse_moves
+from app.sim.carve import (
+    ARC_TOL_FACTOR,
+    GridSpec,
+    KernelSet,
+    ToolShape,
+    apply_column_floor,
+    flat_kernel,
+    iter_pair_samples,
+    move_path,
+    segments,
+    sweep_column_floor,
+    sweep_segments,
+    tool_kernel,
+)
+from app.sim.parallel import sweep_path_parallel
+from app.sim.voxgrid import make_grid
+from app.tasks.sim import floor_result
+
+BOUNDS = {"x": [0, 40], "y": [0, 20], "z": [-10, 10]}
+
+
+def _floor(text, bounds, res_mm, kernel):
+    spec = GridSpec.from_bounds(bounds, res_mm)
+    pts, _ = move_path(parse_moves(text), (0.0, 0.0, spec.top_mm), ARC_TOL_FACTOR * res_mm)
+    floor = np.full(spec.shape[:2], np.inf, dtype=np.float32)
+    sweep_segments(floor, *segments(pts), kernel, spec)
+    return floor, spec
+
+
+def test_long_linear_move_is_carved_between_endpoints():
+    floor, spec = _floor(
+        "G21 G90\nG0 X5 Y10 Z5\nG1 Z-2 F300\nG1 X35 F600\n", BOUNDS, 1.0, flat_kernel(6.0, 1.0)
+    )
+    grid = make_grid(spec)
+    carved = apply_column_floor(grid, floor, spec)
+    assert carved > 0
+    vox = grid.to_dense()
+    # Uç noktalar arasındaki orta kolon: tabanın altı dolu, üstü boş
+    col = vox[20, 10]
+    assert col[:8].all()  # z=-10..-3
+    assert not col[8:].any()  # z>=-2
+    # Takım yarıçapı dışındaki kolon dokunulmamış
+    assert vox[20, 16].all()
+
+
+def test_floor_result_meshes_non_flat_tool_cut():
+    ball = tool_kernel(ToolShape("ball", 6.0), 0.5)
+    floor, spec = _floor("G0 X5 Y10 Z5\nG1 Z-3 F300\nG1 X35 F600\n", BOUNDS, 0.5, ball)
+    grid = make_grid(spec, "dense")
+    carved = apply_column_floor(grid, floor, spec)
+    _, metrics = floor_result("voxel", floor, spec, "sparse")
+    assert metrics["carved_voxels"] == carved > 0 and metrics["voxel_storage"] == "sparse"
+    # Küresel uç: yolun ortasında taban -3, yarıçapın kenarına doğru yükselir
+    col = grid.to_dense()[40, 20]
+    assert col[:14].all() and not col[14:].any()
+    assert floor[40, 20 + 4] > floor[40, 20] + 0.5
+
+
+def test_pair_sampling_respects_batch_limit():
+    a = np.array([[0, 0, 0], [10, 0, 0]], dtype=float)
+    b = np.array([[10, 0, 0], [10, 10, 0]], dtype=float)
+    chunks = list(iter_pair_samples(a, b, 0.5, 25))
+    assert all(len(c) <= 25 for c in chunks)
+    allp = np.concatenate(chunks)
+    assert np.allclose(allp.min(axis=0), [0, 0, 0]) and np.allclose(allp.max(axis=0), [10, 10, 0])
+
+
+def test_grid_and_kernel_shapes():
+    spec = GridSpec.from_bounds(BOUNDS, 0.5)
+    assert spec.shape == (81, 41, 41)
+    k = flat_kernel(0.2, 0.5)
+    assert len(k.dx) == 1
+
+
+def test_arcs_expand_within_tolerance():
+    ijk, row = move_path(parse_moves("G0 X10 Y0 Z0\nG3 X-10 Y0 I-10 J0\n"), (0.0, 0.0, 0.0), 0.01)
+    rad, _ = move_path(parse_moves("G0 X10 Y0 Z0\nG3 X-10 Y0 R10\n"), (0.0, 0.0, 0.0), 0.01)
+    assert np.allclose(ijk, rad)
+    assert row.tolist() == [0] + [1] * (len(ijk) - 1)
+    assert ijk[:, 1].max() == 10.0 and np.allclose(np.hypot(ijk[:, 0], ijk[:, 1]), 10.0)
+    # Kiriş orta noktasının yaydan sapması toleransı aşmaz
+    mid = (ijk[1:] + ijk[:-1]) / 2
+    assert (10.0 - np.hypot(mid[:, 0], mid[:, 1])).max() <= 0.01
+    # G18 (ZX düzlemi), tam çember helis: Y doğrusal ilerler, Z-X çemberde kalır
+    hx, _ = move_path(parse_moves("G0 X0 Y0 Z0\nG18 G2 X0 Y6 Z0 I5 K0\n"), (0.0, 0.0, 0.0), 0.05)
+    assert np.allclose(np.hypot(hx[:, 0] - 5.0, hx[:, 2]), 5.0)
+    assert hx[-1].tolist() == [0.0, 6.0, 0.0] and np.all(np.diff(hx[:, 1]) > 0)
+
+
+def test_arc_carves_like_polyline():
+    spec = GridSpec.from_bounds(BOUNDS, 0.5)
+    k = flat_kernel(4.0, 0.5)
+    arc, _ = move_path(
+        parse_moves("G0 X10 Y5 Z-2\nG2 X30 Y5 R10\n"), (0.0, 0.0, spec.top_mm), 0.125
+    )
+    t = np.linspace(np.pi, 0.0, 2000)
+    poly = np.column_stack([20 + 10 * np.cos(t), 5 + 10 * np.sin(t), np.full_like(t, -2.0)])
+    a = np.full(spec.shape[:2], np.inf, dtype=np.float32)
+    b = a.copy()
+    sweep_column_floor(a, arc, k, spec)
+    sweep_column_floor(b, poly, k, spec)
+    assert np.count_nonzero(np.isfinite(a) != np.isfinite(b)) < 0.02 * np.isfinite(b).sum()
+    assert np.isfinite(a[40, 29])  # yayın tepesi (20, 14.5)
+
+
+def test_ball_and_bull_kernels_follow_profile():
+    res = 0.25
+    ball = tool_kernel(ToolShape.from_library("endmill_ball", 6.0), res)
+    assert tool_kernel(ToolShape("ball", 6.0, 3.0), res) is ball  # damga maskesi önbellekten
+    d = np.hypot(ball.dx, ball.dy) * res
+    assert np.allclose(
+        ball.lift, 3.0 - np.sqrt(np.maximum(9.0 - np.minimum(d, 3.0) ** 2, 0.0)), atol=1e-6
+    )
+    bull = tool_kernel(ToolShape("bull", 6.0, 1.0), res)
+    assert (bull.lift[np.hypot(bull.dx, bull.dy) * res <= 2.0] == 0).all() and bull.lift.max() > 0.9
+    assert tool_kernel(ToolShape("bull", 6.0, 0.0), res) is flat_kernel(6.0, res)
+
+
+def test_kernel_set_cuts_each_segment_with_its_tool():
+    spec = GridSpec.from_bounds(BOUNDS, 0.5)
+    kernels = KernelSet(flat_kernel(4.0, 0.5), {2: tool_kernel(ToolShape("ball", 4.0, 2.0), 0.5)})
+    moves = parse_moves("T1 M6\nG0 X10 Y10 Z5\nG1 Z-2 F100\nG0 Z5\nT2 M6\nG0 X30 Y10\nG1 Z-2\n")
+    pts, row = move_path(moves, (0.0, 0.0, spec.top_mm), 0.1)
+    floor = np.full(spec.shape[:2], np.inf, dtype=np.float32)
+    sweep_path_parallel(floor, pts, moves[moves["type"] != 6]["tool"][row], kernels, spec)
+    # Düz uç: kenarda da -2; küresel uç: merkezden 1.5 mm'de 2 - sqrt(4 - 2.25) kadar yüksek
+    assert floor[20 + 3, 20] == -2.0
+    assert np.isclose(floor[60 + 3, 20], -2.0 + 2.0 - np.sqrt(4.0 - 2.25), atol=1e-5)
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import numpy as np
+
+from app.gcode.tokenizer import parse_moves
+from app.sim.bounds import fit_bounds
+from app.sim.carve import GridSpec, flat_kernel, move_endpoints, sweep_column_floor
+from app.sim.checkpoints import sweep_with_checkpoints
+
+BOUNDS = {"x": [0, 60], "y": [0, 40], "z": [-10, 10]}
+OPS = [
+    "T1 M6\nG0 X5 Y5 Z2\nG1 Z-2 F200\nG1 X55\n",
+    "T2 M6\nG0 X5 Y20 Z2\nG1 Z-4 F200\nG1 X55 Y25\n",
+    "T3 M6\nG0 X10 Y35 Z2\nG1 Z-1 F200\nG1 X50\n",
+]
+
+
+class MemStore(dict):
+    def get(self, key):
+        return dict.get(self, key)
+
+    def put(self, key, data):
+        self[key] = data
+
+
+def _run(text, store, bounds=BOUNDS):
+    spec = GridSpec.from_bounds(bounds, 0.5)
+    kernel = flat_kernel(6.0, 0.5)
+    moves = parse_moves(text)
+    floor = np.full(spec.shape[:2], np.inf, dtype=np.float32)
+    stats = sweep_with_checkpoints(floor, moves, text.encode(), kernel, spec, store)
+    full = np.full(spec.shape[:2], np.inf, dtype=np.float32)
+    sweep_column_floor(full, move_endpoints(moves, (0.0, 0.0, spec.top_mm)), kernel, spec)
+    return floor, full, stats
+
+
+def test_changed_last_op_resumes_from_deepest_checkpoint():
+    store = MemStore()
+    floor, full, stats = _run("G21 G90\n" + "".join(OPS), store)
+    assert np.array_equal(floor, full)
+    assert stats.resumed_moves == 0 and len(stats.saved) == 2
+
+    tuned = OPS[2].replace("Z-1", "Z-1.5")
+    floor, full, stats = _run("G21 G90\n" + OPS[0] + OPS[1] + tuned, store)
+    assert np.array_equal(floor, full)
+    assert stats.resumed_from_line == 10  # T3 M6 satırı
+    assert stats.carved_moves < stats.resumed_moves
+
+
+def test_changed_prefix_does_not_resume():
+    store = MemStore()
+    _run("G21 G90\n" + "".join(OPS), store)
+    floor, full, stats = _run("G21 G90\n" + OPS[0].replace("X55", "X50") + OPS[1] + OPS[2], store)
+    assert stats.resumed_moves == 0
+    assert np.array_equal(floor, full)
+
+
+def test_auto_bounds_survive_editing_last_op():
+    store = MemStore()
+    text = "G21 G90\n" + "".join(OPS)
+    bounds = fit_bounds(parse_moves(text), 3.0, 0.5, snap_mm=10.0)
+    _run(text, store, bounds)
+
+    # Son op hem en yüksek kesimi hem X kenarını değiştirir; kafese yuvarlanan XY ve hızlı hareketle
+    # sınırlanan üst Z aynı kalır
+    tuned = "G21 G90\n" + OPS[0] + OPS[1] + OPS[2].replace("Z-1", "Z-0.5").replace("X50", "X56")
+    tuned_bounds = fit_bounds(parse_moves(tuned), 3.0, 0.5, snap_mm=10.0)
+    assert tuned_bounds == bounds
+    assert fit_bounds(parse_moves(tuned), 3.0, 0.5) != fit_bounds(parse_moves(text), 3.0, 0.5)
+    floor, full, stats = _run(tuned, store, tuned_bounds)
+    assert np.array_equal(floor, full)
+    assert stats.resumed_from_line == 10
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import numpy as np
+
+from app.gcode.tokenizer import parse_moves
+from app.sim.carve import (
+    GridSpec,
+    ToolShape,
+    apply_column_floor,
+    flat_kernel,
+    move_endpoints,
+    sweep_column_floor,
+    tool_kernel,
+)
+from app.sim.heightfield import heightfield_from_floor, heightfield_mesh, removed_volume_mm3
+from app.sim.voxgrid import make_grid
+
+BOUNDS = {"x": [0, 40], "y": [0, 20], "z": [-10, 10]}
+NC = "G0 X5 Y10 Z5\nG1 Z-2 F300\nG1 X35 F600\nG1 Y4 Z-4\n"
+
+
+def _floor(res_mm, kernel):
+    spec = GridSpec.from_bounds(BOUNDS, res_mm)
+    floor = np.full(spec.shape[:2], np.inf, dtype=np.float32)
+    sweep_column_floor(
+        floor, move_endpoints(parse_moves(NC), (0.0, 0.0, spec.top_mm)), kernel, spec
+    )
+    return floor, spec
+
+
+def test_heightfield_matches_voxel_columns():
+    floor, spec = _floor(1.0, flat_kernel(6.0, 1.0))
+    zmap = heightfield_from_floor(floor, spec)
+    grid = make_grid(spec, "dense")
+    apply_column_floor(grid, floor, spec)
+    vox = grid.to_dense()
+    # Voksel kolonundaki dolu hücre sayısı Z haritasındaki yüzey yüksekliğine karşılık gelir
+    solid = vox.sum(axis=2)
+    expected = np.ceil((zmap - spec.origin[2]) / spec.res_mm - 1e-6)
+    expected[zmap >= spec.top_mm] = spec.shape[2]
+    assert np.array_equal(solid, expected.astype(solid.dtype))
+    assert zmap[20, 10] == -2.0
+    assert removed_volume_mm3(zmap, spec) > 0
+
+
+def test_ball_nose_heightfield_follows_tool_profile():
+    flat, spec = _floor(0.5, flat_kernel(6.0, 0.5))
+    ball, _ = _floor(0.5, tool_kernel(ToolShape("ball", 6.0), 0.5))
+    zflat, zball = heightfield_from_floor(flat, spec), heightfield_from_floor(ball, spec)
+    # Yol ekseninde aynı derinlik; yanlarda küresel uç 3 - sqrt(9 - d²) kadar yüksekte kalır
+    assert zball[40, 20] == zflat[40, 20] == -2.0
+    assert np.isclose(zball[40, 24], -2.0 + 3.0 - np.sqrt(9.0 - 4.0), atol=1e-5)
+    assert (zball >= zflat).all()
+    assert 0 < removed_volume_mm3(zball, spec) < removed_volume_mm3(zflat, spec)
+
+
+def test_heightfield_mesh_is_closed():
+    floor, spec = _floor(2.0, flat_kernel(6.0, 2.0))
+    verts, tris = heightfield_mesh(heightfield_from_floor(floor, spec), spec)
+    assert tris.max() < len(verts)
+    # Kapalı yüzeyde her kenar tam iki üçgen tarafından, zıt yönlerde paylaşılır
+    e = np.concatenate([tris[:, [0, 1]], tris[:, [1, 2]], tris[:, [2, 0]]]).astype(np.int64)
+    fwd = set(map(tuple, e))
+    assert len(fwd) == len(e)
+    assert all((b, a) in fwd for a, b in fwd)
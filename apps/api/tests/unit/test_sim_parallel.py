@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from app.sim import parallel
+from app.sim.carve import (
+    GridSpec,
+    ToolShape,
+    flat_kernel,
+    segments,
+    sweep_column_floor,
+    sweep_segments,
+    tool_kernel,
+)
+
+
+def test_tiles_cover_plane_without_overlap():
+    tiles = parallel.plan_tiles(101, 37, 16)
+    hit = np.zeros((101, 37), dtype=int)
+    for x0, x1, y0, y1 in tiles:
+        hit[x0:x1, y0:y1] += 1
+    assert (hit == 1).all()
+
+
+def test_jobs_are_balanced_longest_first():
+    bins = parallel.assign_jobs([9, 1, 5, 4, 3], 2)
+    assert sorted(sum(([9, 1, 5, 4, 3][i] for i in b), 0) for b in bins) == [10, 12]
+
+
+def test_parallel_floor_matches_serial(monkeypatch):
+    monkeypatch.setattr(parallel, "PARALLEL_MIN_COLUMNS", 0)
+    rng = np.random.default_rng(3)
+    pts = np.column_stack([rng.uniform(0, 60, 40), rng.uniform(0, 40, 40), rng.uniform(-8, 4, 40)])
+    spec = GridSpec.from_bounds({"x": [0, 60], "y": [0, 40], "z": [-10, 10]}, 0.5)
+    kernel = flat_kernel(5.0, 0.5)
+    serial = np.full(spec.shape[:2], np.inf, dtype=np.float32)
+    sweep_column_floor(serial, pts, kernel, spec)
+    with parallel.SweepPool(spec.shape[:2], workers=3) as pool:
+        parallel.sweep_segments_parallel(pool.floor, *segments(pts), kernel, spec, pool)
+    assert np.array_equal(serial, pool.floor)
+
+
+def _random_path(seed, n=40):
+    rng = np.random.default_rng(seed)
+    return np.column_stack([rng.uniform(0, 60, n), rng.uniform(0, 40, n), rng.uniform(-8, 4, n)])
+
+
+@pytest.mark.parametrize(
+    "kernel", [flat_kernel(5.0, 0.5), tool_kernel(ToolShape("ball", 6.0), 0.5)]
+)
+def test_tile_view_is_swept_in_place(kernel):
+    spec = GridSpec.from_bounds({"x": [0, 60], "y": [0, 40], "z": [-10, 10]}, 0.5)
+    a, b = segments(_random_path(5))
+    full = np.full(spec.shape[:2], np.inf, dtype=np.float32)
+    sweep_segments(full, a, b, kernel, spec)
+    floor = np.full(spec.shape[:2], np.inf, dtype=np.float32)
+    for x0, x1, y0, y1 in parallel.plan_tiles(*spec.shape[:2], 6):
+        # Bitişik olmayan döşeme görünümü kopyasız güncellenir
+        sweep_segments(floor[x0:x1, y0:y1], a, b, kernel, spec.sub(x0, x1, y0, y1))
+    assert np.array_equal(floor, full)
+
+
+def test_pool_is_reused_across_batches_and_tools(monkeypatch):
+    monkeypatch.setattr(parallel, "PARALLEL_MIN_COLUMNS", 0)
+    spec = GridSpec.from_bounds({"x": [0, 60], "y": [0, 40], "z": [-10, 10]}, 0.5)
+    kernels = [flat_kernel(5.0, 0.5), tool_kernel(ToolShape("ball", 6.0), 0.5)]
+    batches = [segments(_random_path(seed)) for seed in range(4)]
+    serial = np.full(spec.shape[:2], np.inf, dtype=np.float32)
+    with parallel.SweepPool(spec.shape[:2], workers=3) as pool:
+        for i, (a, b) in enumerate(batches):
+            sweep_segments(serial, a, b, kernels[i % 2], spec)
+            parallel.sweep_segments_parallel(pool.floor, a, b, kernels[i % 2], spec, pool)
+            if i == 0:
+                opened = pool._pool
+        assert pool._pool is opened is not None
+    assert pool._pool is None
+    assert np.array_equal(serial, pool.floor)
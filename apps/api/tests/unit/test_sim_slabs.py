@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from app.gcode.tokenizer import parse_moves
+from app.sim.carve import GridSpec, flat_kernel, move_endpoints, sweep_column_floor
+from app.sim.slabs import carve_slab_floor, load_slab, plan_slabs, save_slab, stitch_floors
+
+BOUNDS = {"x": [0, 50], "y": [0, 20], "z": [-10, 10]}
+GCODE = "G0 X2 Y5 Z2\nG1 Z-4 F200\nG1 X48 Y15\nG1 Z-6\nG1 X10 Y3\n"
+
+
+def test_stitched_slabs_equal_single_pass(tmp_path):
+    moves = parse_moves(GCODE)
+    spec = GridSpec.from_bounds(BOUNDS, 0.5)
+    full = np.full(spec.shape[:2], np.inf, dtype=np.float32)
+    sweep_column_floor(
+        full, move_endpoints(moves, (0.0, 0.0, spec.top_mm)), flat_kernel(6.0, 0.5), spec
+    )
+
+    parts = []
+    for i, slab in enumerate(plan_slabs(spec.shape[0], 4)):
+        path = save_slab(
+            tmp_path / f"s{i}.npz",
+            slab,
+            carve_slab_floor(moves, BOUNDS, 0.5, flat_kernel(6.0, 0.5), slab),
+        )
+        parts.append(load_slab(path.read_bytes()))
+    assert np.array_equal(stitch_floors(spec, parts), full)
+
+
+def test_missing_slab_is_an_error():
+    spec = GridSpec.from_bounds(BOUNDS, 1.0)
+    (x0, x1), _ = plan_slabs(spec.shape[0], 2)
+    with pytest.raises(RuntimeError):
+        stitch_floors(spec, [((x0, x1), np.zeros((x1 - x0, spec.shape[1]), dtype=np.float32))])
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import json
+import struct
+
+import numpy as np
+import pytest
+
+from app.gcode.tokenizer import parse_moves
+from app.sim.carve import (
+    GridSpec,
+    apply_column_floor,
+    flat_kernel,
+    move_endpoints,
+    sweep_column_floor,
+)
+from app.sim.gltf import cluster_decimate, iter_voxel_meshes, split_spatial, weld, write_glb
+from app.sim.voxgrid import BrickGrid, DenseGrid, iter_mesh_blocks, make_grid
+
+BOUNDS = {"x": [0, 40], "y": [0, 30], "z": [-10, 10]}
+GCODE = "G21 G90\nG0 X5 Y10 Z5\nG1 Z-2 F300\nG1 X35 Y22 F600\nG1 Z-7.3\nG1 X8 Y4\n"
+
+
+def _carve(text, bounds, res_mm, tool_diam_mm, storage):
+    spec = GridSpec.from_bounds(bounds, res_mm)
+    floor = np.full(spec.shape[:2], np.inf, dtype=np.float32)
+    pts = move_endpoints(parse_moves(text), (0.0, 0.0, spec.top_mm))
+    sweep_column_floor(floor, pts, flat_kernel(tool_diam_mm, res_mm), spec)
+    grid = make_grid(spec, storage)
+    return grid, apply_column_floor(grid, floor, spec)
+
+
+def test_backends_carve_identically():
+    ref, n_ref = _carve(GCODE, BOUNDS, 0.5, 5.0, "dense")
+    for storage in ("packed", "sparse"):
+        grid, n = _carve(GCODE, BOUNDS, 0.5, 5.0, storage)
+        assert n == n_ref
+        assert grid.count() == ref.count()
+        assert np.array_equal(grid.to_dense(), ref.to_dense())
+
+
+def test_sparse_grid_allocates_only_cut_bricks():
+    spec_bounds = {"x": [0, 100], "y": [0, 100], "z": [-20, 20]}
+    grid, _ = _carve("G0 X10 Y10 Z5\nG1 Z-3 F100\nG1 X20\n", spec_bounds, 0.25, 4.0, "sparse")
+    assert isinstance(grid, BrickGrid)
+    assert grid.nbytes * 30 < grid.size  # yoğun uint8 ızgaradan 30 kat küçük
+
+
+def test_mesh_blocks_only_near_carved_region():
+    spec = GridSpec.from_bounds({"x": [0, 70], "y": [0, 10], "z": [0, 10]}, 1.0)
+    grid = BrickGrid(spec)
+    kmin = np.full(spec.shape[:2], spec.shape[2], dtype=np.int32)
+    kmin[40, 5] = 5
+    grid.apply_column_floor(kmin)
+    blocks = [(o, None if b is None else b.shape) for o, b in iter_mesh_blocks(grid)]
+    # Izgara bir voksellik boş katmanla çevrili; kirlenmemiş sınır
+    # bloğu analitik yüz için None döner
+    assert blocks == [
+        ((-1, -1, -1), None),
+        ((31, -1, -1), (33, 13, 13)),
+        ((63, -1, -1), (9, 13, 13)),
+    ]
+
+
+def test_untouched_stock_meshes_as_closed_box():
+    spec = GridSpec.from_bounds({"x": [10, 80], "y": [0, 10], "z": [-5, 5]}, 1.0)
+    pieces = list(iter_voxel_meshes(DenseGrid(spec)))
+    verts = np.concatenate([v for _, v, _ in pieces])
+    base = np.cumsum([0] + [len(v) for _, v, _ in pieces[:-1]])
+    tris = np.concatenate([t + b for (_, _, t), b in zip(pieces, base)])
+    verts, tris = weld(verts, tris, 1e-6)
+    assert verts.min(axis=0).tolist() == [9.5, -0.5, -5.5]
+    assert verts.max(axis=0).tolist() == [80.5, 10.5, 5.5]
+    a, b, c = verts[tris[:, 0]], verts[tris[:, 1]], verts[tris[:, 2]]
+    # Dışa bakan normaller: işaretli hacim kutu hacmine eşit
+    assert np.einsum("ij,ij->i", a, np.cross(b, c)).sum() / 6 == pytest.approx(71 * 11 * 11)
+
+
+def _read_glb(path):
+    raw = path.read_bytes()
+    magic, version, total = struct.unpack("<4sII", raw[:12])
+    assert (magic, version, total) == (b"glTF", 2, len(raw))
+    n = struct.unpack("<I", raw[12:16])[0]
+    return json.loads(raw[20 : 20 + n]), raw[20 + n + 8 :]
+
+
+def _grid_mesh(n=24):
+    """Kenarı n olan düzlemsel kare ızgara (2·(n-1)^2 üçgen)."""
+    xs, ys = np.meshgrid(
+        np.arange(n, dtype=np.float64), np.arange(n, dtype=np.float64), indexing="ij"
+    )
+    verts = np.stack([xs.ravel(), ys.ravel(), np.zeros(n * n)], axis=1)
+    i = np.arange(n * n).reshape(n, n)[:-1, :-1].ravel()
+    tris = np.concatenate([np.stack([i, i + n, i + 1], 1), np.stack([i + 1, i + n, i + n + 1], 1)])
+    return verts, tris
+
+
+def test_glb_welds_chunk_seams_and_quantizes(tmp_path):
+    tri = np.array([[0, 1, 2]])
+    a = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0]], dtype=np.float32)
+    b = np.array([[1, 0, 0], [1, 1, 0], [0, 1, 0]], dtype=np.float32)
+    out = tmp_path / "m.glb"
+    # Aynı anahtarlı ardışık iki tuğla parçası: ortak kenardaki kopya köşeler birleşir
+    assert write_glb([((0, 0, 0), a, tri), ((0, 0, 0), b, tri)], out, weld_mm=1e-3) == (4, 2)
+    doc, binary = _read_glb(out)
+    assert doc["extensionsRequired"] == ["KHR_mesh_quantization"]
+    pos, idx = doc["accessors"]
+    assert pos["componentType"] == 5122 and idx["componentType"] == 5123
+    view = doc["bufferViews"][pos["bufferView"]]
+    q = np.frombuffer(
+        binary[view["byteOffset"] : view["byteOffset"] + view["byteLength"]], dtype=np.int16
+    )
+    node = doc["nodes"][0]
+    xyz = q.reshape(-1, 4)[:, :3] * node["scale"][0] + np.array(node["translation"])
+    assert (
+        np.abs(np.sort(xyz, axis=0) - np.sort(np.vstack([a, b[1:2]]), axis=0)).max()
+        <= node["scale"][0]
+    )
+
+
+def test_glb_lod_levels_decimate(tmp_path):
+    verts, tris = _grid_mesh()
+    out = tmp_path / "m.glb"
+    write_glb(split_spatial(verts, tris, cell_mm=100.0), out, weld_mm=1e-3, lod_cells=[4.0])
+    doc, _ = _read_glb(out)
+    root = doc["nodes"][doc["scenes"][0]["nodes"][0]]
+    (lod,) = root["extensions"]["MSFT_lod"]["ids"]
+    n_tris = [
+        doc["accessors"][doc["meshes"][doc["nodes"][i]["mesh"]]["primitives"][0]["indices"]][
+            "count"
+        ]
+        // 3
+        for i in (doc["scenes"][0]["nodes"][0], lod)
+    ]
+    assert n_tris[0] == len(tris) and n_tris[1] < n_tris[0] / 4
+
+
+def test_split_spatial_partitions_triangles():
+    verts, tris = _grid_mesh()
+    parts = list(split_spatial(verts, tris, cell_mm=8.0))
+    assert len(parts) == 9
+    assert sum(len(t) for _, _, t in parts) == len(tris)
+    assert all(t.max() < len(v) for _, v, t in parts)
+
+
+def test_cluster_decimate_keeps_extent():
+    verts, tris = _grid_mesh()
+    lv, lt = cluster_decimate(verts, tris, 6.0)
+    assert 0 < len(lt) < len(tris) / 10
+    assert lt.max() < len(lv)
@@ -5,7 +5,7 @@ import { createSimJob } from '@/lib/jobs'
 export default function SimStartModal({ jobId }: { jobId: number }) {
   const [open, setOpen] = useState(false)
   const [res, setRes] = useState(1.2)
-  const [quality, setQuality] = useState<'voxel' | 'occ-high'>('voxel')
+  const [quality, setQuality] = useState<'voxel' | 'occ-high' | 'heightfield'>('voxel')
   const [err, setErr] = useState<string | null>(null)
   const submit = async () => {
     try {
@@ -30,6 +30,7 @@ export default function SimStartModal({ jobId }: { jobId: number }) {
             <select value={quality} onChange={(e) => setQuality(e.target.value as any)} className="border rounded px-2 py-1 mb-4 w-full">
               <option value="voxel">Voxel</option>
               <option value="occ-high">OCC High</option>
+              <option value="heightfield">Heightfield (3 eksen)</option>
             </select>
             <div className="flex gap-2 justify-end">
               <button onClick={submit} className="px-3 py-1 bg-blue-600 text-white rounded">Gönder</button>
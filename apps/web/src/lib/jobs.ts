@@ -20,7 +20,7 @@ export async function createCamJob(
 
 export async function createSimJob(
   sourceJobId: number,
-  params: { resolution_mm: number; quality: 'voxel' | 'occ-high' },
+  params: { resolution_mm: number; quality: 'voxel' | 'occ-high' | 'heightfield' },
 ) {
   // Backend beklenen şema ve yol: POST /api/v1/sim/simulate
   const body = {